@@ -0,0 +1,137 @@
+"""
+Sprite asset manager.
+
+The five sprite JPEGs are decoded once, scaled to the cell size and packed side by side
+into a single atlas surface per CELL_SIZE. Sprites are subsurfaces of that atlas.
+The atlas pixels are also written to an on-disk cache, so later launches skip JPEG
+decoding and scaling. The cache is keyed on the cell size and on the source files'
+modification times and sizes. reload_if_changed rebuilds the atlas when a source image
+is edited (hot reload).
+"""
+import json
+import os
+
+import pygame
+
+from constants import ASSET_DIR, ASSET_CACHE_DIR
+from tracing import log
+
+# Sprite name -> source image in ASSET_DIR, in atlas order
+SPRITE_FILES = {
+    "santa": "santa.jpg",
+    "present": "present.jpg",
+    "obstacle": "flour.jpg",
+    "exit": "exit.jpg",
+    "grinch": "grinch.jpg",
+}
+
+CACHE_FORMAT = 1
+
+
+class AssetManager:
+    """
+    Builds, caches and serves the scaled sprite atlas.
+    """
+
+    def __init__(self, asset_dir=ASSET_DIR, cache_dir=ASSET_CACHE_DIR):
+        self.asset_dir = asset_dir
+        self.cache_dir = cache_dir
+        self._atlases = {}  # cell_size -> (atlas surface, {name: subsurface})
+        self._signature = None
+
+    def sprites(self, cell_size):
+        """
+        Returns {name: surface} for sprites scaled to cell_size.
+        """
+        if cell_size not in self._atlases:
+            self._atlases[cell_size] = self._load_atlas(cell_size)
+        return dict(self._atlases[cell_size][1])
+
+    def reload_if_changed(self):
+        """
+        Drops the in-memory atlases when a source image changed on disk. Returns True if it did.
+        """
+        signature = self.source_signature()
+        changed = self._signature is not None and signature != self._signature
+        if changed:
+            self._atlases.clear()
+        self._signature = signature
+        return changed
+
+    def source_signature(self):
+        """
+        Modification time and size of every source image.
+        """
+        signature = []
+        for name, filename in SPRITE_FILES.items():
+            stat = os.stat(os.path.join(self.asset_dir, filename))
+            signature.append([name, stat.st_mtime_ns, stat.st_size])
+        return signature
+
+    def _load_atlas(self, cell_size):
+        signature = self.source_signature()
+        self._signature = signature
+        atlas = self._read_cache(cell_size, signature)
+        if atlas is None:
+            atlas = self._build_atlas(cell_size)
+            self._write_cache(cell_size, signature, atlas)
+
+        if pygame.display.get_surface() is not None:
+            atlas = atlas.convert()  # Match the display format for fast blits
+        sprites = {
+            name: atlas.subsurface(pygame.Rect(index * cell_size, 0, cell_size, cell_size))
+            for index, name in enumerate(SPRITE_FILES)
+        }
+        return atlas, sprites
+
+    def _build_atlas(self, cell_size):
+        atlas = pygame.Surface((cell_size * len(SPRITE_FILES), cell_size))
+        for index, filename in enumerate(SPRITE_FILES.values()):
+            image = pygame.image.load(os.path.join(self.asset_dir, filename))
+            atlas.blit(pygame.transform.scale(image, (cell_size, cell_size)), (index * cell_size, 0))
+        return atlas
+
+    def _cache_path(self, cell_size):
+        return os.path.join(self.cache_dir, f"atlas_{cell_size}.bin")
+
+    def _read_cache(self, cell_size, signature):
+        """
+        Returns the cached atlas, or None when it is missing or stale.
+        """
+        try:
+            with open(self._cache_path(cell_size), "rb") as file:
+                header = json.loads(file.readline())
+                pixels = file.read()
+        except (OSError, ValueError):
+            return None
+        if header.get("format") != CACHE_FORMAT or header.get("signature") != signature:
+            return None
+        size = tuple(header["size"])
+        if len(pixels) != size[0] * size[1] * 3:
+            return None
+        return pygame.image.fromstring(pixels, size, "RGB")
+
+    def _write_cache(self, cell_size, signature, atlas):
+        header = {"format": CACHE_FORMAT, "signature": signature, "size": list(atlas.get_size())}
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = self._cache_path(cell_size) + ".tmp"
+            with open(temp_path, "wb") as file:
+                file.write(json.dumps(header).encode() + b"\n")
+                file.write(pygame.image.tostring(atlas, "RGB"))
+            os.replace(temp_path, self._cache_path(cell_size))
+        except OSError as e:
+            log.warning("Could not write the asset cache: %s", e)
+
+
+_manager = None
+
+
+def get_asset_manager():
+    """
+    Returns the shared asset manager.
+    """
+    global _manager
+    if _manager is None:
+        _manager = AssetManager()
+    return _manager
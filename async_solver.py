@@ -0,0 +1,143 @@
+"""
+Background execution of autonomous move decisions.
+
+A Prover9 proof can take much longer than a frame, so the pygame UI runs the solver on a
+worker thread while the game loop keeps ticking and rendering. A decision is submitted
+with a copy of everything the solver reads: Santa's cell and its four neighbours, the
+clue sets and the Grinch risk of those neighbours. The main thread can therefore keep
+moving the Grinch while the proof runs. Every decision has a deadline. When the deadline
+passes, or when the Grinch has moved into the chosen cell in the meantime, the move falls
+back to select_best_move on the live board.
+"""
+import atexit
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from board_index import grid_index
+from constants import SOLVER_DEADLINE_MS, OBSTACLE_FLAG, GRINCH_FLAG
+from tracing import log
+from validator import select_best_move, validate_move_and_update
+
+
+class LocalGrid:
+    """
+    Copy of a few grid cells, read as grid[x][y] like the full grid.
+    """
+
+    def __init__(self, grid, cells):
+        self._rows = {}
+        for x, y in cells:
+            self._rows.setdefault(x, {})[y] = grid[x][y]
+
+    def __getitem__(self, x):
+        return self._rows[x]
+
+
+class RiskSnapshot:
+    """
+    Grinch risk of a few cells, answering risk(position) like belief.GrinchBelief.
+    """
+
+    def __init__(self, belief, cells):
+        self._risk = {tuple(cell): belief.risk(cell) for cell in cells}
+
+    def risk(self, position):
+        return self._risk.get(tuple(position), 0.0)
+
+
+class AsyncSolver:
+    """
+    The pending background decision of one game, with its deadline.
+    """
+
+    def __init__(self, grid_size, backend=None, deadline_ms=SOLVER_DEADLINE_MS, clock=time.perf_counter,
+                 executor=None):
+        """
+        executor runs the decisions, by default the shared solver thread (see get_executor).
+        """
+        self.grid_size = tuple(grid_size)
+        self.backend = backend
+        self.deadline = deadline_ms / 1000
+        self._clock = clock
+        self._executor = executor
+        self.pending = None  # (future, Santa's cell, submission time)
+        self.missed_deadlines = 0
+
+    def submit(self, santa_position, last_position, clues, grid, belief=None):
+        """
+        Starts deciding Santa's move from santa_position on the solver thread.
+        last_position is the cell Santa came from, as for validate_move_and_update.
+        """
+        santa = tuple(santa_position)
+        neighbors = grid_index(self.grid_size).neighbors(santa)
+        local_grid = LocalGrid(grid, [santa] + neighbors)
+        local_clues = {clue_type: frozenset(positions) for clue_type, positions in clues.items()}
+        local_belief = RiskSnapshot(belief, neighbors) if belief is not None else None
+        future = (self._executor or get_executor()).submit(validate_move_and_update, list(santa), list(last_position), local_clues,
+                                       local_grid, self.grid_size, self.backend, local_belief)
+        self.pending = (future, santa, self._clock())
+
+    def poll(self, santa_position, clues, grid, belief=None):
+        """
+        Returns Santa's next cell once the pending decision has arrived, the fallback move
+        once its deadline has passed, or None while it is still running.
+        The arguments are the live board, used to check the decision and for the fallback.
+        """
+        if self.pending is None:
+            return None
+        future, santa, submitted = self.pending
+        if tuple(santa_position) != santa:  # Santa was moved by something else; the decision is moot
+            self.cancel()
+            return None
+
+        if future.done():
+            self.pending = None
+            try:
+                move = future.result()
+            except Exception as e:
+                log.error("Background solver failed at %s: %s", santa, e)
+                return self._fallback(santa_position, clues, grid, belief)
+            x, y = move
+            if tuple(move) != santa and grid[x][y] & (OBSTACLE_FLAG | GRINCH_FLAG):
+                log.debug("Board changed while deciding at %s; %s is no longer safe.", santa, move)
+                return self._fallback(santa_position, clues, grid, belief)
+            return list(move)
+
+        if self._clock() - submitted >= self.deadline:
+            self.cancel()
+            self.missed_deadlines += 1
+            log.info("Solver missed its %d ms deadline at %s; using the fallback move.",
+                     self.deadline * 1000, santa)
+            return self._fallback(santa_position, clues, grid, belief)
+        return None
+
+    def cancel(self):
+        """
+        Drops the pending decision. A proof that is already running finishes in the background and is ignored.
+        """
+        if self.pending is not None:
+            self.pending[0].cancel()
+            self.pending = None
+
+    def _fallback(self, santa_position, clues, grid, belief):
+        neighbors = grid_index(self.grid_size).neighbors(tuple(santa_position))
+        return list(select_best_move(santa_position, neighbors, clues, grid, belief))
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Returns the shared solver thread, starting it on first use.
+    One thread is enough: a game has at most one decision in flight, and Prover9 jobs
+    fan out further on the prover_pool workers.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="santa-solver")
+            atexit.register(_executor.shutdown, False)
+        return _executor
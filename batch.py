@@ -0,0 +1,186 @@
+"""
+Batch simulation of the autonomous player on seeded random boards.
+
+Usage:
+    python batch.py --games 10000 --output results.jsonl
+
+Games are spread over a process pool in chunks of seeds. Only a bounded number of
+chunks is in flight at once and each result is written out as soon as it arrives,
+so memory use does not grow with the number of games.
+
+With --boards, game i plays board i (modulo the file's size) from a board file written
+by levels.py instead of generating its board.
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from constants import GRID_ROWS, GRID_COLS
+from engine import GameState, AUTO, PLAYING
+from levels import open_boards
+
+RESULT_FIELDS = ["seed", "outcome", "steps", "presents_collected", "total_presents", "solver_time", "wall_time"]
+
+
+def play_seed(seed, grid_size, max_steps, grinch_period, backend, boards=None, strategy=None):
+    """
+    Plays one autonomous game on the board generated from `seed` (or loaded from the
+    `boards` file) and returns its result record.
+    """
+    start = time.perf_counter()
+    layout = None
+    if boards:
+        store = open_boards(boards)
+        grid_size, layout = store[seed % len(store)]
+    state = GameState(grid_size, seed=seed, grinch_period=grinch_period, backend=backend, layout=layout,
+                      strategy=strategy)
+    state.step(AUTO)
+    while state.status == PLAYING and state.steps < max_steps:
+        state.step()
+
+    return {
+        "seed": seed,
+        "outcome": state.status if state.status != PLAYING else "timeout",
+        "steps": state.steps,
+        "presents_collected": state.collected_presents,
+        "total_presents": state.total_presents,
+        "solver_time": round(state.solver_time, 6),
+        "wall_time": round(time.perf_counter() - start, 6),
+    }
+
+
+def play_chunk(seeds, grid_size, max_steps, grinch_period, backend, boards=None, strategy=None):
+    """
+    Plays a chunk of seeds in one worker call to keep inter-process traffic low.
+    """
+    return [play_seed(seed, grid_size, max_steps, grinch_period, backend, boards, strategy) for seed in seeds]
+
+
+class ResultWriter:
+    """
+    Streams result records to a JSONL or CSV file.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "w", newline="")
+        if path.endswith(".csv"):
+            self._csv = csv.DictWriter(self.file, fieldnames=RESULT_FIELDS)
+            self._csv.writeheader()
+        else:
+            self._csv = None
+
+    def write(self, record):
+        if self._csv:
+            self._csv.writerow(record)
+        else:
+            self.file.write(json.dumps(record) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+class Summary:
+    """
+    Running aggregate of game results.
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.outcomes = {}
+        self.steps = 0
+        self.presents_collected = 0
+        self.solver_time = 0.0
+        self.elapsed = 0.0
+
+    def add(self, record):
+        self.games += 1
+        self.outcomes[record["outcome"]] = self.outcomes.get(record["outcome"], 0) + 1
+        self.steps += record["steps"]
+        self.presents_collected += record["presents_collected"]
+        self.solver_time += record["solver_time"]
+
+    def report(self):
+        elapsed = max(self.elapsed, 1e-9)
+        games = max(self.games, 1)
+        lines = [
+            f"Games: {self.games} in {elapsed:.2f}s ({self.games / elapsed:.1f} games/s, {self.steps / elapsed:.0f} steps/s)",
+            "Outcomes: " + ", ".join(f"{name} {count} ({count / games:.1%})"
+                                     for name, count in sorted(self.outcomes.items())),
+            f"Win rate: {self.outcomes.get('won', 0) / games:.2%}",
+            f"Mean steps: {self.steps / games:.1f}, mean presents: {self.presents_collected / games:.2f}, "
+            f"mean solver time: {self.solver_time / games * 1000:.2f} ms",
+        ]
+        return "\n".join(lines)
+
+
+def seed_chunks(first_seed, games, chunk_size):
+    """
+    Yields consecutive ranges of seeds without materialising the whole list.
+    """
+    for start in range(first_seed, first_seed + games, chunk_size):
+        yield range(start, min(start + chunk_size, first_seed + games))
+
+
+def run_batch(games, output, first_seed=0, workers=None, chunk_size=50, grid_size=(GRID_ROWS, GRID_COLS),
+              max_steps=500, grinch_period=4, backend=None, boards=None, strategy=None):
+    """
+    Runs the games on a process pool, streaming results to `output`, and returns the Summary.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 2
+    summary = Summary()
+    writer = ResultWriter(output)
+    chunks = seed_chunks(first_seed, games, chunk_size)
+    start = time.perf_counter()
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = set()
+            while True:
+                for seeds in chunks:
+                    in_flight.add(pool.submit(play_chunk, seeds, grid_size, max_steps, grinch_period, backend,
+                                                  boards, strategy))
+                    if len(in_flight) >= max_in_flight:
+                        break
+                if not in_flight:
+                    break
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for record in future.result():
+                        writer.write(record)
+                        summary.add(record)
+    finally:
+        writer.close()
+
+    summary.elapsed = time.perf_counter() - start
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the autonomous player's win rate on seeded boards.")
+    parser.add_argument("--games", type=int, default=1000, help="number of games to play")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first board")
+    parser.add_argument("--output", default="results.jsonl", help="result file (.jsonl or .csv)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=50, help="games per worker task")
+    parser.add_argument("--rows", type=int, default=GRID_ROWS)
+    parser.add_argument("--cols", type=int, default=GRID_COLS)
+    parser.add_argument("--max-steps", type=int, default=500, help="steps before a game counts as a timeout")
+    parser.add_argument("--grinch-period", type=int, default=4, help="the Grinch moves every N steps")
+    parser.add_argument("--backend", default=None, help="solver backend (default: SOLVER_BACKEND)")
+    parser.add_argument("--strategy", default=None, help="autonomous strategy, solver or planner "
+                                                         "(default: AUTO_STRATEGY)")
+    parser.add_argument("--boards", default=None, help="board file from levels.py to play instead of generating")
+    args = parser.parse_args(argv)
+
+    summary = run_batch(args.games, args.output, args.seed, args.workers, args.chunk_size, (args.rows, args.cols),
+                        args.max_steps, args.grinch_period, args.backend, args.boards,
+                        args.strategy)
+    print(summary.report())
+
+
+if __name__ == "__main__":
+    main()
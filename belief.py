@@ -0,0 +1,291 @@
+"""
+Probabilistic belief over the Grinch's position.
+
+The autonomous player never sees the Grinch directly; it only hears the grinch_sound
+clue when the Grinch is next to Santa. GrinchBelief keeps a probability for every cell,
+propagates it with the same random walk grinch_move uses (a uniform step to a passable
+neighbour, or staying put when boxed in) on every Grinch move, and conditions it on
+whether Santa hears the Grinch. All updates are whole-array NumPy operations, so a tick
+costs a few milliseconds even on 500x500 boards.
+
+risk_map gives, per cell, the probability that the Grinch is there now or after its next
+move; risk answers the same for one cell from its neighbourhood alone, which is all the
+move selector needs. risk_level buckets those probabilities so the move selector and the
+move cache can share a small, discrete view of them.
+
+GrinchBelief's arrays cost about 40 MB on a 1000x1000 board, so large boards use
+SparseGrinchBelief instead, which keeps only the cells where the belief differs from the
+Grinch's long-run distribution and needs no NumPy.
+"""
+from bisect import bisect_right
+
+from constants import BELIEF_PRUNE, BELIEF_SPARSE_CELLS
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+HAVE_NUMPY = np is not None
+
+# Risk probabilities at which risk_level steps up: 0 (negligible) to len(RISK_LEVELS) (likely)
+RISK_LEVELS = (0.05, 0.25, 0.5)
+
+
+def risk_level(risk):
+    """
+    Buckets a probability into 0..len(RISK_LEVELS).
+    """
+    return bisect_right(RISK_LEVELS, risk)
+
+
+class GrinchBelief:
+    """
+    Probability grid over the Grinch's position for one board.
+    """
+
+    def __init__(self, board_index):
+        if not HAVE_NUMPY:
+            raise ImportError("The Grinch belief map needs numpy: pip install numpy")
+        self.board_index = board_index
+        grid_size = (board_index.rows, board_index.cols)
+
+        self.passable = np.ones(grid_size, dtype=bool)
+        if board_index.obstacles:
+            xs, ys = zip(*board_index.obstacles)
+            self.passable[list(xs), list(ys)] = False
+        degree = self._spread(self.passable.astype(np.float64)) * self.passable
+        self._inv_degree = np.divide(1.0, degree, out=np.zeros(grid_size), where=degree > 0)
+        self._stays = (self.passable & (degree == 0)).astype(np.float64)  # Boxed-in cells keep their probability
+
+        self.belief = self.passable / self.passable.sum()
+        self._share = np.empty(grid_size)  # Scratch buffers reused by every transition
+        self._next = np.empty(grid_size)
+        self._risk = None
+
+    def predict(self):
+        """
+        Advances the belief by one Grinch move.
+        """
+        self._transition(self.belief, self._next)
+        self.belief, self._next = self._next, self.belief
+        self._risk = None
+
+    def observe(self, santa_position, heard):
+        """
+        Conditions the belief on Santa's sound clue: the Grinch is next to Santa exactly when
+        it is heard, and it is never on Santa's own cell while the game goes on.
+        """
+        x, y = santa_position
+        neighbors = tuple(np.array(self.board_index.neighbors(santa_position)).T)
+        if heard:
+            likelihood = np.zeros_like(self.belief)
+            likelihood[neighbors] = 1.0
+            self.belief = self.belief * likelihood
+        else:
+            self.belief[neighbors] = 0.0
+        self.belief[x, y] = 0.0
+
+        total = self.belief.sum()
+        if total > 0:
+            self.belief /= total
+        else:
+            # The observation contradicts the belief (e.g. a Grinch move we did not model):
+            # restart from every passable cell consistent with it
+            consistent = self.passable.copy()
+            consistent[x, y] = False
+            if heard:
+                consistent &= likelihood > 0
+            else:
+                consistent[neighbors] = False
+            self.belief = consistent / max(consistent.sum(), 1)
+        self._risk = None
+
+    def risk_map(self):
+        """
+        Per-cell probability that the Grinch is there now or after its next move.
+        Computed once per update and cached, so repeated queries are free.
+        """
+        if self._risk is None:
+            self._risk = np.maximum(self.belief, self._transition(self.belief, np.empty_like(self.belief)))
+        return self._risk
+
+    def risk(self, position):
+        """
+        risk_map() at one cell, computed from that cell's neighbourhood in O(1).
+        """
+        x, y = position
+        if not self.passable[x, y]:
+            return 0.0
+        belief, inv_degree = self.belief, self._inv_degree
+        arriving = belief[x, y] * self._stays[x, y]
+        for nx, ny in self.board_index.neighbors(position):
+            arriving += belief[nx, ny] * inv_degree[nx, ny]
+        return float(max(belief[x, y], arriving))
+
+    def _transition(self, belief, out):
+        """
+        Writes the belief after one random-walk step into `out` and returns it.
+        """
+        share = np.multiply(belief, self._inv_degree, out=self._share)
+        np.multiply(belief, self._stays, out=out)
+        out[1:, :] += share[:-1, :]
+        out[:-1, :] += share[1:, :]
+        out[:, 1:] += share[:, :-1]
+        out[:, :-1] += share[:, 1:]
+        out *= self.passable
+        return out
+
+    @staticmethod
+    def _spread(values):
+        """
+        Sums each cell's four neighbours (the value moving in from Up, Down, Left and Right).
+        """
+        result = np.zeros_like(values)
+        result[1:, :] += values[:-1, :]
+        result[:-1, :] += values[1:, :]
+        result[:, 1:] += values[:, :-1]
+        result[:, :-1] += values[:, 1:]
+        return result
+
+
+class SparseGrinchBelief:
+    """
+    GrinchBelief for large boards, in memory that does not grow with the board.
+
+    The belief is weight * stationary + deviation. stationary is the random walk's long-run
+    distribution: each passable cell in proportion to its number of passable neighbours
+    (one for a boxed-in cell). A Grinch move leaves it unchanged, and it is worked out per
+    cell when needed. deviation maps the few cells where the belief differs from it: an
+    observation only touches Santa's neighbourhood, and each Grinch move spreads the
+    deviation by one cell. Deviations smaller than `prune` are dropped, and once more than
+    `max_cells` remain, the deviation is folded into the weight. By then the largest
+    probability left in it is about 0.003, far below RISK_LEVELS[0], so folding does not
+    change a risk level.
+
+    The belief starts from the stationary distribution rather than GrinchBelief's uniform
+    one, as for a Grinch that has been wandering for a while.
+    """
+
+    def __init__(self, board_index, prune=BELIEF_PRUNE, max_cells=BELIEF_SPARSE_CELLS):
+        self.board_index = board_index
+        self.prune = prune
+        self.max_cells = max_cells
+        self.weight = 1.0
+        self.deviation = {}  # Cell -> probability minus weight * stationary
+        self._stationary_total = _stationary_total(board_index)
+
+    def probability(self, position):
+        """
+        Probability that the Grinch is at a cell now.
+        """
+        cell = tuple(position)
+        return self.weight * self._stationary(cell) + self.deviation.get(cell, 0.0)
+
+    def predict(self):
+        """
+        Advances the belief by one Grinch move.
+        """
+        moved = {}
+        for cell, value in self.deviation.items():
+            neighbors = self.board_index.passable_neighbors(cell)
+            if not neighbors:
+                moved[cell] = moved.get(cell, 0.0) + value  # Boxed in
+                continue
+            share = value / len(neighbors)
+            for neighbor in neighbors:
+                moved[neighbor] = moved.get(neighbor, 0.0) + share
+        self.deviation = {cell: value for cell, value in moved.items() if abs(value) >= self.prune}
+        if len(self.deviation) > self.max_cells:
+            self.weight += sum(self.deviation.values())
+            self.deviation = {}
+
+    def observe(self, santa_position, heard):
+        """
+        Conditions the belief on Santa's sound clue, as GrinchBelief.observe does.
+        """
+        santa = tuple(santa_position)
+        near = [cell for cell in self.board_index.neighbors(santa) if cell not in self.board_index.obstacles]
+        self._condition(santa, near, heard)
+        total = self.weight + sum(self.deviation.values())
+        if total <= 0:
+            # The observation contradicts the belief: restart from the stationary distribution
+            self.weight, self.deviation = 1.0, {}
+            self._condition(santa, near, heard)
+            total = self.weight + sum(self.deviation.values())
+            if total <= 0:
+                return
+        self.weight /= total
+        self.deviation = {cell: value / total for cell, value in self.deviation.items()}
+
+    def risk(self, position):
+        """
+        Probability that the Grinch is at a cell now or after its next move, like GrinchBelief.risk.
+        """
+        cell = tuple(position)
+        index = self.board_index
+        if cell in index.obstacles:
+            return 0.0
+        probability = self.probability(cell)
+        neighbors = index.passable_neighbors(cell)
+        arriving = 0.0 if neighbors else probability  # A boxed-in Grinch stays
+        for neighbor in neighbors:
+            arriving += self.probability(neighbor) / len(index.passable_neighbors(neighbor))
+        return float(max(probability, arriving))
+
+    def _condition(self, santa, near, heard):
+        if heard:
+            kept = {cell: self.probability(cell) for cell in near}
+            self.weight = 0.0
+            self.deviation = {cell: value for cell, value in kept.items() if value > 0}
+        else:
+            for cell in near + [santa]:
+                if cell not in self.board_index.obstacles:
+                    self._set_probability(cell, 0.0)
+
+    def _set_probability(self, cell, probability):
+        value = probability - self.weight * self._stationary(cell)
+        if value:
+            self.deviation[cell] = value
+        else:
+            self.deviation.pop(cell, None)
+
+    def _stationary(self, cell):
+        if cell in self.board_index.obstacles:
+            return 0.0
+        return max(len(self.board_index.passable_neighbors(cell)), 1) / self._stationary_total
+
+
+def _stationary_total(board_index):
+    """
+    Sum over the passable cells of max(passable neighbours, 1): the normaliser of the
+    stationary distribution. Computed with a few whole-board NumPy operations when NumPy is
+    installed, and from the obstacles with a Python loop otherwise.
+    """
+    rows, cols = board_index.rows, board_index.cols
+    obstacles = board_index.obstacles
+    if np is not None:
+        passable = np.ones((rows, cols), dtype=bool)
+        if obstacles:
+            xs, ys = zip(*obstacles)
+            passable[list(xs), list(ys)] = False
+        degree = np.zeros((rows, cols), dtype=np.int8)
+        degree[1:, :] += passable[:-1, :]
+        degree[:-1, :] += passable[1:, :]
+        degree[:, 1:] += passable[:, :-1]
+        degree[:, :-1] += passable[:, 1:]
+        return int(np.maximum(degree, 1)[passable].sum(dtype=np.int64))
+
+    total = 2 * (rows * (cols - 1) + cols * (rows - 1))  # Both ends of every edge of the open board
+    boxed = set()
+    for obstacle in obstacles:
+        for neighbor in board_index.neighbors(obstacle):
+            if neighbor in obstacles:
+                total -= 1  # An edge between two obstacles is met once from each end
+            else:
+                total -= 2
+                if all(cell in obstacles for cell in board_index.neighbors(neighbor)):
+                    boxed.add(neighbor)
+    if rows * cols == 1 and not obstacles:
+        boxed.add((0, 0))  # A single cell has no neighbours at all
+    return total + len(boxed)
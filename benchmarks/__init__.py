@@ -0,0 +1,10 @@
+"""
+Benchmarks for the solver, simulation and rendering hot paths.
+
+scenarios.py builds seeded boards over a range of sizes and object densities, cases.py
+holds one timed workload per hot path, and run.py times every case on every scenario,
+writes the results as JSON and compares them with a stored baseline.
+
+Usage (from the project root):
+    python -m benchmarks.run --output bench.json
+"""
@@ -0,0 +1,207 @@
+"""
+Timed workloads, one per hot path.
+
+Each case takes a scenario's (state, positions) and returns (run, ops) or (run, ops, details):
+run() performs ops calls of the function under test over the sample positions, so the
+runner can report time per call, and details holds extra figures for the result record.
+A case returns None when it does not apply to the scenario.
+"""
+import os
+import random
+
+import pygame
+
+from constants import GRID_ROWS, GRID_COLS, CELL_SIZE, LARGE_CELL_SIZE
+from engine import empty_grid
+from game_logic import add_clues, check_collision, grinch_move
+from grid import GridRenderer, draw_grid, load_assets
+from move_cache import MoveCache, neighbourhood_key
+from viewport import ChunkedRenderer
+from validator import (
+    PROVER9_THEORY,
+    build_prover9_delta,
+    build_prover9_input,
+    decide_move,
+    move_goals,
+    neighbor_template,
+    validate_move_and_update,
+)
+
+
+def validate_move(state, positions):
+    """
+    validate_move_and_update as the game calls it with the default inference backend (not cached).
+    """
+    def run():
+        for position in positions:
+            validate_move_and_update(position, position, state.known_clues, state.grid, state.grid_size,
+                                     "inference", state.grinch_belief)
+    return run, len(positions)
+
+
+def move_cache_hit(state, positions):
+    """
+    A warm move cache hit for the Prover9 backend: building the neighbourhood key and looking it up.
+    """
+    cache = MoveCache()
+    keys = [neighbourhood_key(position, position, state.known_clues, state.grid, state.grid_size, "prover9",
+                              state.grinch_belief) for position in positions]
+    for key, position in zip(keys, positions):
+        cache.put(key, position, position)
+
+    def run():
+        for position in positions:
+            key = neighbourhood_key(position, position, state.known_clues, state.grid, state.grid_size, "prover9",
+                                    state.grinch_belief)
+            cache.get(key, position)
+    return run, len(positions)
+
+
+def solver_decision(state, positions):
+    """
+    decide_move, the work validate_move_and_update does on a move cache miss.
+    """
+    def run():
+        for position in positions:
+            decide_move(position, position, state.known_clues, state.grid, state.grid_size, "inference",
+                        state.grinch_belief)
+    return run, len(positions)
+
+
+def prover9_input(state, positions):
+    """
+    The complete Prover9 input for a batched move decision, as streamed without a preloaded theory.
+    The fact templates are rebuilt on every run, so the time includes building them (cold cache).
+    """
+    goals = [move_goals(position, state.board_index.neighbors(position)) for position in positions]
+
+    def run():
+        neighbor_template.cache_clear()
+        for position, position_goals in zip(positions, goals):
+            build_prover9_input(position, position, {}, state.grid, state.grid_size, position_goals)
+    sizes = [len(build_prover9_input(position, position, {}, state.grid, state.grid_size, position_goals))
+             for position, position_goals in zip(positions, goals)]
+    return run, len(positions), {"input_bytes": round(sum(sizes) / len(sizes))}
+
+
+def prover9_delta(state, positions):
+    """
+    Only the per-step facts and goals, as sent when PROVER9_PRELOAD_THEORY keeps the rules in a file.
+    Timed with a cold template cache, like prover9_input.
+    """
+    goals = [move_goals(position, state.board_index.neighbors(position)) for position in positions]
+
+    def run():
+        neighbor_template.cache_clear()
+        for position, position_goals in zip(positions, goals):
+            build_prover9_delta(position, position, state.grid, state.grid_size, position_goals)
+    sizes = [len(build_prover9_delta(position, position, state.grid, state.grid_size, position_goals))
+             for position, position_goals in zip(positions, goals)]
+    return run, len(positions), {"input_bytes": round(sum(sizes) / len(sizes)), "theory_bytes": len(PROVER9_THEORY)}
+
+
+def grinch_moves(state, positions):
+    rng = random.Random(state.seed)
+
+    def run():
+        for position in positions:
+            grinch_move(position, state.grid_size, state.obstacles, rng, state.board_index)
+    return run, len(positions)
+
+
+def collisions(state, positions):
+    # check_collision removes a collected present, so only cells without one are sampled
+    cells = [position for position in positions if tuple(position) not in state.presents]
+    grinch = state.grinch_position
+
+    def run():
+        for position in cells:
+            check_collision(position, grinch, state.presents, state.obstacles, state.exit_point)
+    return run, len(cells)
+
+
+def clues(state, positions):
+    """
+    add_clues over the whole board; it only sets bits, so the same grid is reused.
+    """
+    grid = empty_grid(state.grid_size, "lists")
+
+    def run():
+        add_clues(grid, state.presents, state.obstacles, state.exit_point, state.grinch_position, state.grid_size)
+    return run, 1
+
+
+def draw(state, positions):
+    """
+    Full-frame draw_grid on an offscreen surface. draw_grid renders the configured
+    GRID_ROWS x GRID_COLS board, so only scenarios of that size are timed.
+    """
+    if state.grid_size != (GRID_ROWS, GRID_COLS):
+        return None
+    screen, assets = _offscreen()
+
+    def run():
+        for position in positions:
+            draw_grid(screen, assets, position, state.grinch_position, state.presents, state.obstacles,
+                      state.exit_point)
+    return run, len(positions)
+
+
+def draw_incremental(state, positions):
+    """
+    GridRenderer.draw (the UI's dirty-cell path) as Santa moves between the sample positions.
+    """
+    if state.grid_size != (GRID_ROWS, GRID_COLS):
+        return None
+    screen, assets = _offscreen()
+    renderer = GridRenderer(screen, assets, state.obstacles, state.exit_point)
+
+    def run():
+        for position in positions:
+            renderer.draw(position, state.grinch_position, state.presents)
+    return run, len(positions)
+
+
+def draw_chunked(state, positions):
+    """
+    ChunkedRenderer.draw (large-board mode) as Santa walks a staircase from the first sample
+    position and the camera scrolls after him. Runs on every board size.
+    """
+    screen, assets = _offscreen(LARGE_CELL_SIZE)
+    renderer = ChunkedRenderer(screen, assets, state.grid_size, state.obstacles, state.exit_point,
+                               screen.get_rect())
+    rows, cols = state.grid_size
+    start_x, start_y = positions[0]
+    walk = [(min(start_x + (step + 1) // 2, rows - 1), min(start_y + step // 2, cols - 1))
+            for step in range(len(positions))]
+
+    def run():
+        for position in walk:
+            renderer.draw(position, state.grinch_position, state.presents)
+    return run, len(walk)
+
+
+def _offscreen(cell_size=CELL_SIZE):
+    """
+    Surface and sprites for rendering without a window, via SDL's dummy video driver.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((1, 1))  # Sprite conversion needs a display mode, even a dummy one
+    return pygame.Surface((GRID_COLS * CELL_SIZE, GRID_ROWS * CELL_SIZE)), load_assets(cell_size)
+
+
+CASES = {
+    "validate_move_and_update": validate_move,
+    "decide_move": solver_decision,
+    "MoveCache.get": move_cache_hit,
+    "build_prover9_input": prover9_input,
+    "build_prover9_delta": prover9_delta,
+    "grinch_move": grinch_moves,
+    "check_collision": collisions,
+    "add_clues": clues,
+    "draw_grid": draw,
+    "GridRenderer.draw": draw_incremental,
+    "ChunkedRenderer.draw": draw_chunked,
+}
@@ -0,0 +1,168 @@
+"""
+Times every benchmark case on every scenario and compares the results with a baseline.
+
+Each case is run in batches long enough to time reliably (at least --min-time seconds),
+--repeat times; the best and median time per call are reported in microseconds. Results
+are written as JSON. When a baseline file exists, every result is compared with it on
+the best time, and the run exits with status 1 if any case is slower by more than
+--tolerance. Baselines are machine-specific: record one with --save-baseline on the
+machine that will check for regressions.
+
+Usage (from the project root):
+    python -m benchmarks.run --save-baseline
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --scenario default --case draw_grid
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+from benchmarks.cases import CASES
+from benchmarks.scenarios import SCENARIOS, build_board, get_scenario
+
+RESULTS_VERSION = 1
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def measure(run, ops, repeat=5, min_time=0.1):
+    """
+    Times run() and returns (number, best, median), where number is the calls per
+    timed batch and best and median are seconds per operation over the repeats.
+    """
+    number = 1
+    while True:  # Grow the batch until it takes long enough to time
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        if time.perf_counter() - start >= min_time:
+            break
+        number *= 2
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        samples.append((time.perf_counter() - start) / (number * ops))
+    return number, min(samples), statistics.median(samples)
+
+
+def run_benchmarks(scenarios=SCENARIOS, case_names=None, repeat=5, min_time=0.1):
+    """
+    Returns one result record per (scenario, case) that applies.
+    """
+    records = []
+    for scenario in scenarios:
+        state, positions = build_board(scenario)
+        for name, case in CASES.items():
+            if case_names and name not in case_names:
+                continue
+            workload = case(state, positions)
+            if workload is None:
+                continue
+            run, ops = workload[:2]
+            number, best, median = measure(run, ops, repeat, min_time)
+            record = {
+                "scenario": scenario.name,
+                "case": name,
+                "grid_size": list(scenario.grid_size),
+                "obstacle_density": scenario.obstacle_density,
+                "present_count": scenario.present_count,
+                "ops": ops,
+                "number": number,
+                "repeat": repeat,
+                "best_us": round(best * 1_000_000, 3),
+                "median_us": round(median * 1_000_000, 3),
+            }
+            if len(workload) > 2:
+                record.update(workload[2])
+            records.append(record)
+            print(f"{scenario.name:<14} {name:<26} {best * 1_000_000:>12.2f} us/call")
+    return records
+
+
+def compare(records, baseline, tolerance):
+    """
+    Compares best times with the baseline's. Returns one record per case found in both,
+    with "regression" set when the case got slower by more than `tolerance` (0.25 = 25%).
+    """
+    previous = {(record["scenario"], record["case"]): record for record in baseline["results"]}
+    comparison = []
+    for record in records:
+        old = previous.get((record["scenario"], record["case"]))
+        if old is None or not old["best_us"]:
+            continue
+        ratio = record["best_us"] / old["best_us"]
+        comparison.append({
+            "scenario": record["scenario"],
+            "case": record["case"],
+            "baseline_us": old["best_us"],
+            "best_us": record["best_us"],
+            "ratio": round(ratio, 3),
+            "regression": ratio > 1 + tolerance,
+        })
+    return comparison
+
+
+def write_results(path, records, comparison=None):
+    report = {
+        "version": RESULTS_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": records,
+    }
+    if comparison is not None:
+        report["comparison"] = comparison
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(report, file, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the solver, simulation and rendering hot paths.")
+    parser.add_argument("--scenario", action="append", choices=[scenario.name for scenario in SCENARIOS],
+                        help="scenario to run (repeatable; default: all)")
+    parser.add_argument("--case", action="append", choices=list(CASES), help="case to run (repeatable; default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed batches per case")
+    parser.add_argument("--min-time", type=float, default=0.1, help="minimum seconds per timed batch")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline JSON file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown against the baseline before a case counts as a regression")
+    args = parser.parse_args(argv)
+
+    scenarios = [get_scenario(name) for name in args.scenario] if args.scenario else SCENARIOS
+    records = run_benchmarks(scenarios, args.case, args.repeat, args.min_time)
+
+    comparison = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        comparison = compare(records, baseline, args.tolerance)
+        print(f"\nAgainst {args.baseline}:")
+        for entry in comparison:
+            flag = "  REGRESSION" if entry["regression"] else ""
+            print(f"{entry['scenario']:<14} {entry['case']:<26} {entry['baseline_us']:>12.2f} -> "
+                  f"{entry['best_us']:>12.2f} us ({entry['ratio']:.2f}x){flag}")
+
+    if args.output:
+        write_results(args.output, records, comparison)
+        print(f"Results written to {args.output}")
+    if args.save_baseline:
+        write_results(args.baseline, records)
+        print(f"Baseline written to {args.baseline}")
+    if comparison and any(entry["regression"] for entry in comparison):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
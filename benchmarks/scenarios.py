@@ -0,0 +1,52 @@
+"""
+Seeded benchmark scenarios.
+
+A scenario fixes the board size, the obstacle density, the number of presents and the
+seed, so every run times the same boards and the same sequence of positions.
+"""
+import random
+from collections import namedtuple
+
+from constants import GRID_ROWS, GRID_COLS, OBSTACLE_DENSITY, PRESENT_COUNT
+from engine import GameState, AUTO
+from levels import generate_level
+from validator import update_clues
+
+Scenario = namedtuple("Scenario", "name grid_size obstacle_density present_count seed")
+
+SCENARIOS = (
+    Scenario("default", (GRID_ROWS, GRID_COLS), OBSTACLE_DENSITY, PRESENT_COUNT, 1),
+    Scenario("small-dense", (10, 10), 0.3, PRESENT_COUNT, 2),
+    Scenario("medium-sparse", (50, 50), 0.05, 25, 3),
+    Scenario("medium-dense", (50, 50), 0.3, 25, 4),
+    Scenario("large", (200, 200), 0.15, 100, 5),
+)
+
+SAMPLE_POSITIONS = 64  # Santa and Grinch positions each case cycles through
+
+
+def get_scenario(name):
+    for scenario in SCENARIOS:
+        if scenario.name == name:
+            return scenario
+    raise ValueError(f"Unknown benchmark scenario: {name}")
+
+
+def build_board(scenario):
+    """
+    Builds the game state of a scenario with knowledge gathered along its sample positions.
+    Returns (state, positions), where positions are passable cells drawn with the scenario's seed.
+    """
+    rng = random.Random(scenario.seed)
+    layout = generate_level(scenario.grid_size, rng, scenario.obstacle_density, scenario.present_count)
+    state = GameState(scenario.grid_size, seed=scenario.seed, layout=layout, strategy="solver")
+    state.handle_action(AUTO)  # The solver's view of the board, Grinch belief included
+
+    rows, cols = scenario.grid_size
+    free = [(x, y) for x in range(rows) for y in range(cols) if (x, y) not in state.obstacles]
+    positions = [list(free[rng.randrange(len(free))]) for _ in range(SAMPLE_POSITIONS)]
+
+    game_clues = {"cookie_smell": state.presents, "grinch_sound": {tuple(state.grinch_position)}}
+    for position in positions:
+        update_clues(position, game_clues, state.known_clues, state.grid_size)
+    return state, positions
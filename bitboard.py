@@ -0,0 +1,218 @@
+"""
+Bitboard representation of the game grid.
+
+Each cell flag (Santa, present, obstacle, ..., Grinch sound) is stored as its own layer:
+a list holding one integer per row, where bit y is set when cell (x, y) has the flag.
+Neighbour and clue computation are row shifts and ORs, and whole-board operations
+work a row at a time, so cost grows with the number of rows rather than cells.
+
+Bitboard also behaves like the list-of-lists grid for existing callers:
+board[x][y] returns the cell's combined bitmask and board[x][y] |= FLAG sets flags.
+"""
+from constants import (
+    SANTA_FLAG,
+    PRESENT_FLAG,
+    OBSTACLE_FLAG,
+    EXIT_FLAG,
+    GRINCH_FLAG,
+    COOKIE_SMELL_FLAG,
+    FLOUR_SMELL_FLAG,
+    COLD_BREEZE_FLAG,
+    GRINCH_SOUND_FLAG,
+)
+
+CELL_FLAGS = [
+    SANTA_FLAG,
+    PRESENT_FLAG,
+    OBSTACLE_FLAG,
+    EXIT_FLAG,
+    GRINCH_FLAG,
+    COOKIE_SMELL_FLAG,
+    FLOUR_SMELL_FLAG,
+    COLD_BREEZE_FLAG,
+    GRINCH_SOUND_FLAG,
+]
+
+# Each clue layer marks the cells adjacent to its source layer
+CLUE_SOURCES = {
+    COOKIE_SMELL_FLAG: PRESENT_FLAG,
+    FLOUR_SMELL_FLAG: OBSTACLE_FLAG,
+    COLD_BREEZE_FLAG: EXIT_FLAG,
+    GRINCH_SOUND_FLAG: GRINCH_FLAG,
+}
+
+
+class Bitboard:
+    """
+    One row-bitmask layer per cell flag.
+    """
+
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.row_mask = (1 << cols) - 1
+        self.layers = {flag: [0] * rows for flag in CELL_FLAGS}
+
+    @classmethod
+    def from_positions(cls, grid_size, santa_position, grinch_position, exit_point, presents, obstacles):
+        """
+        Builds a board from object positions and derives every clue layer.
+        """
+        board = cls(*grid_size)
+        board.place(SANTA_FLAG, [santa_position])
+        board.place(GRINCH_FLAG, [grinch_position])
+        board.place(EXIT_FLAG, [exit_point])
+        board.place(PRESENT_FLAG, presents)
+        board.place(OBSTACLE_FLAG, obstacles)
+        board.update_clues()
+        return board
+
+    @classmethod
+    def from_grid(cls, grid):
+        """
+        Converts a list-of-lists bitmask grid.
+        """
+        board = cls(len(grid), len(grid[0]) if grid else 0)
+        for x, row in enumerate(grid):
+            for y, value in enumerate(row):
+                if value:
+                    board.set_cell(x, y, value)
+        return board
+
+    def to_grid(self):
+        """
+        Converts back to a list-of-lists bitmask grid.
+        """
+        return [[self.cell(x, y) for y in range(self.cols)] for x in range(self.rows)]
+
+    # --- Single cells ---
+
+    def set(self, flag, x, y):
+        self.layers[flag][x] |= 1 << y
+
+    def clear(self, flag, x, y):
+        self.layers[flag][x] &= ~(1 << y)
+
+    def test(self, flag, x, y):
+        return bool(self.layers[flag][x] >> y & 1)
+
+    def cell(self, x, y):
+        """
+        Returns the combined bitmask of cell (x, y), as stored in the list grid.
+        """
+        value = 0
+        for flag, layer in self.layers.items():
+            if layer[x] >> y & 1:
+                value |= flag
+        return value
+
+    def set_cell(self, x, y, value):
+        """
+        Sets exactly the flags in `value` on cell (x, y).
+        """
+        bit = 1 << y
+        for flag, layer in self.layers.items():
+            if value & flag:
+                layer[x] |= bit
+            else:
+                layer[x] &= ~bit
+
+    def place(self, flag, positions):
+        """
+        Sets `flag` on every (x, y) in positions.
+        """
+        layer = self.layers[flag]
+        for x, y in positions:
+            layer[x] |= 1 << y
+
+    # --- Whole-board operations ---
+
+    def neighbors(self, layer):
+        """
+        Returns the layer of cells 4-adjacent to any set cell of `layer`.
+        """
+        last = self.rows - 1
+        result = []
+        for x, row in enumerate(layer):
+            spread = ((row << 1) | (row >> 1)) & self.row_mask
+            if x > 0:
+                spread |= layer[x - 1]
+            if x < last:
+                spread |= layer[x + 1]
+            result.append(spread)
+        return result
+
+    def update_clues(self):
+        """
+        Recomputes every clue layer from its source layer.
+        """
+        for clue_flag, source_flag in CLUE_SOURCES.items():
+            self.layers[clue_flag] = self.neighbors(self.layers[source_flag])
+
+    def union(self, *flags):
+        return [_or_rows(rows) for rows in zip(*(self.layers[flag] for flag in flags))]
+
+    def intersection(self, *flags):
+        return [_and_rows(rows) for rows in zip(*(self.layers[flag] for flag in flags))]
+
+    def difference(self, flag, *excluded):
+        blocked = self.union(*excluded) if excluded else [0] * self.rows
+        return [row & ~block for row, block in zip(self.layers[flag], blocked)]
+
+    def count(self, layer):
+        return sum(bin(row).count("1") for row in layer)
+
+    def positions(self, layer):
+        """
+        Yields the (x, y) cells set in `layer`.
+        """
+        for x, row in enumerate(layer):
+            while row:
+                low = row & -row
+                yield (x, low.bit_length() - 1)
+                row ^= low
+
+    # --- List-of-lists adapter ---
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, x):
+        if not 0 <= x < self.rows:
+            raise IndexError("bitboard row out of range")
+        return BitboardRow(self, x)
+
+
+class BitboardRow:
+    """
+    View of one row so that board[x][y] reads and writes combined cell bitmasks.
+    """
+
+    def __init__(self, board, x):
+        self.board = board
+        self.x = x
+
+    def __len__(self):
+        return self.board.cols
+
+    def __getitem__(self, y):
+        if not 0 <= y < self.board.cols:
+            raise IndexError("bitboard column out of range")
+        return self.board.cell(self.x, y)
+
+    def __setitem__(self, y, value):
+        self.board.set_cell(self.x, y, value)
+
+
+def _or_rows(rows):
+    value = 0
+    for row in rows:
+        value |= row
+    return value
+
+
+def _and_rows(rows):
+    value = -1
+    for row in rows:
+        value &= row
+    return value
@@ -0,0 +1,215 @@
+"""
+Precomputed adjacency and distance index for one board.
+
+Every cell is a flat index x * cols + y. The 4-neighbourhoods are stored CSR-style: the
+neighbours of cell i are cells[offsets[i]:offsets[i + 1]], always in the order Up, Down,
+Left, Right. Two tables are kept: all in-bounds neighbours (used for clues) and passable
+neighbours that are not obstacles (used for movement). BFS distance fields over the
+passable cells are computed once per target, such as the exit or a present, and then
+answer any distance query with a single lookup.
+
+Obstacles never move during a game, so the index is built once per board;
+set_obstacles rebuilds the passable table and drops the distance fields. The tables are
+built with a few whole-board NumPy operations when NumPy is installed (a 1000x1000 board
+takes well under a second), and with a Python loop over the cells otherwise. Boards of
+SPARSE_BOARD_CELLS cells or more keep no tables at all, since they would be the largest
+part of the game's memory: their neighbours are worked out from the board edges and the
+obstacle set on each call, which costs about as much as the table lookup.
+"""
+from array import array
+from collections import deque
+from functools import lru_cache
+
+from chunk_store import sparse_board
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+UNREACHABLE = -1
+
+class BoardIndex:
+    """
+    CSR adjacency (below SPARSE_BOARD_CELLS cells) and lazily built BFS distance fields for one board.
+    """
+
+    def __init__(self, grid_size, obstacles=()):
+        self.rows, self.cols = grid_size
+        self.size = self.rows * self.cols
+        if sparse_board(grid_size):
+            self.neighbor_offsets = self.neighbor_cells = None  # Computed per call instead
+        else:
+            self.neighbor_offsets, self.neighbor_cells = _open_adjacency(self.rows, self.cols)  # Shared per board size
+        self.set_obstacles(obstacles)
+
+    def set_obstacles(self, obstacles):
+        """
+        Rebuilds the passable adjacency for a new obstacle set and invalidates the distance fields.
+        """
+        self.obstacles = frozenset(tuple(obstacle) for obstacle in obstacles)
+        if self.neighbor_offsets is None:
+            self.passable_offsets = self.passable_cells = None
+        elif self.obstacles:
+            self.passable_offsets, self.passable_cells = _build_adjacency(self.rows, self.cols, self.obstacles)
+        else:
+            self.passable_offsets, self.passable_cells = self.neighbor_offsets, self.neighbor_cells
+        self._fields = {}
+
+    def cell_index(self, position):
+        return position[0] * self.cols + position[1]
+
+    def neighbors(self, position):
+        """
+        In-bounds 4-neighbours of a cell, Up, Down, Left, Right. Cells off the board have none.
+        """
+        if self.neighbor_offsets is None:
+            return self._compute_neighbors(position)
+        x, y = position
+        if not (0 <= x < self.rows and 0 <= y < self.cols):
+            return []  # The flat index would wrap onto another row
+        index = x * self.cols + y
+        offsets = self.neighbor_offsets
+        return [divmod(j, self.cols) for j in self.neighbor_cells[offsets[index]:offsets[index + 1]]]
+
+    def passable_neighbors(self, position):
+        """
+        In-bounds 4-neighbours that are not obstacles. Obstacle cells and cells off the board have none.
+        """
+        if self.passable_offsets is None:
+            if tuple(position) in self.obstacles:
+                return []
+            return [cell for cell in self._compute_neighbors(position) if cell not in self.obstacles]
+        x, y = position
+        if not (0 <= x < self.rows and 0 <= y < self.cols):
+            return []
+        index = x * self.cols + y
+        offsets = self.passable_offsets
+        return [divmod(j, self.cols) for j in self.passable_cells[offsets[index]:offsets[index + 1]]]
+
+    def _compute_neighbors(self, position):
+        x, y = position
+        rows, cols = self.rows, self.cols
+        if not (0 <= x < rows and 0 <= y < cols):
+            return []
+        cells = []
+        if x > 0:
+            cells.append((x - 1, y))  # Up
+        if x < rows - 1:
+            cells.append((x + 1, y))  # Down
+        if y > 0:
+            cells.append((x, y - 1))  # Left
+        if y < cols - 1:
+            cells.append((x, y + 1))  # Right
+        return cells
+
+    def distance_field(self, target):
+        """
+        Array of passable-path lengths from every cell to `target` (UNREACHABLE where there is no path).
+        Built with one BFS on first use and cached until the obstacles change.
+        """
+        target = tuple(target)
+        field = self._fields.get(target)
+        if field is None:
+            field = self._fields[target] = self._bfs(self.cell_index(target))
+        return field
+
+    def distance(self, position, target):
+        """
+        Passable-path length from position to target, or None when target cannot be reached.
+        """
+        steps = self.distance_field(target)[self.cell_index(position)]
+        return None if steps == UNREACHABLE else steps
+
+    def _bfs(self, source):
+        field = array("i", [UNREACHABLE]) * self.size
+        if divmod(source, self.cols) in self.obstacles:
+            return field
+        offsets, cells, cols = self.passable_offsets, self.passable_cells, self.cols
+        field[source] = 0
+        queue = deque([source])
+        while queue:
+            index = queue.popleft()
+            steps = field[index] + 1
+            if offsets is None:
+                neighbors = [x * cols + y for x, y in self.passable_neighbors(divmod(index, cols))]
+            else:
+                neighbors = cells[offsets[index]:offsets[index + 1]]
+            for neighbor in neighbors:
+                if field[neighbor] == UNREACHABLE:
+                    field[neighbor] = steps
+                    queue.append(neighbor)
+        return field
+
+
+def _build_adjacency(rows, cols, blocked=()):
+    """
+    CSR (offsets, cells) arrays of the 4-neighbourhoods of a board, leaving out `blocked` cells.
+    """
+    if np is not None:
+        return _build_adjacency_numpy(rows, cols, blocked)
+    blocked_mask = bytearray(rows * cols)
+    for x, y in blocked:
+        blocked_mask[x * cols + y] = 1
+    offsets = array("I", [0])
+    cells = array("I")
+    append = cells.append
+    for x in range(rows):
+        row_start = x * cols
+        up, down = x > 0, x < rows - 1
+        for index in range(row_start, row_start + cols):
+            if not blocked_mask[index]:
+                if up and not blocked_mask[index - cols]:
+                    append(index - cols)  # Up
+                if down and not blocked_mask[index + cols]:
+                    append(index + cols)  # Down
+                if index > row_start and not blocked_mask[index - 1]:
+                    append(index - 1)  # Left
+                if index < row_start + cols - 1 and not blocked_mask[index + 1]:
+                    append(index + 1)  # Right
+            offsets.append(len(cells))
+    return offsets, cells
+
+
+def _build_adjacency_numpy(rows, cols, blocked):
+    open_cells = np.ones((rows, cols), dtype=bool)
+    if blocked:
+        xs, ys = zip(*blocked)
+        open_cells[list(xs), list(ys)] = False
+    index = np.arange(rows * cols, dtype=np.uint32).reshape(rows, cols)
+
+    # Candidate neighbour of every cell in each direction, in the order Up, Down, Left, Right
+    candidates = np.zeros((rows, cols, 4), dtype=np.uint32)
+    valid = np.zeros((rows, cols, 4), dtype=bool)
+    candidates[1:, :, 0], valid[1:, :, 0] = index[:-1, :], open_cells[:-1, :]  # Up
+    candidates[:-1, :, 1], valid[:-1, :, 1] = index[1:, :], open_cells[1:, :]  # Down
+    candidates[:, 1:, 2], valid[:, 1:, 2] = index[:, :-1], open_cells[:, :-1]  # Left
+    candidates[:, :-1, 3], valid[:, :-1, 3] = index[:, 1:], open_cells[:, 1:]  # Right
+    valid &= open_cells[:, :, np.newaxis]  # Blocked cells have no neighbours
+
+    offsets = np.zeros(rows * cols + 1, dtype=np.uint32)
+    np.cumsum(valid.sum(axis=2, dtype=np.uint32).ravel(), out=offsets[1:])
+    cells = candidates[valid]  # Row-major order keeps each cell's neighbours together and in order
+    return _to_array(offsets), _to_array(cells)
+
+
+def _to_array(values):
+    result = array("I")
+    result.frombytes(values.astype(f"u{result.itemsize}").tobytes())
+    return result
+
+
+@lru_cache(maxsize=8)
+def _open_adjacency(rows, cols):
+    """
+    Adjacency of a board without obstacles. The arrays are never modified, so every index of that size shares them.
+    """
+    return _build_adjacency(rows, cols)
+
+
+@lru_cache(maxsize=8)
+def grid_index(grid_size):
+    """
+    Shared obstacle-free index for a board size, for routines that only need in-bounds neighbours.
+    """
+    return BoardIndex(tuple(grid_size))
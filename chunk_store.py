@@ -0,0 +1,103 @@
+"""
+Chunked per-cell storage for large boards.
+
+Tables with one entry per cell (grid flags, clue counts, Santa's knowledge) cost little on
+a 10x10 board but add up on a 1000x1000 one, where most cells are never looked at. A
+ChunkedArray splits such a table into chunks of STORAGE_CHUNK_CELLS consecutive cells
+(flat index x * cols + y) and allocates a chunk the first time a non-zero value is
+written into it; the other chunks read as zero. Memory then follows the part of the
+board that holds something rather than the board's area. ChunkedGrid does the same for
+the bitmask grid with one chunk per row, so grid[x][y] reads and writes a plain array.
+
+Boards below SPARSE_BOARD_CELLS cells keep flat arrays, which are a little faster;
+cell_array picks the representation for a board.
+"""
+from array import array
+
+from constants import SPARSE_BOARD_CELLS, STORAGE_CHUNK_CELLS
+
+
+def sparse_board(grid_size):
+    """
+    True when a board is large enough to keep its state in chunks and sparse maps.
+    """
+    return grid_size[0] * grid_size[1] >= SPARSE_BOARD_CELLS
+
+
+def cell_array(grid_size, typecode):
+    """
+    A zeroed table with one entry per cell, indexed by x * cols + y: a flat array.array,
+    or a ChunkedArray on large boards.
+    """
+    size = grid_size[0] * grid_size[1]
+    if sparse_board(grid_size):
+        return ChunkedArray(size, typecode)
+    return array(typecode, [0]) * size
+
+
+class ChunkedArray:
+    """
+    Flat table of numbers whose chunks are allocated on their first non-zero write.
+    Indexing matches array.array for indices 0..size-1.
+    """
+
+    def __init__(self, size, typecode, chunk_cells=STORAGE_CHUNK_CELLS):
+        self.size = size
+        self.typecode = typecode
+        self.chunk_cells = chunk_cells
+        self._chunks = {}  # Chunk number -> array of chunk_cells values
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        chunk = self._chunks.get(index // self.chunk_cells)
+        if chunk is None:
+            return 0
+        return chunk[index % self.chunk_cells]
+
+    def __setitem__(self, index, value):
+        key, offset = divmod(index, self.chunk_cells)
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            if not value:
+                return  # Unallocated chunks already read as zero
+            if not 0 <= index < self.size:
+                raise IndexError(f"Cell index {index} outside a table of {self.size}")
+            chunk = self._chunks[key] = array(self.typecode, [0]) * self.chunk_cells
+        chunk[offset] = value
+
+    def allocated_chunks(self):
+        return len(self._chunks)
+
+    def nbytes(self):
+        """
+        Bytes held by the allocated chunks.
+        """
+        return sum(chunk.itemsize * len(chunk) for chunk in self._chunks.values())
+
+
+class ChunkedGrid:
+    """
+    Bitmask grid read and written as grid[x][y] like the list-of-lists grid. Each row is a chunk:
+    an array of 16-bit values allocated the first time the row is used.
+    """
+
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self._rows = {}  # Row number -> array of cols cell values
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, x):
+        row = self._rows.get(x)
+        if row is None:
+            if not 0 <= x < self.rows:
+                raise IndexError(f"Row {x} outside a {self.rows}x{self.cols} grid")
+            row = self._rows[x] = array("H", [0]) * self.cols  # Every cell flag fits in 16 bits
+        return row
+
+    def allocated_rows(self):
+        return len(self._rows)
@@ -0,0 +1,108 @@
+"""
+Optional NumPy backend for clue computation.
+
+Each object class becomes a boolean array, and each clue layer is the object array
+spread to its four neighbours with shifted ORs, so the whole board is computed in a
+few array operations instead of a Python loop over objects and offsets.
+NumPy is optional: HAVE_NUMPY is False when it is not installed, and callers then
+keep using the pure-Python add_clues.
+"""
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+from constants import (
+    SANTA_FLAG,
+    PRESENT_FLAG,
+    OBSTACLE_FLAG,
+    EXIT_FLAG,
+    GRINCH_FLAG,
+    COOKIE_SMELL_FLAG,
+    FLOUR_SMELL_FLAG,
+    COLD_BREEZE_FLAG,
+    GRINCH_SOUND_FLAG,
+)
+
+HAVE_NUMPY = np is not None
+
+# Clue name -> (clue flag, flag of the object that produces it)
+CLUE_LAYERS = {
+    "cookie_smell": (COOKIE_SMELL_FLAG, PRESENT_FLAG),
+    "flour_smell": (FLOUR_SMELL_FLAG, OBSTACLE_FLAG),
+    "cold_breeze": (COLD_BREEZE_FLAG, EXIT_FLAG),
+    "grinch_sound": (GRINCH_SOUND_FLAG, GRINCH_FLAG),
+}
+
+
+def _require_numpy():
+    if not HAVE_NUMPY:
+        raise ImportError("The NumPy clue backend needs numpy: pip install numpy")
+
+
+def positions_to_mask(grid_size, positions):
+    """
+    Returns a boolean array with True at every (x, y) in positions.
+    """
+    _require_numpy()
+    mask = np.zeros(grid_size, dtype=bool)
+    positions = list(positions)
+    if positions:
+        rows, cols = zip(*positions)
+        mask[list(rows), list(cols)] = True
+    return mask
+
+
+def spread(mask):
+    """
+    Marks every cell 4-adjacent to a True cell of `mask` (the cell itself is not included).
+    """
+    _require_numpy()
+    result = np.zeros_like(mask)
+    result[1:, :] |= mask[:-1, :]   # Down
+    result[:-1, :] |= mask[1:, :]   # Up
+    result[:, 1:] |= mask[:, :-1]   # Right
+    result[:, :-1] |= mask[:, 1:]   # Left
+    return result
+
+
+def object_masks(grid_size, santa_position, grinch_position, exit_point, presents, obstacles):
+    """
+    Returns {flag: boolean array} for every object class.
+    """
+    return {
+        SANTA_FLAG: positions_to_mask(grid_size, [tuple(santa_position)]),
+        PRESENT_FLAG: positions_to_mask(grid_size, presents),
+        OBSTACLE_FLAG: positions_to_mask(grid_size, obstacles),
+        EXIT_FLAG: positions_to_mask(grid_size, [tuple(exit_point)]),
+        GRINCH_FLAG: positions_to_mask(grid_size, [tuple(grinch_position)]),
+    }
+
+
+def clue_masks(objects):
+    """
+    Returns {clue name: boolean array} computed from the object masks.
+    """
+    return {name: spread(objects[source]) for name, (_, source) in CLUE_LAYERS.items()}
+
+
+def empty_grid(grid_size):
+    """
+    An int32 grid with no flags set, the representation combined_grid returns.
+    """
+    _require_numpy()
+    return np.zeros(grid_size, dtype=np.int32)
+
+
+def combined_grid(grid_size, santa_position, grinch_position, exit_point, presents, obstacles):
+    """
+    Builds the whole bitmask grid (objects and clues) as an int32 array.
+    It supports grid[x][y] & FLAG like the list-of-lists grid.
+    """
+    objects = object_masks(grid_size, santa_position, grinch_position, exit_point, presents, obstacles)
+    grid = empty_grid(grid_size)
+    for flag, mask in objects.items():
+        grid |= mask * np.int32(flag)
+    for name, mask in clue_masks(objects).items():
+        grid |= mask * np.int32(CLUE_LAYERS[name][0])
+    return grid
@@ -1,40 +1,126 @@
-# Screen Dimensions
-SCREEN_WIDTH = 800
-SCREEN_HEIGHT = 600
-
-# Grid Settings
-GRID_ROWS = 10
-GRID_COLS = 10
-CELL_SIZE = SCREEN_WIDTH // GRID_COLS  # Dynamically calculate cell size to fit the screen width
-
-# Core Colors
-COLORS = {
-    "background": (255, 255, 255),  # White background
-    "grid": (200, 200, 200),        # Light gray grid lines
-    "black": (0, 0, 0),             # Black text
-}
-
-# Game Element Colors
-ELEMENT_COLORS = {
-    "santa": (255, 0, 0),           # Red for Santa
-    "grinch": (0, 128, 0),          # Green for the Grinch
-    "obstacle": (0, 0, 0),          # Black for obstacles
-    "present": (255, 255, 0),       # Yellow for presents
-    "exit": (0, 0, 255),            # Blue for the exit
-}
-
-# Clue and Hint Colors
-CLUE_COLORS = {
-    "cookie_smell": (255, 255, 0),  # Yellow for cookie smell (presents proximity)
-    "flour_smell": (169, 169, 169), # Dark gray for flour smell (obstacles proximity)
-    "cold_breeze": (0, 191, 255),   # Light blue for cold breeze (exit proximity)
-    "grinch_sound": (0, 100, 0),    # Dark green for Grinch's sound proximity
-}
-
-# Legend Labels
-LEGEND_LABELS = {
-    "Cookie Smell": CLUE_COLORS["cookie_smell"],
-    "Uncovered Steps": CLUE_COLORS["flour_smell"],  # Updated label for consistency
-    "Cold Breeze": CLUE_COLORS["cold_breeze"],
-    "Grinch Sound": CLUE_COLORS["grinch_sound"],
-}
+# Screen Dimensions
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+
+# Grid Settings
+GRID_ROWS = 10
+GRID_COLS = 10
+CELL_SIZE = SCREEN_WIDTH // GRID_COLS  # Dynamically calculate cell size to fit the screen width
+
+# Grid Cell Flags (bitmask values stored in each grid cell)
+SANTA_FLAG = 1
+PRESENT_FLAG = 2
+OBSTACLE_FLAG = 4
+EXIT_FLAG = 8
+GRINCH_FLAG = 16
+COOKIE_SMELL_FLAG = 32   # Next to a present
+FLOUR_SMELL_FLAG = 64    # Next to an obstacle
+COLD_BREEZE_FLAG = 128   # Next to the exit
+GRINCH_SOUND_FLAG = 256  # Next to the Grinch
+
+# Board Layout
+OBSTACLE_COUNT = 15
+PRESENT_COUNT = 5
+OBSTACLE_DENSITY = OBSTACLE_COUNT / (GRID_ROWS * GRID_COLS)  # Obstacle share of the cells, for any board size
+LEVEL_MAX_ATTEMPTS = 1000  # Layouts drawn before giving up on a solvable one (see levels.py)
+GRINCH_MOVE_INTERVAL_MS = 2000  # The Grinch moves every 2 seconds in the pygame UI
+
+# Frame Pacing (see scheduler.py)
+TARGET_FPS = 30         # Render rate while the player is active
+IDLE_FPS = 5            # Render rate after IDLE_AFTER_MS without input
+IDLE_AFTER_MS = 3000
+SIM_TICK_MS = 100       # Fixed simulation timestep (one autonomous move per tick)
+
+# Large-board mode ("Large Board" in the main menu, see viewport.py)
+LARGE_GRID_ROWS = 1000
+LARGE_GRID_COLS = 1000
+LARGE_CELL_SIZE = 32    # Cells keep this size and the view scrolls with Santa
+CHUNK_CELLS = 8         # Side of a pre-rendered chunk, in cells
+CHUNK_CACHE_SIZE = 128  # Chunk surfaces kept (LRU); at 32 px cells each is 256 KB
+
+# Boards with at least this many cells keep their game state in chunks and sparse maps
+# instead of per-cell tables (see chunk_store.py)
+SPARSE_BOARD_CELLS = 250000
+STORAGE_CHUNK_CELLS = 4096  # Consecutive cells per storage chunk, allocated on first write
+BELIEF_PRUNE = 1e-6         # Sparse Grinch belief: smaller deviations are dropped
+BELIEF_SPARSE_CELLS = 2048  # and beyond this many cells the deviation is folded away (see belief.py)
+
+# Grid representation built by engine.build_grid: "lists" (list of lists of ints),
+# "bitboard" (one row-bitmask layer per flag, see bitboard.py), "numpy" (vectorized
+# clue computation, see clue_field.py; needs numpy) or "chunked" (see chunk_store.py,
+# which boards of SPARSE_BOARD_CELLS cells or more always use)
+GRID_BACKEND = "lists"
+
+# Assets
+ASSET_DIR = "assets"              # Sprite images
+ASSET_CACHE_DIR = ".asset_cache"  # Pre-scaled sprite atlases (safe to delete)
+
+# Rendered text surfaces kept by text_cache.py
+TEXT_CACHE_SIZE = 256
+
+# Core Colors
+COLORS = {
+    "background": (255, 255, 255),  # White background
+    "grid": (200, 200, 200),        # Light gray grid lines
+    "black": (0, 0, 0),             # Black text
+}
+
+# Game Element Colors
+ELEMENT_COLORS = {
+    "santa": (255, 0, 0),           # Red for Santa
+    "grinch": (0, 128, 0),          # Green for the Grinch
+    "obstacle": (0, 0, 0),          # Black for obstacles
+    "present": (255, 255, 0),       # Yellow for presents
+    "exit": (0, 0, 255),            # Blue for the exit
+}
+
+# Clue and Hint Colors
+CLUE_COLORS = {
+    "cookie_smell": (255, 255, 0),  # Yellow for cookie smell (presents proximity)
+    "flour_smell": (169, 169, 169), # Dark gray for flour smell (obstacles proximity)
+    "cold_breeze": (0, 191, 255),   # Light blue for cold breeze (exit proximity)
+    "grinch_sound": (0, 100, 0),    # Dark green for Grinch's sound proximity
+}
+
+# Legend Labels
+LEGEND_LABELS = {
+    "Cookie Smell": CLUE_COLORS["cookie_smell"],
+    "Uncovered Steps": CLUE_COLORS["flour_smell"],  # Updated label for consistency
+    "Cold Breeze": CLUE_COLORS["cold_breeze"],
+    "Grinch Sound": CLUE_COLORS["grinch_sound"],
+}
+
+# Solver Settings
+# "inference": in-process forward chaining, "prover9": external prover,
+# "crosscheck": run both and report any disagreement
+SOLVER_BACKEND = "inference"
+
+# Path to the external Prover9 binary used by the "prover9" and "crosscheck" backends
+PROVER9_PATH = "/mnt/c/Users/aly27/OneDrive/Desktop/UT/AI/LADR-2009-11A/LADR-2009-11A/bin/prover9"
+# Write the static rules to a file once per worker and run "prover9 -f theory.in /dev/stdin",
+# so only the per-step facts and goals are sent on each run (needs a system with /dev/stdin)
+PROVER9_PRELOAD_THEORY = False
+
+# Prover9 decisions memoized on Santa's neighbourhood (see move_cache.py)
+MOVE_CACHE_SIZE = 4096
+MOVE_CACHE_FILE = None  # Set to a path such as "move_cache.json" to keep the cache between runs
+
+# In the pygame UI the solver runs in the background (see async_solver.py); a decision
+# that takes longer than this falls back to select_best_move
+SOLVER_DEADLINE_MS = 500
+
+# Autonomous mode strategy: "solver" asks SOLVER_BACKEND for each move,
+# "planner" follows an A* tour over the presents (see game_logic.TourPlanner)
+AUTO_STRATEGY = "solver"
+PLANNER_LOOKAHEAD = 3  # Path cells checked against the Grinch's danger zone before replanning
+
+# Santa's knowledge base (see knowledge.py)
+KNOWLEDGE_DECAY_TICKS = 20  # Grinch sightings are forgotten this many ticks after they were last confirmed
+
+# Logging and tracing (see tracing.py)
+LOG_LEVEL = "WARNING"  # "DEBUG" shows every solver step
+TRACE_REPORT = None  # Path such as "trace_report.json" for per-span timing histograms at exit
+TRACE_CHROME = None  # Path such as "trace.json" for a Chrome trace of every span
+
+# Replays
+REPLAY_DIR = "replays"  # Directory for recorded games; None disables recording
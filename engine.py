@@ -0,0 +1,357 @@
+"""
+Headless game-state engine for Santa's Escape Room.
+
+GameState owns the board, applies Santa's actions, moves the Grinch, checks
+collisions and decides win or loss. It never imports pygame, so games can be
+simulated without a display; main.start_game only draws what it holds.
+"""
+import random
+import time
+
+from constants import (
+    GRID_ROWS,
+    GRID_COLS,
+    SANTA_FLAG,
+    PRESENT_FLAG,
+    OBSTACLE_FLAG,
+    EXIT_FLAG,
+    GRINCH_FLAG,
+    GRINCH_SOUND_FLAG,
+    GRID_BACKEND,
+    AUTO_STRATEGY,
+)
+from async_solver import AsyncSolver
+from belief import GrinchBelief, SparseGrinchBelief, HAVE_NUMPY
+from bitboard import Bitboard
+from board_index import BoardIndex
+from chunk_store import ChunkedGrid, sparse_board
+import clue_field
+from game_logic import (
+    TourPlanner,
+    add_clues,
+    check_collision,
+    grinch_move,
+    manual_move,
+    play_game,
+    solver_message,
+)
+from incremental_grid import IncrementalGrid
+from knowledge import KnowledgeBase
+from levels import generate_level
+from tracing import span
+from validator import update_clues
+
+DIRECTIONS = ("UP", "DOWN", "LEFT", "RIGHT")
+AUTO = "AUTO"  # Switches Santa to autonomous mode
+
+# Game status values
+PLAYING = "playing"
+WON = "won"
+LOST = "lost"
+
+
+def build_grid(grid_size, santa_position, grinch_position, exit_point, presents, obstacles, backend=None):
+    """
+    Builds the bitmask grid (objects and clues) that the solver reads.
+    The backend ("lists", "bitboard", "numpy" or "chunked") defaults to GRID_BACKEND; all support
+    grid[x][y] & FLAG.
+    """
+    backend = backend or GRID_BACKEND
+    if backend == "chunked":
+        return build_grid_model(grid_size, santa_position, grinch_position, exit_point, presents, obstacles,
+                                backend).grid
+    if backend == "bitboard":
+        return Bitboard.from_positions(grid_size, santa_position, grinch_position, exit_point, presents, obstacles)
+    if backend == "numpy":
+        return clue_field.combined_grid(grid_size, santa_position, grinch_position, exit_point, presents, obstacles)
+    if backend != "lists":
+        raise ValueError(f"Unknown grid backend: {backend}")
+
+    rows, cols = grid_size
+    grid = [[0 for _ in range(cols)] for _ in range(rows)]
+    grid[santa_position[0]][santa_position[1]] |= SANTA_FLAG
+    grid[grinch_position[0]][grinch_position[1]] |= GRINCH_FLAG
+    grid[exit_point[0]][exit_point[1]] |= EXIT_FLAG
+    for present in presents:
+        grid[present[0]][present[1]] |= PRESENT_FLAG
+    for obstacle in obstacles:
+        grid[obstacle[0]][obstacle[1]] |= OBSTACLE_FLAG
+
+    add_clues(grid, presents, obstacles, exit_point, grinch_position, grid_size)
+    return grid
+
+
+def empty_grid(grid_size, backend=None):
+    """
+    Returns a grid with no flags set, in the representation chosen by `backend`.
+    """
+    backend = backend or GRID_BACKEND
+    if backend == "bitboard":
+        return Bitboard(*grid_size)
+    if backend == "chunked":
+        return ChunkedGrid(*grid_size)
+    if backend == "numpy":
+        return clue_field.empty_grid(grid_size)
+    if backend != "lists":
+        raise ValueError(f"Unknown grid backend: {backend}")
+    rows, cols = grid_size
+    return [[0 for _ in range(cols)] for _ in range(rows)]
+
+
+def build_grid_model(grid_size, santa_position, grinch_position, exit_point, presents, obstacles, backend=None):
+    """
+    Stamps every object into an IncrementalGrid that is then kept current through deltas.
+    """
+    model = IncrementalGrid(empty_grid(grid_size, backend))
+    model.add_object(SANTA_FLAG, santa_position)
+    model.add_object(GRINCH_FLAG, grinch_position)
+    model.add_object(EXIT_FLAG, exit_point)
+    model.add_objects(PRESENT_FLAG, presents, track_changes=False)
+    model.add_objects(OBSTACLE_FLAG, obstacles, track_changes=False)
+    model.take_changes()
+    return model
+
+
+class GameState:
+    """
+    Complete state of one game, advanced with step(action).
+    """
+
+    def __init__(self, grid_size=(GRID_ROWS, GRID_COLS), seed=None, grinch_period=None, backend=None,
+                 recorder=None, layout=None, strategy=None, solver_deadline_ms=None):
+        """
+        seed: seeds the game's own random generator (layout and Grinch moves); drawn at random when None.
+        Replay logs store it as a 64-bit unsigned integer, so it must lie in 0..2**64-1.
+        layout: a pre-generated (grinch, exit, obstacles, presents) board, e.g. from levels.BoardStore;
+        by default a solvable board is generated from the seed.
+        strategy: "solver" or "planner" for autonomous mode, defaulting to AUTO_STRATEGY.
+        grinch_period: move the Grinch every N ticks (None leaves it to the caller, as the UI timer does).
+        backend: solver backend for autonomous mode, defaulting to SOLVER_BACKEND.
+        recorder: optional replay.ReplayWriter that receives every action and tick.
+        solver_deadline_ms: run the "solver" strategy in the background (see async_solver.py) so
+        tick never blocks on a proof; Santa waits while a decision runs and takes the fallback
+        move after this many milliseconds. None decides synchronously within tick.
+        """
+        self.grid_size = tuple(grid_size)
+        self.seed = seed if seed is not None else random.randrange(2 ** 63)
+        if not 0 <= self.seed < 2 ** 64:
+            raise ValueError(f"Seeds are recorded as 64-bit unsigned integers; got {seed}")
+        self.rng = random.Random(self.seed)
+        self.recorder = recorder
+        self.grinch_period = grinch_period
+        self.backend = backend
+        self.solver_deadline_ms = solver_deadline_ms
+
+        if layout is None:
+            layout = generate_level(self.grid_size, self.rng)
+        grinch_position, exit_point, obstacles, presents = layout
+        self.grinch_position = list(grinch_position)
+        self.exit_point = tuple(exit_point)
+        self.obstacles = set(obstacles)
+        self.presents = set(presents)
+        self.santa_position = [0, 0]
+        self.last_position = [0, 0]  # The cell Santa came from, which the solver avoids going back to
+        self.total_presents = len(self.presents)
+        self.collected_presents = 0
+        self.known_clues = KnowledgeBase(self.grid_size)
+        self.auto_mode = False
+        self.feedback_message = "Welcome to Santa's Escape Room!"
+        self.outcome_message = None
+        self.status = PLAYING
+        self.steps = 0
+        self.solver_time = 0.0
+        self.strategy = strategy or AUTO_STRATEGY
+        if self.strategy not in ("solver", "planner"):
+            raise ValueError(f"Unknown autonomous strategy: {self.strategy}")
+        self.board_index = BoardIndex(self.grid_size, self.obstacles)  # Obstacles never move during a game
+        # Santa's belief about where the Grinch is, built when the solver takes over (see handle_action)
+        self.grinch_belief = None
+        self.planner = None
+        if self.strategy == "planner":
+            self.planner = TourPlanner(self.board_index, self.exit_point)
+        self.async_solver = None
+        if solver_deadline_ms is not None and self.strategy == "solver":
+            self.async_solver = AsyncSolver(self.grid_size, backend, solver_deadline_ms)
+        self.grid_model = build_grid_model(self.grid_size, self.santa_position, self.grinch_position,
+                                           self.exit_point, self.presents, self.obstacles,
+                                           "chunked" if sparse_board(self.grid_size) else None)
+
+    @property
+    def grid(self):
+        """
+        Current bitmask grid, maintained incrementally as objects move.
+        """
+        return self.grid_model.grid
+
+    def step(self, action=None):
+        """
+        Advances the game by one tick: applies the action, moves the Grinch when due,
+        lets Santa decide in autonomous mode and resolves win or loss. Returns the status.
+        """
+        self.handle_action(action)
+        due = bool(self.grinch_period) and (self.steps + 1) % self.grinch_period == 0
+        return self.tick(move_grinch=due)
+
+    def handle_action(self, action):
+        """
+        Applies one player action: a direction in manual mode, or AUTO to hand control to the solver.
+        """
+        if self.status != PLAYING or action is None:
+            return
+        if self.recorder:
+            self.recorder.record_action(action)
+        if action == AUTO:
+            self.auto_mode = True
+            if self.strategy == "solver" and self.grinch_belief is None:
+                # Only the solver reads the belief, so manual play and the planner never pay for it
+                self.grinch_belief = self._new_belief()
+            self.feedback_message = "Autonomous mode activated!"
+        elif action in DIRECTIONS and not self.auto_mode:
+            new_position = manual_move(self.santa_position, action, self.grid_size)
+            if new_position != self.santa_position:
+                self._move_santa(new_position)
+        if self.status != PLAYING:
+            self.close_replay()
+
+    def tick(self, move_grinch=False, solver_move=None):
+        """
+        Runs the per-frame part of a step: the Grinch move, the autonomous move and the outcome.
+        solver_move replaces the solver's decision, which is how replays feed recorded decisions back.
+        """
+        if self.status != PLAYING:
+            return self.status
+        self.steps += 1
+        self.known_clues.advance(self.steps)
+
+        if move_grinch:
+            with span("grinch.move"):
+                old_position = self.grinch_position
+                self.grinch_position = grinch_move(self.grinch_position, self.grid_size, self.obstacles, self.rng,
+                                                   self.board_index)
+                self.grid_model.move_object(GRINCH_FLAG, old_position, self.grinch_position)
+                if self.grinch_belief is not None:
+                    self.grinch_belief.predict()
+        if self.grinch_belief is not None:
+            with span("belief.observe"):
+                santa_x, santa_y = self.santa_position
+                heard = bool(self.grid[santa_x][santa_y] & GRINCH_SOUND_FLAG)
+                self.grinch_belief.observe(self.santa_position, heard)
+
+        solver_offset = None
+        solver_waiting = missed_deadline = False
+        if self.auto_mode and solver_move is not None:
+            solver_offset = (solver_move[0] - self.santa_position[0], solver_move[1] - self.santa_position[1])
+            if list(solver_move) != self.santa_position:
+                self._move_santa(list(solver_move))
+        elif self.auto_mode and self.async_solver is not None:
+            start = time.perf_counter()
+            missed_deadlines = self.async_solver.missed_deadlines
+            next_position = self._background_move()
+            self.solver_time += time.perf_counter() - start
+            missed_deadline = self.async_solver.missed_deadlines > missed_deadlines
+            if next_position is None:
+                solver_waiting = True  # Recorded as such, so replays keep Santa in place without the solver
+            else:
+                solver_offset = (next_position[0] - self.santa_position[0],
+                                 next_position[1] - self.santa_position[1])
+                if next_position != self.santa_position:
+                    # As in the synchronous path, what Santa runs into replaces the solver's message
+                    self.feedback_message = solver_message(self.backend)
+                    self._move_santa(next_position)
+            if self.status == PLAYING:
+                self._submit_decision()
+        elif self.auto_mode:
+            start = time.perf_counter()
+            with span("auto.move"):
+                next_position, self.feedback_message = play_game(
+                    self.santa_position,
+                    None,
+                    self.auto_mode,
+                    self._game_clues(),
+                    self.known_clues,
+                    self.grid,
+                    self.grid_size,
+                    self.planner,
+                    self.grinch_belief,
+                    self.last_position,
+                    self.backend
+                )
+            self.solver_time += time.perf_counter() - start
+            solver_offset = (next_position[0] - self.santa_position[0], next_position[1] - self.santa_position[1])
+            if list(next_position) != self.santa_position:
+                self._move_santa(list(next_position))
+
+        if self.recorder:
+            self.recorder.record_tick(move_grinch, self.santa_position, self.grinch_position, solver_offset,
+                                      solver_waiting, missed_deadline)
+        self._resolve()
+        if self.status != PLAYING:
+            self.close_replay()
+        return self.status
+
+    def _new_belief(self):
+        """
+        A sparse belief on large boards (see chunk_store.py), the NumPy one elsewhere, or None without NumPy.
+        """
+        if sparse_board(self.grid_size):
+            return SparseGrinchBelief(self.board_index)
+        return GrinchBelief(self.board_index) if HAVE_NUMPY else None
+
+    def _game_clues(self):
+        return {"cookie_smell": self.presents, "grinch_sound": {tuple(self.grinch_position)}}
+
+    def _submit_decision(self):
+        """
+        Observes Santa's surroundings and starts the background decision for his cell, unless one is running.
+        """
+        if self.async_solver.pending is None:
+            clues = self._game_clues()
+            update_clues(self.santa_position, clues, self.known_clues, self.grid_size)
+            self.async_solver.submit(self.santa_position, self.last_position, clues, self.grid,
+                                     self.grinch_belief)
+
+    def _background_move(self):
+        """
+        Santa's next cell from the background solver, or None while it is still deciding.
+        """
+        self._submit_decision()
+        return self.async_solver.poll(self.santa_position, self._game_clues(), self.grid, self.grinch_belief)
+
+    def close_replay(self):
+        """
+        Writes the end record and closes the replay log, if the game is being recorded.
+        Called automatically when the game ends; callers that quit early call it themselves.
+        """
+        if self.recorder:
+            self.recorder.record_end(self.status, self.steps, self.collected_presents)
+            self.recorder.close()
+            self.recorder = None
+
+    def _move_santa(self, new_position):
+        self.grid_model.move_object(SANTA_FLAG, self.santa_position, new_position)
+        self.last_position = list(self.santa_position)
+        self.santa_position = new_position
+        message = check_collision(self.santa_position, self.grinch_position, self.presents, self.obstacles,
+                                  self.exit_point)
+        if message == "Present collected!":
+            self.collected_presents += 1
+            self.grid_model.remove_object(PRESENT_FLAG, self.santa_position)
+        if message == "Blocked by an obstacle!":
+            self._finish(LOST, "The kids outsmarted you! Your steps are uncovered with flour.")
+        self.feedback_message = message
+
+    def _resolve(self):
+        if self.status != PLAYING:
+            return
+        # Win Condition
+        if tuple(self.santa_position) == self.exit_point and not self.presents:
+            self._finish(WON, "Santa saved the Christmas!")
+        # Lose Condition
+        elif self.santa_position == list(self.grinch_position):
+            self._finish(LOST, "Grinch stole the Christmas!")
+
+    def _finish(self, status, message):
+        if self.async_solver is not None:
+            self.async_solver.cancel()
+        self.status = status
+        self.outcome_message = message
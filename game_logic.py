@@ -1,136 +1,313 @@
-import random
-from constants import GRID_ROWS, GRID_COLS
-from validator import validate_move_and_update, update_clues, generate_neighbors
-
-
-def santa_move(santa_position, direction):
-    """
-    Calculates Santa's new position based on the input direction.
-    """
-    new_position = santa_position[:]
-    if direction == "UP":
-        new_position[0] -= 1
-    elif direction == "DOWN":
-        new_position[0] += 1
-    elif direction == "LEFT":
-        new_position[1] -= 1
-    elif direction == "RIGHT":
-        new_position[1] += 1
-    return new_position
-
-    """
-    Handles collisions with obstacles, presents, the Grinch, and the exit.
-    """
-    santa_tuple = tuple(santa_position)
-
-    # Check if Santa is caught by the Grinch
-    if santa_tuple == tuple(grinch_position):
-        return "Santa caught by the Grinch! Game Over!"
-
-    # Check for presents
-    if santa_tuple in presents:
-        presents.remove(santa_tuple)
-        return "Present collected!"
-
-    # Check for obstacles
-    if santa_tuple in obstacles:
-        return "Blocked by an obstacle!"
-
-    # Check for exit
-    if santa_tuple == exit_point:
-        if len(presents) == 0:
-            return "Congratulations! You've saved Christmas!"
-        else:
-            return "Collect all presents before exiting!"
-
-    return "Move successful!"
-
-
-def grinch_move(grinch_position, grid_size, obstacles):
-    """
-    Moves the Grinch randomly in one of the four directions: up, down, left, or right.
-    Grinch avoids obstacles and respects grid boundaries.
-    """
-    directions = [
-        (0, -1),  # Left
-        (0, 1),   # Right
-        (-1, 0),  # Up
-        (1, 0),   # Down
-    ]
-
-    random.shuffle(directions)  # Shuffle directions to make movement random
-
-    for dx, dy in directions:
-        new_x = grinch_position[0] + dx
-        new_y = grinch_position[1] + dy
-
-        # Check if the new position is within grid boundaries and not an obstacle
-        if 0 <= new_x < grid_size[0] and 0 <= new_y < grid_size[1]:
-            if (new_x, new_y) not in obstacles:
-                return [new_x, new_y]
-
-    # If no valid move is found, stay in the same position
-    return grinch_position
-
-def check_collision(santa_position, grinch_position, presents, obstacles, exit_point):
-    """
-    Handles collisions with obstacles, presents, the Grinch, and the exit.
-    """
-    santa_tuple = tuple(santa_position)
-
-    # Check if Santa is caught by the Grinch
-    if santa_tuple == tuple(grinch_position):
-        return "Santa caught by the Grinch! Game Over!"
-
-    # Check for presents
-    if santa_tuple in presents:
-        presents.remove(santa_tuple)
-        return "Present collected!"
-
-    # Check for obstacles
-    if santa_tuple in obstacles:
-        return "Blocked by an obstacle!"
-
-    # Check for exit
-    if santa_tuple == exit_point:
-        if len(presents) == 0:
-            return "Congratulations! You've saved Christmas!"
-        else:
-            return "Collect all presents before exiting!"
-
-    return "Move successful!"
-
-def determine_next_move(santa_position, last_position, clues, grid, known_clues, grid_size):
-    """
-    Determines the next move for Santa using Prover9 validation or manual fallback.
-    """
-    # Update clues based on adjacent cells
-    known_clues = update_clues(santa_position, clues, known_clues, grid_size)
-
-    # Use Prover9 to validate and determine the next move
-    next_position = validate_move_and_update(santa_position, last_position, clues, grid, grid_size)
-    return next_position
-
-def manual_move(santa_position, direction, grid_size):
-    """
-    Moves Santa manually based on player input.
-    """
-    new_position = santa_move(santa_position, direction)
-    if 0 <= new_position[0] < GRID_ROWS and 0 <= new_position[1] < GRID_COLS:
-        return new_position
-    return santa_position
-
-def play_game(santa_position, direction, auto_mode, clues, known_clues, grid, grid_size):
-    """
-    Handles the main game logic, allowing both manual and autonomous play.
-    """
-    if auto_mode:
-        # Autonomous mode: Use Prover9 to determine the next move
-        last_position = [santa_position[0], santa_position[1]]
-        next_position = determine_next_move(santa_position, last_position, clues, grid, known_clues, grid_size)
-        return next_position, "Prover9 determined the next move."
-    else:
-        # Manual mode: Move based on player input
-        new_position = manual_move(santa_position, direction, grid_size)
-        feedback_message = check_collision(new_position, None, clues.get("cookie_smell", []), grid, None)
-        return new_position, feedback_message
+import heapq
+import random
+from board_index import grid_index
+from constants import GRID_ROWS, GRID_COLS, PLANNER_LOOKAHEAD, SOLVER_BACKEND
+from validator import validate_move_and_update, update_clues, generate_neighbors
+
+
+def santa_move(santa_position, direction):
+    """
+    Calculates Santa's new position based on the input direction.
+    """
+    new_position = santa_position[:]
+    if direction == "UP":
+        new_position[0] -= 1
+    elif direction == "DOWN":
+        new_position[0] += 1
+    elif direction == "LEFT":
+        new_position[1] -= 1
+    elif direction == "RIGHT":
+        new_position[1] += 1
+    return new_position
+
+    """
+    Handles collisions with obstacles, presents, the Grinch, and the exit.
+    """
+    santa_tuple = tuple(santa_position)
+
+    # Check if Santa is caught by the Grinch
+    if santa_tuple == tuple(grinch_position):
+        return "Santa caught by the Grinch! Game Over!"
+
+    # Check for presents
+    if santa_tuple in presents:
+        presents.remove(santa_tuple)
+        return "Present collected!"
+
+    # Check for obstacles
+    if santa_tuple in obstacles:
+        return "Blocked by an obstacle!"
+
+    # Check for exit
+    if santa_tuple == exit_point:
+        if len(presents) == 0:
+            return "Congratulations! You've saved Christmas!"
+        else:
+            return "Collect all presents before exiting!"
+
+    return "Move successful!"
+
+
+def grinch_move(grinch_position, grid_size, obstacles, rng=random, board_index=None):
+    """
+    Moves the Grinch randomly in one of the four directions: up, down, left, or right.
+    Grinch avoids obstacles and respects grid boundaries.
+    Pass a seeded random.Random as `rng` to make the move reproducible, and the board's
+    BoardIndex to read the passable neighbours from its precomputed adjacency.
+    """
+    if board_index is not None:
+        moves = board_index.passable_neighbors(grinch_position)
+    else:
+        moves = [cell for cell in grid_index(tuple(grid_size)).neighbors(grinch_position) if cell not in obstacles]
+
+    # If no valid move is found, stay in the same position
+    if not moves:
+        return grinch_position
+    return list(rng.choice(moves))
+
+def check_collision(santa_position, grinch_position, presents, obstacles, exit_point):
+    """
+    Handles collisions with obstacles, presents, the Grinch, and the exit.
+    """
+    santa_tuple = tuple(santa_position)
+
+    # Check if Santa is caught by the Grinch
+    if santa_tuple == tuple(grinch_position):
+        return "Santa caught by the Grinch! Game Over!"
+
+    # Check for presents
+    if santa_tuple in presents:
+        presents.remove(santa_tuple)
+        return "Present collected!"
+
+    # Check for obstacles
+    if santa_tuple in obstacles:
+        return "Blocked by an obstacle!"
+
+    # Check for exit
+    if santa_tuple == exit_point:
+        if len(presents) == 0:
+            return "Congratulations! You've saved Christmas!"
+        else:
+            return "Collect all presents before exiting!"
+
+    return "Move successful!"
+
+def add_clues(grid, presents, obstacles, exit_point, grinch_position, grid_size=(GRID_ROWS, GRID_COLS)):
+    """
+    Adds clues to adjacent cells for specific objects:
+    - Cookie smell for presents.
+    - Flour smell for obstacles.
+    - Cold breeze for the exit.
+    - Grinch sound for the Grinch.
+    """
+    index = grid_index(tuple(grid_size))  # Precomputed in-bounds neighbours
+
+    for present in presents:
+        for nx, ny in index.neighbors(present):
+            grid[nx][ny] |= 32  # Cookie smell clue
+
+    for obstacle in obstacles:
+        for nx, ny in index.neighbors(obstacle):
+            grid[nx][ny] |= 64  # Flour smell clue
+
+    for nx, ny in index.neighbors(exit_point):
+        grid[nx][ny] |= 128  # Cold breeze clue
+
+    for nx, ny in index.neighbors(grinch_position):
+        grid[nx][ny] |= 256  # Grinch sound clue
+
+
+def astar_path(start, goal, board_index, blocked=frozenset()):
+    """
+    Shortest path from start to goal over the board's passable cells, also avoiding `blocked`.
+    A* is guided by the goal's BFS distance field, which is exact when nothing extra is
+    blocked. Returns the cells after start up to and including goal, or None when goal
+    cannot be reached.
+    """
+    start, goal = tuple(start), tuple(goal)
+    if start == goal:
+        return []
+    field = board_index.distance_field(goal)
+    cols = board_index.cols
+    if field[start[0] * cols + start[1]] < 0:
+        return None  # Walled off even without the extra blocked cells
+    open_heap = [(field[start[0] * cols + start[1]], 0, start)]
+    came_from = {start: None}
+    cost = {start: 0}
+
+    while open_heap:
+        _, steps, cell = heapq.heappop(open_heap)
+        if cell == goal:
+            path = []
+            while cell != start:
+                path.append(cell)
+                cell = came_from[cell]
+            return path[::-1]
+        if steps > cost[cell]:
+            continue  # Stale heap entry
+        for neighbor in board_index.passable_neighbors(cell):
+            if neighbor not in blocked and (neighbor not in cost or steps + 1 < cost[neighbor]):
+                cost[neighbor] = steps + 1
+                came_from[neighbor] = cell
+                estimate = steps + 1 + field[neighbor[0] * cols + neighbor[1]]
+                heapq.heappush(open_heap, (estimate, steps + 1, neighbor))
+    return None
+
+
+class TourPlanner:
+    """
+    Global path planner for autonomous mode.
+
+    Orders the remaining presents with a nearest-neighbour tour improved by 2-opt, using
+    path lengths from the board index's distance fields, and always ends the tour at the exit. Santa then walks
+    the planned path one cell per call. Only the leg to the current target is replanned,
+    and only when the Grinch's danger zone (its cell and the cells it can reach in one
+    move) lies on the next PLANNER_LOOKAHEAD cells of the path or a target disappears.
+    """
+
+    def __init__(self, board_index, exit_point, lookahead=PLANNER_LOOKAHEAD):
+        self.board_index = board_index
+        self.exit_point = tuple(exit_point)
+        self.lookahead = lookahead
+        self.tour = []  # Remaining targets in visiting order, ending at the exit
+        self.path = []  # Cells still to walk towards tour[0]
+        self.replans = 0
+
+    def distance(self, start, goal):
+        """
+        Path length between two cells around the obstacles, read from goal's distance field.
+        """
+        steps = self.board_index.distance(start, goal)
+        return float("inf") if steps is None else steps
+
+    def plan_tour(self, santa_position, presents):
+        """
+        Nearest-neighbour ordering of the presents from Santa's cell, improved with 2-opt.
+        """
+        remaining = set(presents)
+        current = tuple(santa_position)
+        order = []
+        while remaining:
+            current = min(remaining, key=lambda present: (self.distance(current, present), present))
+            order.append(current)
+            remaining.remove(current)
+
+        def tour_length(candidate):
+            stops = [tuple(santa_position)] + candidate + [self.exit_point]
+            return sum(self.distance(a, b) for a, b in zip(stops, stops[1:]))
+
+        best_length = tour_length(order)
+        improved = True
+        while improved:
+            improved = False
+            for i in range(len(order) - 1):
+                for j in range(i + 1, len(order)):
+                    candidate = order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+                    length = tour_length(candidate)
+                    if length < best_length:
+                        order, best_length, improved = candidate, length, True
+        return order + [self.exit_point]
+
+    def danger_zone(self, grinch_position):
+        """
+        The Grinch's cell and every cell it can step to next.
+        """
+        return {tuple(grinch_position), *self.board_index.passable_neighbors(grinch_position)}
+
+    def plan_leg(self, santa_position, danger):
+        """
+        Path to the current target, around the danger zone when possible.
+        """
+        target = self.tour[0]
+        path = astar_path(santa_position, target, self.board_index, danger - {target})
+        if path is None:
+            path = astar_path(santa_position, target, self.board_index) or []
+        self.replans += 1
+        return path
+
+    def next_move(self, santa_position, presents, grinch_position):
+        """
+        Returns Santa's next cell as [x, y]; staying put when the step would walk into the Grinch.
+        """
+        santa = tuple(santa_position)
+        presents = set(presents)
+        if not self.tour or presents - set(self.tour):
+            self.tour = self.plan_tour(santa, presents)
+            self.path = []
+        elif set(self.tour[:-1]) - presents:
+            # Collected presents drop out of the tour; a new leg starts if the current target went
+            if self.tour[0] not in presents:
+                self.path = []
+            self.tour = [target for target in self.tour[:-1] if target in presents] + [self.exit_point]
+        if santa == self.exit_point and not presents:
+            return list(santa)
+
+        danger = self.danger_zone(grinch_position)
+        stale = not self.path or abs(self.path[0][0] - santa[0]) + abs(self.path[0][1] - santa[1]) != 1
+        if stale or danger.intersection(self.path[:self.lookahead]):
+            self.path = self.plan_leg(santa, danger)
+        if not self.path or self.path[0] == tuple(grinch_position):
+            return list(santa)
+        return list(self.path.pop(0))
+
+
+def determine_next_move(santa_position, last_position, clues, grid, known_clues, grid_size, planner=None,
+                        belief=None, backend=None):
+    """
+    Determines the next move for Santa using Prover9 validation or manual fallback.
+    With a TourPlanner (the "planner" AUTO_STRATEGY), Santa follows the planned tour instead.
+    belief is a belief.GrinchBelief whose risk estimates steer the fallback move.
+    backend is the solver backend, defaulting to SOLVER_BACKEND.
+    """
+    if planner is not None:
+        grinch_position = next(iter(clues["grinch_sound"]))
+        return planner.next_move(santa_position, clues["cookie_smell"], grinch_position)
+
+    # Update clues based on adjacent cells
+    known_clues = update_clues(santa_position, clues, known_clues, grid_size)
+
+    # Use Prover9 to validate and determine the next move
+    next_position = validate_move_and_update(santa_position, last_position, clues, grid, grid_size, backend,
+                                             belief)
+    return next_position
+
+def manual_move(santa_position, direction, grid_size):
+    """
+    Moves Santa manually based on player input.
+    """
+    new_position = santa_move(santa_position, direction)
+    if 0 <= new_position[0] < grid_size[0] and 0 <= new_position[1] < grid_size[1]:
+        return new_position
+    return santa_position
+
+def solver_message(backend=None):
+    """
+    Feedback for a move chosen by the solver backend (SOLVER_BACKEND by default).
+    """
+    if (backend or SOLVER_BACKEND) == "inference":
+        return "The inference engine determined the next move."
+    return "Prover9 determined the next move."  # "crosscheck" moves are Prover9's
+
+def play_game(santa_position, direction, auto_mode, clues, known_clues, grid, grid_size, planner=None,
+              belief=None, last_position=None, backend=None):
+    """
+    Handles the main game logic, allowing both manual and autonomous play.
+    last_position is the cell Santa came from, which the solver will not step back to
+    unless nothing else is possible; None means Santa has not moved yet.
+    backend is the solver backend for autonomous mode, defaulting to SOLVER_BACKEND.
+    """
+    if auto_mode:
+        # Autonomous mode: Use Prover9 (or the tour planner) to determine the next move
+        if last_position is None:
+            last_position = [santa_position[0], santa_position[1]]
+        next_position = determine_next_move(santa_position, last_position, clues, grid, known_clues, grid_size,
+                                            planner, belief, backend)
+        if planner is not None:
+            return next_position, "Santa follows the planned route."
+        return next_position, solver_message(backend)
+    else:
+        # Manual mode: Move based on player input
+        new_position = manual_move(santa_position, direction, grid_size)
+        feedback_message = check_collision(new_position, None, clues.get("cookie_smell", []), grid, None)
+        return new_position, feedback_message
@@ -1,131 +1,199 @@
-import pygame
-from constants import COLORS, ELEMENT_COLORS, CLUE_COLORS, GRID_ROWS, GRID_COLS, CELL_SIZE, LEGEND_LABELS
-
-def load_assets():
-    """Load and scale assets for the grid elements."""
-    santa_image = pygame.image.load("assets/santa.jpg")
-    present_image = pygame.image.load("assets/present.jpg")
-    obstacle_image = pygame.image.load("assets/flour.jpg")
-    exit_image = pygame.image.load("assets/exit.jpg")
-    grinch_image = pygame.image.load("assets/grinch.jpg")
-
-    # Scale images to fit the grid cells
-    assets = {
-        "santa": pygame.transform.scale(santa_image, (CELL_SIZE, CELL_SIZE)),
-        "present": pygame.transform.scale(present_image, (CELL_SIZE, CELL_SIZE)),
-        "obstacle": pygame.transform.scale(obstacle_image, (CELL_SIZE, CELL_SIZE)),
-        "exit": pygame.transform.scale(exit_image, (CELL_SIZE, CELL_SIZE)),
-        "grinch": pygame.transform.scale(grinch_image, (CELL_SIZE, CELL_SIZE)),
-    }
-    return assets
-
-def draw_grid(screen, assets, santa_position, grinch_position, presents, obstacles, exit_point):
-    """
-    Draws the game grid based on the provided positions for Santa, Grinch, presents, obstacles, and the exit.
-    Santa can occupy the same position as an object temporarily (overwriting).
-    """
-    screen.fill(COLORS["background"])
-
-    # Draw the grid
-    for row in range(GRID_ROWS):
-        for col in range(GRID_COLS):
-            rect = pygame.Rect(col * CELL_SIZE, row * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-            pygame.draw.rect(screen, COLORS["grid"], rect, 1)
-
-    # Add proximity indicators for objects
-    add_proximity_clues(screen, presents, CLUE_COLORS["cookie_smell"], "top_left")  # Clues for presents
-    add_proximity_clues(screen, obstacles, CLUE_COLORS["flour_smell"], "bottom_right")  # Clues for obstacles
-    add_proximity_clues(screen, [exit_point], CLUE_COLORS["cold_breeze"], "top_right")  # Clues for exit
-    add_proximity_clues(screen, [tuple(grinch_position)], CLUE_COLORS["grinch_sound"], "bottom_left")  # Clues for Grinch
-
-    # Draw game elements, except Santa (drawn last to allow overwriting)
-    for present in presents:
-        if present != tuple(santa_position):
-            screen.blit(assets["present"], (present[1] * CELL_SIZE, present[0] * CELL_SIZE))
-    for obstacle in obstacles:
-        if obstacle != tuple(santa_position):
-            screen.blit(assets["obstacle"], (obstacle[1] * CELL_SIZE, obstacle[0] * CELL_SIZE))
-    if exit_point != tuple(santa_position):
-        screen.blit(assets["exit"], (exit_point[1] * CELL_SIZE, exit_point[0] * CELL_SIZE))
-    if grinch_position != santa_position:
-        screen.blit(assets["grinch"], (grinch_position[1] * CELL_SIZE, grinch_position[0] * CELL_SIZE))
-
-    # Draw Santa last (overwriting other objects temporarily)
-    screen.blit(assets["santa"], (santa_position[1] * CELL_SIZE, santa_position[0] * CELL_SIZE))
-
-def add_proximity_clues(screen, objects, clue_color, position):
-    """
-    Adds visual clues dynamically based on proximity to specific elements.
-    The clues are placed in specific parts of the adjacent cells:
-        - "top_left": cookie smell (present clue)
-        - "bottom_right": flour smell (trap)
-        - "top_right": cold breeze (exit)
-        - "bottom_left": grinch sound (grinch)
-    """
-    offsets = [
-        (0, -1),  # Left
-        (0, 1),   # Right
-        (-1, 0),  # Up
-        (1, 0),   # Down
-    ]
-
-    for obj in objects:
-        for dx, dy in offsets:
-            nx, ny = obj[0] + dx, obj[1] + dy
-            if 0 <= nx < GRID_ROWS and 0 <= ny < GRID_COLS:
-                rect_x = ny * CELL_SIZE
-                rect_y = nx * CELL_SIZE
-                if position == "top_left":
-                    pygame.draw.circle(screen, clue_color, (rect_x + 10, rect_y + 10), 5)
-                elif position == "bottom_right":
-                    pygame.draw.circle(screen, clue_color, (rect_x + CELL_SIZE - 10, rect_y + CELL_SIZE - 10), 5)
-                elif position == "top_right":
-                    pygame.draw.circle(screen, clue_color, (rect_x + CELL_SIZE - 10, rect_y + 10), 5)
-                elif position == "bottom_left":
-                    pygame.draw.circle(screen, clue_color, (rect_x + 10, rect_y + CELL_SIZE - 10), 5)
-
-def update_grid(grid, position, value):
-    """
-    Updates the grid matrix with the specified value at the given position.
-    """
-    x, y = position
-    if 0 <= x < GRID_ROWS and 0 <= y < GRID_COLS:
-        grid[x][y] |= value
-
-def clear_clues(grid, position):
-    """
-    Clears clues around the given position in the grid matrix.
-    """
-    x, y = position
-    offsets = [
-        (0, -1),  # Left
-        (0, 1),   # Right
-        (-1, 0),  # Up
-        (1, 0),   # Down
-    ]
-
-    for dx, dy in offsets:
-        nx, ny = x + dx, y + dy
-        if 0 <= nx < GRID_ROWS and 0 <= ny < GRID_COLS:
-            grid[nx][ny] &= ~0xFF  # Clear specific proximity indicators
-
-def draw_legend(screen, font, legend_x, legend_y):
-    """
-    Draws the legend on the specified position of the screen.
-    """
-    line_spacing = 40  # Space between legend items
-
-    # Background for the legend
-    pygame.draw.rect(screen, (255, 255, 255), (legend_x - 10, legend_y - 10, 220, len(LEGEND_LABELS) * line_spacing + 20))
-
-    # Legend title
-    title = font.render("Legend", True, (0, 0, 0))
-    screen.blit(title, (legend_x, legend_y))
-    legend_y += line_spacing
-
-    # Legend items
-    for label, color in LEGEND_LABELS.items():
-        pygame.draw.rect(screen, color, (legend_x, legend_y + 10, 20, 20))
-        text = font.render(label, True, (0, 0, 0))  # Black text
-        screen.blit(text, (legend_x + 30, legend_y))
-        legend_y += line_spacing
+import pygame
+from constants import COLORS, ELEMENT_COLORS, CLUE_COLORS, GRID_ROWS, GRID_COLS, CELL_SIZE, LEGEND_LABELS
+from incremental_grid import update_grid, clear_clues  # Grid matrix helpers, kept importable from here
+from asset_manager import get_asset_manager
+from text_cache import render_text
+from board_index import grid_index
+
+def load_assets(cell_size=CELL_SIZE):
+    """
+    Load and scale assets for the grid elements (to cell_size pixels, CELL_SIZE by default).
+    Sprites come from the shared atlas, which is decoded once and cached on disk;
+    edited source images are picked up on the next call.
+    """
+    asset_manager = get_asset_manager()
+    asset_manager.reload_if_changed()
+    return asset_manager.sprites(cell_size)
+
+def draw_grid(screen, assets, santa_position, grinch_position, presents, obstacles, exit_point):
+    """
+    Draws the game grid based on the provided positions for Santa, Grinch, presents, obstacles, and the exit.
+    Santa can occupy the same position as an object temporarily (overwriting).
+    """
+    screen.fill(COLORS["background"])
+
+    # Draw the grid
+    for row in range(GRID_ROWS):
+        for col in range(GRID_COLS):
+            rect = pygame.Rect(col * CELL_SIZE, row * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+            pygame.draw.rect(screen, COLORS["grid"], rect, 1)
+
+    # Add proximity indicators for objects
+    add_proximity_clues(screen, presents, CLUE_COLORS["cookie_smell"], "top_left")  # Clues for presents
+    add_proximity_clues(screen, obstacles, CLUE_COLORS["flour_smell"], "bottom_right")  # Clues for obstacles
+    add_proximity_clues(screen, [exit_point], CLUE_COLORS["cold_breeze"], "top_right")  # Clues for exit
+    add_proximity_clues(screen, [tuple(grinch_position)], CLUE_COLORS["grinch_sound"], "bottom_left")  # Clues for Grinch
+
+    # Draw game elements, except Santa (drawn last to allow overwriting)
+    for present in presents:
+        if present != tuple(santa_position):
+            screen.blit(assets["present"], (present[1] * CELL_SIZE, present[0] * CELL_SIZE))
+    for obstacle in obstacles:
+        if obstacle != tuple(santa_position):
+            screen.blit(assets["obstacle"], (obstacle[1] * CELL_SIZE, obstacle[0] * CELL_SIZE))
+    if exit_point != tuple(santa_position):
+        screen.blit(assets["exit"], (exit_point[1] * CELL_SIZE, exit_point[0] * CELL_SIZE))
+    if grinch_position != santa_position:
+        screen.blit(assets["grinch"], (grinch_position[1] * CELL_SIZE, grinch_position[0] * CELL_SIZE))
+
+    # Draw Santa last (overwriting other objects temporarily)
+    screen.blit(assets["santa"], (santa_position[1] * CELL_SIZE, santa_position[0] * CELL_SIZE))
+
+def add_proximity_clues(screen, objects, clue_color, position):
+    """
+    Adds visual clues dynamically based on proximity to specific elements.
+    The clues are placed in specific parts of the adjacent cells:
+        - "top_left": cookie smell (present clue)
+        - "bottom_right": flour smell (trap)
+        - "top_right": cold breeze (exit)
+        - "bottom_left": grinch sound (grinch)
+    """
+    index = grid_index((GRID_ROWS, GRID_COLS))
+    for obj in objects:
+        for cell in index.neighbors(obj):
+            draw_clue_dot(screen, cell, clue_color, position)
+
+def draw_clue_dot(screen, cell, clue_color, position):
+    """
+    Draws one clue dot in the given corner ("top_left", "bottom_right", "top_right", "bottom_left") of a cell.
+    """
+    rect_x = cell[1] * CELL_SIZE
+    rect_y = cell[0] * CELL_SIZE
+    if position == "top_left":
+        pygame.draw.circle(screen, clue_color, (rect_x + 10, rect_y + 10), 5)
+    elif position == "bottom_right":
+        pygame.draw.circle(screen, clue_color, (rect_x + CELL_SIZE - 10, rect_y + CELL_SIZE - 10), 5)
+    elif position == "top_right":
+        pygame.draw.circle(screen, clue_color, (rect_x + CELL_SIZE - 10, rect_y + 10), 5)
+    elif position == "bottom_left":
+        pygame.draw.circle(screen, clue_color, (rect_x + 10, rect_y + CELL_SIZE - 10), 5)
+
+def adjacent_cells(cell):
+    """
+    Returns the in-bounds 4-neighbours of a cell.
+    """
+    return grid_index((GRID_ROWS, GRID_COLS)).neighbors(cell)
+
+class GridRenderer:
+    """
+    Draws the grid from a pre-rendered static layer and repaints only the cells that changed.
+
+    The static layer holds the background, grid lines, the flour and cold breeze clue dots
+    and is built once per board. Each frame, the dynamic content of every cell (presents,
+    cookie smell, Grinch, Grinch sound, Santa) is compared with the previous frame and only
+    the differing cells are repainted. draw returns their rectangles for pygame.display.update.
+    """
+
+    def __init__(self, screen, assets, obstacles, exit_point):
+        self.screen = screen
+        self.assets = assets
+        self.obstacles = set(obstacles)
+        self.exit_point = tuple(exit_point)
+        self.static_layer = self._render_static_layer()
+        self._previous = None  # Dynamic content per cell drawn last frame
+
+    def _render_static_layer(self):
+        layer = pygame.Surface((GRID_COLS * CELL_SIZE, GRID_ROWS * CELL_SIZE))
+        layer.fill(COLORS["background"])
+        for row in range(GRID_ROWS):
+            for col in range(GRID_COLS):
+                rect = pygame.Rect(col * CELL_SIZE, row * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+                pygame.draw.rect(layer, COLORS["grid"], rect, 1)
+        add_proximity_clues(layer, self.obstacles, CLUE_COLORS["flour_smell"], "bottom_right")
+        add_proximity_clues(layer, [self.exit_point], CLUE_COLORS["cold_breeze"], "top_right")
+        return layer
+
+    def invalidate(self):
+        """
+        Forces a full repaint on the next draw, e.g. after something else drew over the screen.
+        """
+        self._previous = None
+
+    def draw(self, santa_position, grinch_position, presents):
+        """
+        Repaints the changed cells and returns the list of dirty rectangles.
+        """
+        santa = tuple(santa_position)
+        grinch = tuple(grinch_position)
+        content = {}
+
+        def mark(cell, item):
+            content[cell] = content.get(cell, frozenset()) | {item}
+
+        for present in presents:
+            mark(present, "present")
+            for cell in adjacent_cells(present):
+                mark(cell, "cookie_smell")
+        for cell in adjacent_cells(grinch):
+            mark(cell, "grinch_sound")
+        mark(grinch, "grinch")
+        mark(santa, "santa")
+
+        if self._previous is None:
+            self.screen.blit(self.static_layer, (0, 0))
+            dirty_cells = set(content) | self.obstacles | {self.exit_point}
+            dirty_rects = [self.static_layer.get_rect()]
+        else:
+            dirty_cells = {cell for cell in set(content) | set(self._previous)
+                           if content.get(cell) != self._previous.get(cell)}
+            dirty_rects = [self._cell_rect(cell) for cell in dirty_cells]
+
+        for cell in dirty_cells:
+            self._draw_cell(cell, content.get(cell, frozenset()))
+        self._previous = content
+        return dirty_rects
+
+    def _cell_rect(self, cell):
+        return pygame.Rect(cell[1] * CELL_SIZE, cell[0] * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+
+    def _draw_cell(self, cell, items):
+        # Same layering as draw_grid: clue dots, then objects, then Santa on top
+        rect = self._cell_rect(cell)
+        self.screen.blit(self.static_layer, rect, rect)
+        if "cookie_smell" in items:
+            draw_clue_dot(self.screen, cell, CLUE_COLORS["cookie_smell"], "top_left")
+        if "grinch_sound" in items:
+            draw_clue_dot(self.screen, cell, CLUE_COLORS["grinch_sound"], "bottom_left")
+
+        santa_here = "santa" in items
+        if "present" in items and not santa_here:
+            self.screen.blit(self.assets["present"], rect)
+        if cell in self.obstacles and not santa_here:
+            self.screen.blit(self.assets["obstacle"], rect)
+        if cell == self.exit_point and not santa_here:
+            self.screen.blit(self.assets["exit"], rect)
+        if "grinch" in items and not santa_here:
+            self.screen.blit(self.assets["grinch"], rect)
+        if santa_here:
+            self.screen.blit(self.assets["santa"], rect)
+
+def draw_legend(screen, font, legend_x, legend_y):
+    """
+    Draws the legend on the specified position of the screen.
+    """
+    line_spacing = 40  # Space between legend items
+
+    # Background for the legend
+    pygame.draw.rect(screen, (255, 255, 255), (legend_x - 10, legend_y - 10, 220, len(LEGEND_LABELS) * line_spacing + 20))
+
+    # Legend title
+    title = render_text(font, "Legend", (0, 0, 0))
+    screen.blit(title, (legend_x, legend_y))
+    legend_y += line_spacing
+
+    # Legend items
+    for label, color in LEGEND_LABELS.items():
+        pygame.draw.rect(screen, color, (legend_x, legend_y + 10, 20, 20))
+        text = render_text(font, label, (0, 0, 0))  # Black text
+        screen.blit(text, (legend_x + 30, legend_y))
+        legend_y += line_spacing
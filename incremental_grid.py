@@ -0,0 +1,178 @@
+"""
+Incrementally maintained bitmask grid.
+
+Instead of rebuilding the whole grid and re-running add_clues every frame,
+IncrementalGrid applies deltas: an object is added, removed or moved, and only
+the object's cell and its clue neighbours are touched. Clue bits are reference
+counted per cell, so a cookie smell shared by two presents survives when one
+of them is collected. The counts live in one table of bytes per clue (a cell
+has at most four producers), so they cost a byte per cell and clue however
+many objects the board holds; on large boards the tables are chunked (see
+chunk_store.py) and the cookie smell, cold breeze and Grinch sound counts only
+take the few chunks around their objects.
+"""
+from board_index import grid_index
+from chunk_store import cell_array
+from constants import (
+    PRESENT_FLAG,
+    OBSTACLE_FLAG,
+    EXIT_FLAG,
+    GRINCH_FLAG,
+    COOKIE_SMELL_FLAG,
+    FLOUR_SMELL_FLAG,
+    COLD_BREEZE_FLAG,
+    GRINCH_SOUND_FLAG,
+)
+
+# Clue flag set around each kind of object (Santa leaves no clue)
+OBJECT_CLUES = {
+    PRESENT_FLAG: COOKIE_SMELL_FLAG,
+    OBSTACLE_FLAG: FLOUR_SMELL_FLAG,
+    EXIT_FLAG: COLD_BREEZE_FLAG,
+    GRINCH_FLAG: GRINCH_SOUND_FLAG,
+}
+
+OFFSETS = [
+    (0, -1),  # Left
+    (0, 1),   # Right
+    (-1, 0),  # Up
+    (1, 0),   # Down
+]
+
+
+def update_grid(grid, position, value):
+    """
+    Updates the grid matrix with the specified value at the given position.
+    """
+    x, y = position
+    if 0 <= x < len(grid) and 0 <= y < len(grid[x]):
+        grid[x][y] |= value
+
+
+def clear_grid(grid, position, value):
+    """
+    Clears the flags in `value` at the given position of the grid matrix.
+    """
+    x, y = position
+    if 0 <= x < len(grid) and 0 <= y < len(grid[x]):
+        grid[x][y] &= ~value
+
+
+def clear_clues(grid, position):
+    """
+    Clears clues around the given position in the grid matrix.
+    """
+    x, y = position
+    for dx, dy in OFFSETS:
+        nx, ny = x + dx, y + dy
+        if 0 <= nx < len(grid) and 0 <= ny < len(grid[nx]):
+            grid[nx][ny] &= ~0xFF  # Clear specific proximity indicators
+
+
+def _ignore(cell):
+    pass
+
+
+class IncrementalGrid:
+    """
+    Bitmask grid kept up to date through object deltas.
+    """
+
+    def __init__(self, grid):
+        """
+        Wraps an empty grid (list of lists, Bitboard, NumPy array or ChunkedGrid); objects are then
+        stamped with add_object.
+        """
+        self.grid = grid
+        self.rows = len(grid)
+        self.cols = len(grid[0]) if self.rows else 0
+        # clue_flag -> number of objects producing that clue, per cell at x * cols + y
+        self._clue_counts = {clue: cell_array((self.rows, self.cols), "B") for clue in OBJECT_CLUES.values()}
+        self.changed_cells = set()  # Cells touched since the last take_changes call
+
+    def add_object(self, flag, position):
+        """
+        Stamps an object and increments the clue counts of its neighbours.
+        """
+        position = tuple(position)
+        update_grid(self.grid, position, flag)
+        self.changed_cells.add(position)
+        clue = OBJECT_CLUES.get(flag)
+        if clue is None:
+            return
+        counts = self._clue_counts[clue]
+        for neighbor in self._neighbors(position):
+            index = neighbor[0] * self.cols + neighbor[1]
+            counts[index] += 1
+            if counts[index] == 1:
+                update_grid(self.grid, neighbor, clue)
+                self.changed_cells.add(neighbor)
+
+    def add_objects(self, flag, positions, track_changes=True):
+        """
+        Stamps many objects of one kind, such as every obstacle of a new board, in one pass.
+        Same result as add_object per position, with the neighbour lookups read straight from the board index.
+        track_changes=False leaves changed_cells alone, for a fresh board whose changes would be discarded.
+        """
+        grid, cols = self.grid, self.cols
+        record = self.changed_cells.add if track_changes else _ignore
+        clue = OBJECT_CLUES.get(flag)
+        counts = self._clue_counts[clue] if clue is not None else None
+        index = grid_index((self.rows, self.cols))
+        offsets, cells = index.neighbor_offsets, index.neighbor_cells
+        for x, y in positions:
+            grid[x][y] |= flag
+            record((x, y))
+            if counts is None:
+                continue
+            if offsets is None:  # Large boards keep no adjacency tables
+                neighbors = [nx * cols + ny for nx, ny in index.neighbors((x, y))]
+            else:
+                cell = x * cols + y
+                neighbors = cells[offsets[cell]:offsets[cell + 1]]
+            for neighbor in neighbors:
+                count = counts[neighbor] + 1
+                counts[neighbor] = count
+                if count == 1:
+                    nx, ny = divmod(neighbor, cols)
+                    grid[nx][ny] |= clue
+                    record((nx, ny))
+
+    def remove_object(self, flag, position):
+        """
+        Clears an object and drops the clues no other object still produces.
+        """
+        position = tuple(position)
+        clear_grid(self.grid, position, flag)
+        self.changed_cells.add(position)
+        clue = OBJECT_CLUES.get(flag)
+        if clue is None:
+            return
+        counts = self._clue_counts[clue]
+        for neighbor in self._neighbors(position):
+            index = neighbor[0] * self.cols + neighbor[1]
+            if counts[index] > 1:
+                counts[index] -= 1
+            else:
+                counts[index] = 0
+                clear_grid(self.grid, neighbor, clue)
+                self.changed_cells.add(neighbor)
+
+    def move_object(self, flag, old_position, new_position):
+        """
+        Moves an object; a no-op when the position did not change.
+        """
+        if tuple(old_position) == tuple(new_position):
+            return
+        self.remove_object(flag, old_position)
+        self.add_object(flag, new_position)
+
+    def take_changes(self):
+        """
+        Returns and resets the set of cells changed since the previous call.
+        """
+        changed, self.changed_cells = self.changed_cells, set()
+        return changed
+
+    def _neighbors(self, position):
+        return grid_index((self.rows, self.cols)).neighbors(position)
@@ -0,0 +1,158 @@
+"""
+Pure-Python forward-chaining evaluator for the Santa Escape Room rule set.
+
+It derives the same predicates that generate_prover9_input hands to Prover9
+(clue biconditionals, safe, move_to and backup_move) without writing any
+files or starting a subprocess. Observations about Santa's neighbouring cells
+are treated as complete, so "not observed" means "not there" (closed world).
+"""
+from board_index import grid_index
+
+# Bit flags stored in the grid cells
+OBJECT_FLAGS = {
+    2: "present",
+    4: "obstacle",
+    8: "exit",
+    16: "grinch",
+}
+
+CLUE_FLAGS = {
+    32: "cookie_smell",
+    64: "flour_smell",
+    128: "cold_breeze",
+    256: "grinch_sound",
+}
+
+# Clue <-> object biconditionals: clue(x, y) <-> exists u v (adjacent(x, y, u, v) & object(u, v))
+CLUE_SOURCES = {
+    "cookie_smell": "present",
+    "cold_breeze": "exit",
+    "grinch_sound": "grinch",
+}
+
+
+def neighbor_cells(position, grid_size):
+    """
+    Returns the in-bounds neighbours of a cell in the same order as generate_neighbors.
+    """
+    return grid_index(grid_size).neighbors(position)
+
+
+def collect_facts(santa_position, last_position, grid, grid_size):
+    """
+    Builds the ground facts for one decision as a set of tuples, e.g. ("obstacle", 3, 4).
+    Only Santa's adjacent cells are observed, exactly as in the Prover9 input.
+    """
+    santa_x, santa_y = santa_position
+    last_x, last_y = last_position
+
+    facts = {
+        ("santa_position", santa_x, santa_y),
+        ("last_position", last_x, last_y),
+    }
+
+    for nx, ny in neighbor_cells((santa_x, santa_y), grid_size):
+        facts.add(("adjacent", santa_x, santa_y, nx, ny))
+        cell = grid[nx][ny]
+        for flag, name in CLUE_FLAGS.items():
+            if cell & flag:
+                facts.add((name, nx, ny))
+        for flag, name in OBJECT_FLAGS.items():
+            if cell & flag:
+                facts.add((name, nx, ny))
+
+    return facts
+
+
+def derive_clues(facts):
+    """
+    Forward direction of the clue biconditionals.
+    """
+    derived = set()
+    for fact in facts:
+        if fact[0] != "adjacent":
+            continue
+        _, x, y, u, v = fact
+        for clue, source in CLUE_SOURCES.items():
+            if (source, u, v) in facts:
+                derived.add((clue, x, y))
+    return derived
+
+
+def derive_safe(facts):
+    """
+    safe(x, y) <-> ~grinch(x, y) & ~obstacle(x, y), for every cell Santa can see.
+    """
+    derived = set()
+    for fact in facts:
+        if fact[0] != "adjacent":
+            continue
+        u, v = fact[3], fact[4]
+        if ("grinch", u, v) not in facts and ("obstacle", u, v) not in facts:
+            derived.add(("safe", u, v))
+    return derived
+
+
+def derive_moves(facts):
+    """
+    move_to and backup_move, both excluding the cell Santa just came from.
+    """
+    last = next(fact[1:] for fact in facts if fact[0] == "last_position")
+    derived = set()
+    for fact in facts:
+        if fact[0] != "adjacent":
+            continue
+        _, x, y, u, v = fact
+        if (u, v) == last:
+            continue
+        if ("safe", u, v) in facts:
+            derived.add(("move_to", x, y, u, v))
+        if ("grinch_sound", u, v) not in facts:
+            derived.add(("backup_move", x, y, u, v))
+    return derived
+
+
+# Rules are grouped in strata so that negated predicates are complete before they are used
+RULE_STRATA = [
+    [derive_clues],
+    [derive_safe],
+    [derive_moves],
+]
+
+
+def forward_chain(facts):
+    """
+    Applies every rule stratum until no new facts appear and returns the closed fact set.
+    """
+    facts = set(facts)
+    for stratum in RULE_STRATA:
+        while True:
+            new_facts = set()
+            for rule in stratum:
+                new_facts |= rule(facts) - facts
+            if not new_facts:
+                break
+            facts |= new_facts
+    return facts
+
+
+def infer_move(santa_position, last_position, grid, grid_size):
+    """
+    Returns the first neighbour satisfying move_to, then backup_move, or None when the goal fails.
+    """
+    facts = forward_chain(collect_facts(santa_position, last_position, grid, grid_size))
+    santa_x, santa_y = santa_position
+    neighbors = neighbor_cells((santa_x, santa_y), grid_size)
+
+    for predicate in ("move_to", "backup_move"):
+        for nx, ny in neighbors:
+            if (predicate, santa_x, santa_y, nx, ny) in facts:
+                return (nx, ny)
+    return None
+
+
+def goal_holds(santa_position, last_position, grid, grid_size):
+    """
+    Evaluates the Prover9 goal: exists a move_to or a backup_move from Santa's cell.
+    """
+    return infer_move(santa_position, last_position, grid, grid_size) is not None
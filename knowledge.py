@@ -0,0 +1,130 @@
+"""
+Bounded knowledge base of the clues Santa has observed.
+
+Each cell's knowledge is one bitmask in a per-cell table (one bit per clue type), and every
+clue type keeps an index set of the cells where it is known, so both "what is known about
+cell (x, y)" and "every cell with clue X" are answered without scanning. Grinch sightings
+go stale because the Grinch moves: decaying clue types carry an observation tick per cell
+and are forgotten KNOWLEDGE_DECAY_TICKS after they were last confirmed. Memory is bounded
+by the board size, not by the length of the game; on large boards the tables are
+chunked (see chunk_store.py), so only the chunks Santa has observed are allocated.
+
+KnowledgeBase.get(clue_type, default) mirrors the dict of sets it replaces, so code
+written against known_clues.get("grinch_sound", []) keeps working.
+"""
+from collections import deque
+
+from chunk_store import cell_array
+from constants import KNOWLEDGE_DECAY_TICKS
+
+# Clue type -> bit in a cell's mask; unknown clue types get the next free bit on first use
+CLUE_BITS = {
+    "cookie_smell": 1,
+    "flour_smell": 2,
+    "cold_breeze": 4,
+    "grinch_sound": 8,
+}
+
+DECAYING_CLUES = ("grinch_sound",)  # The Grinch moves, so sightings of it expire
+
+
+class KnowledgeBase:
+    """
+    Per-cell clue bitmasks with per-clue indexes and decay of stale sightings.
+    """
+
+    def __init__(self, grid_size, decay_ticks=KNOWLEDGE_DECAY_TICKS):
+        self.rows, self.cols = grid_size
+        self.decay_ticks = decay_ticks
+        self.tick = 0
+        self.bits = dict(CLUE_BITS)
+        self._masks = cell_array(grid_size, "I")
+        self._cells = {clue_type: set() for clue_type in self.bits}  # Clue type -> cells known to have it
+        self._stamps = {clue_type: cell_array(grid_size, "I") for clue_type in DECAYING_CLUES}
+        self._expiry = deque()  # (tick, clue_type, cell) in observation order, for decaying clues
+
+    def advance(self, tick):
+        """
+        Moves the clock to `tick` and forgets decaying clues not confirmed within decay_ticks.
+        """
+        self.tick = tick
+        while self._expiry and self._expiry[0][0] <= tick - self.decay_ticks:
+            stamp, clue_type, cell = self._expiry.popleft()
+            if self._stamps[clue_type][cell[0] * self.cols + cell[1]] == stamp:  # Not seen again since
+                self._clear(cell, clue_type)
+
+    def record_cell(self, position, clue_types):
+        """
+        Records a complete observation of one cell: exactly `clue_types` are present there now.
+        """
+        cell = tuple(position)
+        index = cell[0] * self.cols + cell[1]
+        observed = 0
+        for clue_type in clue_types:
+            observed |= self._bit(clue_type)
+
+        old = self._masks[index]
+        for clue_type, bit in self.bits.items():
+            if observed & bit and not old & bit:
+                self._cells[clue_type].add(cell)
+            elif old & bit and not observed & bit:
+                self._cells[clue_type].discard(cell)
+        self._masks[index] = observed
+
+        for clue_type, stamps in self._stamps.items():
+            bit = self.bits[clue_type]
+            if observed & bit and (stamps[index] != self.tick or not old & bit):
+                stamps[index] = self.tick
+                self._expiry.append((self.tick, clue_type, cell))
+
+    def clues_at(self, position):
+        """
+        The clue types known at a cell.
+        """
+        mask = self._masks[position[0] * self.cols + position[1]]
+        return {clue_type for clue_type, bit in self.bits.items() if mask & bit}
+
+    def has_clue(self, position, clue_type):
+        bit = self.bits.get(clue_type, 0)
+        return bool(self._masks[position[0] * self.cols + position[1]] & bit)
+
+    def cells_with(self, clue_type):
+        """
+        The set of cells where clue_type is known. The set is live; do not modify it.
+        """
+        return self._cells.get(clue_type, frozenset())
+
+    def last_seen(self, position, clue_type):
+        """
+        Tick at which a decaying clue was last confirmed at the cell, or None if it is not known there.
+        """
+        if not self.has_clue(position, clue_type):
+            return None
+        return self._stamps[clue_type][position[0] * self.cols + position[1]]
+
+    def get(self, clue_type, default=None):
+        """
+        Dict-style access to cells_with, for code written against the old dict of sets.
+        """
+        cells = self._cells.get(clue_type)
+        return cells if cells else default
+
+    def __contains__(self, clue_type):
+        return bool(self._cells.get(clue_type))
+
+    def __repr__(self):
+        known = ", ".join(f"{clue_type}={len(cells)}" for clue_type, cells in self._cells.items() if cells)
+        return f"KnowledgeBase(tick {self.tick}: {known or 'nothing known'})"
+
+    def _bit(self, clue_type):
+        if clue_type not in self.bits:
+            if len(self.bits) >= 32:  # The masks are unsigned 32-bit values
+                raise ValueError(f"Too many clue types to track: {clue_type}")
+            self.bits[clue_type] = 1 << len(self.bits)
+            self._cells[clue_type] = set()
+        return self.bits[clue_type]
+
+    def _clear(self, cell, clue_type):
+        index = cell[0] * self.cols + cell[1]
+        self._masks[index] &= ~self.bits[clue_type]
+        self._cells[clue_type].discard(cell)
@@ -0,0 +1,230 @@
+"""
+Solvability-checked level generation and an indexed store of pre-generated boards.
+
+generate_level draws a layout with the configured obstacle density and keeps redrawing
+until a flood fill from Santa's start reaches every present and the exit. The flood fill
+works on flat cell indices in a bytearray, so it stays linear in the board size on very
+large grids.
+
+Validated boards can be written to a board file once and loaded by index later, so batch
+runs skip generation. A board file is a sequence of packed records; the companion
+".idx" file holds the byte offset of every record.
+
+Usage:
+    python levels.py --count 10000 --output boards.bin
+"""
+import argparse
+import os
+import random
+import struct
+from array import array
+from collections import deque
+
+from constants import GRID_ROWS, GRID_COLS, OBSTACLE_DENSITY, PRESENT_COUNT, LEVEL_MAX_ATTEMPTS
+
+SANTA_START = (0, 0)
+
+BOARD_MAGIC = b"SBRD"
+BOARD_VERSION = 1
+INDEX_HEADER = struct.Struct("<4sBQ")  # magic, version, board count
+BOARD_RECORD = struct.Struct("<IIIIIIII")  # rows, cols, grinch x, y, exit x, y, obstacle count, present count
+
+
+def reachable_cells(grid_size, blocked, start=SANTA_START):
+    """
+    Flood-fills from `start` through 4-adjacent cells that are not in `blocked`.
+    Returns a bytearray indexed by x * cols + y with 1 for every reachable cell.
+    """
+    rows, cols = grid_size
+    # The fill runs on a copy of the board framed by blocked cells (a row above and below,
+    # and one column that also wraps around as the left edge), so neighbours need no bounds checks.
+    stride = cols + 1
+    seen = bytearray(b"\x02" * stride) + (bytearray(cols) + b"\x02") * rows + bytearray(b"\x02" * stride)
+    for x, y in blocked:
+        seen[(x + 1) * stride + y] = 2
+    start_index = (start[0] + 1) * stride + start[1]
+
+    if not seen[start_index]:
+        seen[start_index] = 1
+        queue = deque([start_index])
+        pop, push = queue.popleft, queue.append
+        while queue:
+            index = pop()
+            for neighbor in (index - stride, index + stride, index - 1, index + 1):
+                if not seen[neighbor]:
+                    seen[neighbor] = 1
+                    push(neighbor)
+
+    reachable = bytearray()
+    for x in range(rows):
+        row_start = (x + 1) * stride
+        reachable += seen[row_start:row_start + cols]
+    return reachable.replace(b"\x02", b"\x00")
+
+
+def is_solvable(grid_size, obstacles, presents, exit_point, start=SANTA_START):
+    """
+    True when Santa can walk from `start` to every present and to the exit without touching an obstacle.
+    The Grinch moves, so it is not treated as a wall.
+    """
+    cols = grid_size[1]
+    reachable = reachable_cells(grid_size, obstacles, start)
+    return all(reachable[x * cols + y] for x, y in list(presents) + [tuple(exit_point)])
+
+
+def draw_layout(grid_size, rng, obstacle_count, present_count):
+    """
+    Places exactly obstacle_count obstacles and present_count presents on distinct cells,
+    never on Santa's start or the exit, and the Grinch on a free cell outside row 0 and column 0.
+    Returns (grinch_position, exit_point, obstacles, presents).
+    """
+    rows, cols = grid_size
+    exit_point = (rows - 1, cols - 1)
+    reserved = {SANTA_START[0] * cols + SANTA_START[1], exit_point[0] * cols + exit_point[1]}
+    if obstacle_count + present_count + 1 > rows * cols - len(reserved):
+        raise ValueError(f"A {rows}x{cols} board cannot hold {obstacle_count} obstacles and {present_count} presents")
+
+    # Sampling from a range does not materialise the board, so this stays cheap on large grids
+    cells = [index for index in rng.sample(range(rows * cols), obstacle_count + present_count + len(reserved))
+             if index not in reserved][:obstacle_count + present_count]
+    obstacles = {divmod(index, cols) for index in cells[:obstacle_count]}
+    presents = {divmod(index, cols) for index in cells[obstacle_count:]}
+
+    taken = obstacles | presents | {exit_point}
+    for _ in range(100):  # Rejection sampling is enough unless the board is nearly full
+        grinch_position = [rng.randint(1, rows - 1), rng.randint(1, cols - 1)]
+        if tuple(grinch_position) not in taken:
+            return grinch_position, exit_point, obstacles, presents
+    free = [[x, y] for x in range(1, rows) for y in range(1, cols) if (x, y) not in taken]
+    if not free:
+        raise ValueError(f"No free cell for the Grinch on a {rows}x{cols} board")
+    return rng.choice(free), exit_point, obstacles, presents
+
+
+def generate_level(grid_size=(GRID_ROWS, GRID_COLS), rng=random, obstacle_density=OBSTACLE_DENSITY,
+                   present_count=PRESENT_COUNT, max_attempts=LEVEL_MAX_ATTEMPTS):
+    """
+    Returns a solvable layout (grinch_position, exit_point, obstacles, presents).
+    Raises RuntimeError when max_attempts draws are all unsolvable, which means the density is too high.
+    """
+    obstacle_count = round(obstacle_density * grid_size[0] * grid_size[1])
+    for _ in range(max_attempts):
+        layout = draw_layout(grid_size, rng, obstacle_count, present_count)
+        if is_solvable(grid_size, layout[2], layout[3], layout[1]):
+            return layout
+    raise RuntimeError(f"No solvable {grid_size[0]}x{grid_size[1]} layout at obstacle density "
+                       f"{obstacle_density:.2f} in {max_attempts} attempts")
+
+
+def pack_board(grid_size, layout):
+    """
+    Serialises one board to bytes: a BOARD_RECORD followed by the obstacle and present coordinates.
+    """
+    grinch_position, exit_point, obstacles, presents = layout
+    coordinates = array("I", [value for position in sorted(obstacles) + sorted(presents) for value in position])
+    return BOARD_RECORD.pack(grid_size[0], grid_size[1], grinch_position[0], grinch_position[1],
+                             exit_point[0], exit_point[1], len(obstacles), len(presents)) + coordinates.tobytes()
+
+
+def unpack_board(data):
+    """
+    Inverse of pack_board. Returns (grid_size, layout).
+    """
+    rows, cols, grinch_x, grinch_y, exit_x, exit_y, obstacle_count, present_count = BOARD_RECORD.unpack_from(data)
+    coordinates = array("I")
+    coordinates.frombytes(data[BOARD_RECORD.size:BOARD_RECORD.size + (obstacle_count + present_count) * 8])
+    positions = list(zip(coordinates[::2], coordinates[1::2]))
+    layout = ([grinch_x, grinch_y], (exit_x, exit_y), set(positions[:obstacle_count]),
+              set(positions[obstacle_count:]))
+    return (rows, cols), layout
+
+
+def write_boards(path, boards):
+    """
+    Writes (grid_size, layout) pairs to `path` and their offsets to `path`.idx. Returns the board count.
+    """
+    offsets = array("Q")
+    with open(path, "wb") as file:
+        for grid_size, layout in boards:
+            offsets.append(file.tell())
+            file.write(pack_board(grid_size, layout))
+        offsets.append(file.tell())  # End of the last record
+    with open(path + ".idx", "wb") as file:
+        file.write(INDEX_HEADER.pack(BOARD_MAGIC, BOARD_VERSION, len(offsets) - 1))
+        file.write(offsets.tobytes())
+    return len(offsets) - 1
+
+
+class BoardStore:
+    """
+    Random access to a board file written by write_boards. Only the index is held in memory.
+    """
+
+    def __init__(self, path):
+        with open(path + ".idx", "rb") as file:
+            magic, version, count = INDEX_HEADER.unpack(file.read(INDEX_HEADER.size))
+            if magic != BOARD_MAGIC or version != BOARD_VERSION:
+                raise ValueError(f"{path}.idx is not a version {BOARD_VERSION} board index")
+            self._offsets = array("Q")
+            self._offsets.frombytes(file.read((count + 1) * self._offsets.itemsize))
+        self.path = path
+        self._file = open(path, "rb")
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        """
+        Returns (grid_size, layout) for board `index`.
+        """
+        if not 0 <= index < len(self):
+            raise IndexError(f"Board {index} is out of range for {len(self)} boards")
+        self._file.seek(self._offsets[index])
+        return unpack_board(self._file.read(self._offsets[index + 1] - self._offsets[index]))
+
+    def close(self):
+        self._file.close()
+
+
+_stores = {}
+
+
+def open_boards(path):
+    """
+    Returns the BoardStore for `path`, opened once per process.
+    """
+    if path not in _stores:
+        _stores[path] = BoardStore(path)
+    return _stores[path]
+
+
+def pregenerate(path, count, grid_size=(GRID_ROWS, GRID_COLS), first_seed=0, obstacle_density=OBSTACLE_DENSITY,
+                present_count=PRESENT_COUNT):
+    """
+    Generates `count` solvable boards, board i from seed first_seed + i, and writes them to `path`.
+    """
+    boards = ((grid_size, generate_level(grid_size, random.Random(seed), obstacle_density, present_count))
+              for seed in range(first_seed, first_seed + count))
+    return write_boards(path, boards)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-generate solvable boards for batch runs.")
+    parser.add_argument("--count", type=int, default=1000, help="number of boards")
+    parser.add_argument("--output", default="boards.bin", help="board file (the index goes to <output>.idx)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first board")
+    parser.add_argument("--rows", type=int, default=GRID_ROWS)
+    parser.add_argument("--cols", type=int, default=GRID_COLS)
+    parser.add_argument("--density", type=float, default=OBSTACLE_DENSITY, help="share of cells that are obstacles")
+    parser.add_argument("--presents", type=int, default=PRESENT_COUNT)
+    args = parser.parse_args(argv)
+
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    count = pregenerate(args.output, args.count, (args.rows, args.cols), args.seed, args.density, args.presents)
+    print(f"Wrote {count} boards to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
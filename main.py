@@ -1,250 +1,252 @@
-import pygame
-import sys
-import random
-from config import (
-    screen,
-    font,
-    SCREEN_WIDTH,
-    SCREEN_HEIGHT,
-    CELL_SIZE,
-    GRID_ROWS,
-    GRID_COLS,
-    STATUS_HEIGHT,
-)
-from constants import COLORS, ELEMENT_COLORS, CLUE_COLORS
-from grid import load_assets, draw_grid
-from instructions import instructions_screen
-from game_logic import play_game, grinch_move, check_collision
-from validator import validate_move_and_update, update_clues, generate_neighbors
-
-
-
-def draw_status_section(feedback_message, collected_presents):
-    """
-    Draws the status section at the bottom of the screen.
-    Displays the feedback message and presents collected.
-    """
-    status_y = SCREEN_HEIGHT - STATUS_HEIGHT
-    pygame.draw.rect(screen, COLORS["background"], (0, status_y, SCREEN_WIDTH, STATUS_HEIGHT))
-
-    feedback_text = font.render(feedback_message, True, ELEMENT_COLORS["exit"])
-    screen.blit(feedback_text, (20, status_y + 20))
-
-    presents_text = font.render(f"Presents collected: {collected_presents}", True, ELEMENT_COLORS["present"])
-    screen.blit(presents_text, (20, status_y + 60))
-
-def format_popup_message(message, max_words=6):
-    """
-    Formats the popup message to have a maximum of `max_words` per line.
-    """
-    words = message.split()
-    lines = [" ".join(words[i:i + max_words]) for i in range(0, len(words), max_words)]
-    return lines
-
-def show_popup_message(message):
-    """
-    Displays a pop-up message at the center of the screen and pauses for 3 seconds.
-    """
-    popup_font = pygame.font.Font(None, 40)
-    formatted_message = format_popup_message(message)
-
-    popup_height = len(formatted_message) * 50
-    start_y = (SCREEN_HEIGHT - popup_height) // 2
-
-    screen.fill(COLORS["background"])
-    for i, line in enumerate(formatted_message):
-        popup_surface = popup_font.render(line, True, ELEMENT_COLORS["grinch"])
-        popup_rect = popup_surface.get_rect(center=(SCREEN_WIDTH // 2, start_y + i * 50))
-        screen.blit(popup_surface, popup_rect)
-
-    pygame.display.flip()
-    pygame.time.delay(3000)
-
-def add_clues(grid, presents, obstacles, exit_point, grinch_position):
-    """
-    Adds clues to adjacent cells for specific objects:
-    - Cookie smell for presents.
-    - Flour smell for obstacles.
-    - Cold breeze for the exit.
-    - Grinch sound for the Grinch.
-    """
-    offsets = [(0, -1), (0, 1), (-1, 0), (1, 0)]  # Neighboring directions
-
-    for present in presents:
-        for dx, dy in offsets:
-            nx, ny = present[0] + dx, present[1] + dy
-            if 0 <= nx < GRID_ROWS and 0 <= ny < GRID_COLS:
-                grid[nx][ny] |= 32  # Cookie smell clue
-
-    for obstacle in obstacles:
-        for dx, dy in offsets:
-            nx, ny = obstacle[0] + dx, obstacle[1] + dy
-            if 0 <= nx < GRID_ROWS and 0 <= ny < GRID_COLS:
-                grid[nx][ny] |= 64  # Flour smell clue
-
-    for dx, dy in offsets:
-        nx, ny = exit_point[0] + dx, exit_point[1] + dy
-        if 0 <= nx < GRID_ROWS and 0 <= ny < GRID_COLS:
-            grid[nx][ny] |= 128  # Cold breeze clue
-
-    for dx, dy in offsets:
-        nx, ny = grinch_position[0] + dx, grinch_position[1] + dy
-        if 0 <= nx < GRID_ROWS and 0 <= ny < GRID_COLS:
-            grid[nx][ny] |= 256  # Grinch sound clue
-
-def main_menu():
-    """
-    Main menu for the game.
-    """
-    menu_options = ["Start Game", "Instructions", "Exit"]
-    selected_option = 0
-
-    while True:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    selected_option = (selected_option - 1) % len(menu_options)
-                elif event.key == pygame.K_DOWN:
-                    selected_option = (selected_option + 1) % len(menu_options)
-                elif event.key == pygame.K_RETURN:
-                    if selected_option == 0:
-                        start_game()
-                    elif selected_option == 1:
-                        instructions_screen()
-                    elif selected_option == 2:
-                        pygame.quit()
-                        sys.exit()
-
-        screen.fill(COLORS["background"])
-        title = font.render("Santa's Escape Room", True, ELEMENT_COLORS["grinch"])
-        screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 50))
-
-        for i, option in enumerate(menu_options):
-            color = ELEMENT_COLORS["exit"] if i == selected_option else COLORS["black"]
-            menu_text = font.render(option, True, color)
-            screen.blit(menu_text, (SCREEN_WIDTH // 2 - menu_text.get_width() // 2, 150 + i * 60))
-
-        pygame.display.flip()
-
-def start_game():
-    """
-    Main game loop with manual control and Prover9-based decision-making after Enter is pressed.
-    """
-    santa_position = [0, 0]
-    grid = [[0 for _ in range(GRID_COLS)] for _ in range(GRID_ROWS)]
-    grid_size = (GRID_ROWS, GRID_COLS)
-
-    grinch_position = [random.randint(1, GRID_ROWS - 1), random.randint(1, GRID_COLS - 1)]
-    exit_point = (GRID_ROWS - 1, GRID_COLS - 1)
-    obstacles = {(random.randint(0, GRID_ROWS - 1), random.randint(0, GRID_COLS - 1)) for _ in range(15)}
-    presents = {(random.randint(0, GRID_ROWS - 1), random.randint(0, GRID_COLS - 1)) for _ in range(5)}
-
-    obstacles.discard((0, 0))
-    presents.discard((0, 0))
-    presents = {pos for pos in presents if pos not in obstacles}
-    obstacles.discard(exit_point)
-
-    assets = load_assets()
-    game_running = True
-    auto_mode = False
-    feedback_message = "Welcome to Santa's Escape Room!"
-    collected_presents = 0
-    grinch_last_move = pygame.time.get_ticks()
-    known_clues = {}
-
-    while game_running:
-        current_time = pygame.time.get_ticks()
-        grid = [[0 for _ in range(GRID_COLS)] for _ in range(GRID_ROWS)]
-        grid[santa_position[0]][santa_position[1]] |= 1  # Santa
-        grid[grinch_position[0]][grinch_position[1]] |= 16  # Grinch
-        grid[exit_point[0]][exit_point[1]] |= 8  # Exit
-        for present in presents:
-            grid[present[0]][present[1]] |= 2  # Present
-        for obstacle in obstacles:
-            grid[obstacle[0]][obstacle[1]] |= 4  # Obstacle
-
-        add_clues(grid, presents, obstacles, exit_point, grinch_position)
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if not auto_mode:
-                    direction = None
-                    if event.key == pygame.K_UP:
-                        direction = "UP"
-                    elif event.key == pygame.K_DOWN:
-                        direction = "DOWN"
-                    elif event.key == pygame.K_LEFT:
-                        direction = "LEFT"
-                    elif event.key == pygame.K_RIGHT:
-                        direction = "RIGHT"
-
-                    if direction:
-                        new_position = santa_position[:]
-                        if direction == "UP":
-                            new_position[0] -= 1
-                        elif direction == "DOWN":
-                            new_position[0] += 1
-                        elif direction == "LEFT":
-                            new_position[1] -= 1
-                        elif direction == "RIGHT":
-                            new_position[1] += 1
-
-                        if 0 <= new_position[0] < GRID_ROWS and 0 <= new_position[1] < GRID_COLS:
-                            santa_position = new_position
-                            feedback_message = check_collision(santa_position, grinch_position, presents, obstacles, exit_point)
-
-                            if feedback_message == "Present collected!":
-                                collected_presents += 1
-                                presents.discard(tuple(santa_position))
-                            elif feedback_message == "Blocked by an obstacle!":
-                                show_popup_message("The kids outsmarted you! Your steps are uncovered with flour.")
-                                game_running = False
-
-                if event.key == pygame.K_RETURN:
-                    auto_mode = True
-                    feedback_message = "Autonomous mode activated!"
-
-        if current_time - grinch_last_move >= 2000:
-            grinch_position = grinch_move(grinch_position, grid_size, obstacles)
-            grinch_last_move = current_time
-
-        if auto_mode:
-            santa_position, feedback_message = play_game(
-                santa_position,
-                None,
-                auto_mode,
-                {"cookie_smell": presents, "grinch_sound": {tuple(grinch_position)}},
-                known_clues,
-                grid,
-                grid_size
-            )
-
-            if tuple(santa_position) in presents:
-                collected_presents += 1
-                presents.discard(tuple(santa_position))
-                feedback_message = "Present collected!"
-
-        # Win Condition
-        if santa_position == exit_point and collected_presents == len(presents):
-            show_popup_message("Santa saved the Christmas!")  # Show winning message
-            game_running = False  # Stop the game
-            continue
-
-        # Lose Condition
-        if santa_position == grinch_position:
-            show_popup_message("Grinch stole the Christmas!")
-            game_running = False
-
-        draw_grid(screen, assets, santa_position, grinch_position, presents, obstacles, exit_point)
-        draw_status_section(feedback_message, collected_presents)
-        pygame.display.flip()
-
-
-if __name__ == "__main__":
-    main_menu()
+import os
+import pygame
+import sys
+import threading
+from config import (
+    screen,
+    font,
+    SCREEN_WIDTH,
+    SCREEN_HEIGHT,
+    CELL_SIZE,
+    GRID_ROWS,
+    GRID_COLS,
+    STATUS_HEIGHT,
+)
+from constants import (
+    COLORS,
+    ELEMENT_COLORS,
+    CLUE_COLORS,
+    GRINCH_MOVE_INTERVAL_MS,
+    REPLAY_DIR,
+    SOLVER_BACKEND,
+    SOLVER_DEADLINE_MS,
+    LARGE_GRID_ROWS,
+    LARGE_GRID_COLS,
+    LARGE_CELL_SIZE,
+)
+from grid import load_assets, GridRenderer
+from instructions import instructions_screen
+from viewport import ChunkedRenderer
+from engine import GameState, PLAYING, AUTO
+from replay import ReplayWriter
+from scheduler import FrameScheduler
+from text_cache import get_font, render_text
+from tracing import log, span
+
+# Scheduled game events
+GRINCH_EVENT = "grinch_move"
+REPORT_EVENT = "frame_report"
+
+# Keyboard controls handed to the game engine
+KEY_ACTIONS = {
+    pygame.K_UP: "UP",
+    pygame.K_DOWN: "DOWN",
+    pygame.K_LEFT: "LEFT",
+    pygame.K_RIGHT: "RIGHT",
+    pygame.K_RETURN: AUTO,
+}
+
+
+
+def draw_status_section(feedback_message, collected_presents):
+    """
+    Draws the status section at the bottom of the screen.
+    Displays the feedback message and presents collected.
+    """
+    status_y = SCREEN_HEIGHT - STATUS_HEIGHT
+    pygame.draw.rect(screen, COLORS["background"], (0, status_y, SCREEN_WIDTH, STATUS_HEIGHT))
+
+    feedback_text = render_text(font, feedback_message, ELEMENT_COLORS["exit"])
+    screen.blit(feedback_text, (20, status_y + 20))
+
+    presents_text = render_text(font, f"Presents collected: {collected_presents}", ELEMENT_COLORS["present"])
+    screen.blit(presents_text, (20, status_y + 60))
+
+def format_popup_message(message, max_words=6):
+    """
+    Formats the popup message to have a maximum of `max_words` per line.
+    """
+    words = message.split()
+    lines = [" ".join(words[i:i + max_words]) for i in range(0, len(words), max_words)]
+    return lines
+
+def show_popup_message(message):
+    """
+    Displays a pop-up message at the center of the screen and pauses for 3 seconds.
+    """
+    popup_font = get_font(None, 40)
+    formatted_message = format_popup_message(message)
+
+    popup_height = len(formatted_message) * 50
+    start_y = (SCREEN_HEIGHT - popup_height) // 2
+
+    screen.fill(COLORS["background"])
+    for i, line in enumerate(formatted_message):
+        popup_surface = render_text(popup_font, line, ELEMENT_COLORS["grinch"])
+        popup_rect = popup_surface.get_rect(center=(SCREEN_WIDTH // 2, start_y + i * 50))
+        screen.blit(popup_surface, popup_rect)
+
+    pygame.display.flip()
+    pygame.time.delay(3000)
+
+def main_menu():
+    """
+    Main menu for the game.
+    Redraws only after input and sleeps between frames instead of spinning.
+    """
+    menu_options = ["Start Game", "Large Board", "Instructions", "Exit"]
+    selected_option = 0
+    scheduler = FrameScheduler()
+    redraw = True
+
+    while True:
+        events = pygame.event.get()
+        for event in events:
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_UP:
+                    selected_option = (selected_option - 1) % len(menu_options)
+                elif event.key == pygame.K_DOWN:
+                    selected_option = (selected_option + 1) % len(menu_options)
+                elif event.key == pygame.K_RETURN:
+                    if selected_option == 0:
+                        start_game()
+                    elif selected_option == 1:
+                        start_game(large=True)
+                    elif selected_option == 2:
+                        instructions_screen()
+                    elif selected_option == 3:
+                        pygame.quit()
+                        sys.exit()
+
+        if redraw or events:
+            screen.fill(COLORS["background"])
+            title = render_text(font, "Santa's Escape Room", ELEMENT_COLORS["grinch"])
+            screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 50))
+
+            for i, option in enumerate(menu_options):
+                color = ELEMENT_COLORS["exit"] if i == selected_option else COLORS["black"]
+                menu_text = render_text(font, option, color)
+                screen.blit(menu_text, (SCREEN_WIDTH // 2 - menu_text.get_width() // 2, 150 + i * 60))
+
+            pygame.display.flip()
+            redraw = False
+
+        scheduler.end_frame(active=bool(events))
+
+def show_loading_message(message):
+    """
+    Shows a one-line message while something slow, such as building a large board, runs.
+    """
+    screen.fill(COLORS["background"])
+    text = render_text(font, message, COLORS["black"])
+    screen.blit(text, text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)))
+    pygame.display.flip()
+
+def build_in_background(message, build):
+    """
+    Runs build() on a worker thread and returns its result, keeping the window responsive
+    meanwhile: the loading message stays up and closing the window still quits.
+    """
+    outcome = {}
+
+    def run():
+        try:
+            outcome["result"] = build()
+        except Exception as e:
+            outcome["error"] = e
+
+    worker = threading.Thread(target=run, name="board-builder", daemon=True)
+    worker.start()
+    scheduler = FrameScheduler()
+    frame = 0
+    while worker.is_alive():
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+        show_loading_message(message + "." * (frame // 10 % 4))
+        frame += 1
+        scheduler.end_frame(active=True)
+    worker.join()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+def start_game(seed=None, large=False):
+    """
+    Main game loop with manual control and Prover9-based decision-making after Enter is pressed.
+    The rules live in engine.GameState; this loop only feeds it input and draws it.
+    The simulation advances on fixed scheduler ticks and the Grinch moves on a scheduled event.
+    When REPLAY_DIR is set, the game is recorded there and can be re-run with replay.py.
+    The solver decides in the background, so a slow proof never freezes the window.
+    With large=True the board is LARGE_GRID_ROWS x LARGE_GRID_COLS and is drawn through a
+    scrolling, chunked view that follows Santa (see viewport.py).
+    """
+    if large:
+        state = build_in_background(
+            f"Building a {LARGE_GRID_ROWS}x{LARGE_GRID_COLS} board",
+            lambda: GameState((LARGE_GRID_ROWS, LARGE_GRID_COLS), seed=seed, solver_deadline_ms=SOLVER_DEADLINE_MS)
+        )
+    else:
+        state = GameState(seed=seed, solver_deadline_ms=SOLVER_DEADLINE_MS)
+    if REPLAY_DIR:
+        path = os.path.join(REPLAY_DIR, f"game_{state.seed}.rpl")
+        state.recorder = ReplayWriter(path, state.seed, state.grid_size, SOLVER_BACKEND, state.strategy,
+                                      state.solver_deadline_ms)
+        log.debug("Recording replay to %s", path)
+    if large:
+        grid_area = (0, 0, SCREEN_WIDTH, SCREEN_HEIGHT - STATUS_HEIGHT)
+        renderer = ChunkedRenderer(screen, load_assets(LARGE_CELL_SIZE), state.grid_size, state.obstacles,
+                                   state.exit_point, grid_area)
+        screen.fill(COLORS["background"])
+    else:
+        renderer = GridRenderer(screen, load_assets(), state.obstacles, state.exit_point)
+    status_rect = pygame.Rect(0, SCREEN_HEIGHT - STATUS_HEIGHT, SCREEN_WIDTH, STATUS_HEIGHT)
+    shown_status = None
+    scheduler = FrameScheduler()
+    scheduler.every(GRINCH_EVENT, GRINCH_MOVE_INTERVAL_MS)
+    scheduler.every(REPORT_EVENT, 1000)
+    redraw = True
+
+    while state.status == PLAYING:
+        events = pygame.event.get()
+        for event in events:
+            if event.type == pygame.QUIT:
+                state.close_replay()
+                pygame.quit()
+                sys.exit()
+            elif event.type == pygame.KEYDOWN and event.key in KEY_ACTIONS:
+                state.handle_action(KEY_ACTIONS[event.key])
+
+        for due_events in scheduler.simulation_ticks():
+            state.tick(move_grinch=GRINCH_EVENT in due_events)
+            if REPORT_EVENT in due_events:
+                pygame.display.set_caption(f"Santa's Escape Room - {scheduler.report()}")
+            redraw = True
+
+        if state.status != PLAYING:
+            show_popup_message(state.outcome_message)
+            break
+
+        if redraw or events:
+            with span("render"):
+                dirty_rects = renderer.draw(state.santa_position, state.grinch_position, state.presents)
+                status = (state.feedback_message, state.collected_presents)
+                if status != shown_status:
+                    draw_status_section(*status)
+                    dirty_rects.append(status_rect)
+                    shown_status = status
+                if dirty_rects:
+                    pygame.display.update(dirty_rects)
+            redraw = False
+
+        scheduler.end_frame(active=bool(events) or state.auto_mode)
+
+    pygame.display.set_caption("Santa's Escape Room")
+
+
+if __name__ == "__main__":
+    main_menu()
@@ -0,0 +1,141 @@
+"""
+LRU cache of Prover9 move decisions keyed on Santa's local neighbourhood.
+
+A decision only depends on the four neighbouring cells and on where Santa came from,
+so the key lists those cells in the fixed Up, Down, Left, Right order, and cached moves
+are stored as offsets from Santa. Symmetric neighbourhoods are not folded together:
+the solver takes the first safe neighbour in that order, so a rotated neighbourhood
+can have a different answer.
+"""
+import atexit
+import json
+import os
+from collections import OrderedDict
+
+from belief import risk_level
+from constants import MOVE_CACHE_SIZE, MOVE_CACHE_FILE
+
+# Neighbour offsets in the fixed order used to build keys: Up, Down, Left, Right
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+SANTA_FLAG = 1
+OUT_OF_BOUNDS = -1
+GRINCH_CLUE_LISTED = 512  # Extra key bit: the cell is listed in clues["grinch_sound"]
+RISK_SHIFT = 10  # Key bits from here hold the cell's Grinch risk level, when a belief is used
+
+
+def neighbourhood_key(santa_position, last_position, clues, grid, grid_size, backend, belief=None):
+    """
+    Returns the cache key for Santa's neighbourhood: the backend, the four neighbour values and
+    the offset of the last position when it is adjacent.
+    With a Grinch belief, each cell's risk level is part of the key, since the fallback move depends on it.
+    """
+    santa_x, santa_y = santa_position
+    rows, cols = grid_size
+    listed = clues.get("grinch_sound", ())
+
+    values = []
+    for dx, dy in DIRECTIONS:
+        nx, ny = santa_x + dx, santa_y + dy
+        if 0 <= nx < rows and 0 <= ny < cols:
+            value = int(grid[nx][ny]) & ~SANTA_FLAG
+            if (nx, ny) in listed:
+                value |= GRINCH_CLUE_LISTED
+            if belief is not None:
+                value |= risk_level(belief.risk((nx, ny))) << RISK_SHIFT
+            values.append(value)
+        else:
+            values.append(OUT_OF_BOUNDS)
+
+    last_offset = (last_position[0] - santa_x, last_position[1] - santa_y)
+    if last_offset not in DIRECTIONS:
+        last_offset = (0, 0)  # Only an adjacent last position changes the decision
+    return (backend, tuple(values), last_offset)
+
+
+class MoveCache:
+    """
+    Bounded LRU map from neighbourhood keys to move offsets.
+    """
+
+    def __init__(self, max_size=MOVE_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, santa_position):
+        """
+        Returns the cached move for Santa's position, or None on a miss.
+        """
+        offset = self._entries.get(key)
+        if offset is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        dx, dy = offset
+        if (dx, dy) == (0, 0):
+            return santa_position
+        return (santa_position[0] + dx, santa_position[1] + dy)
+
+    def put(self, key, santa_position, move):
+        """
+        Stores the move chosen for Santa's position, evicting the least recently used entry.
+        """
+        self._entries[key] = (move[0] - santa_position[0], move[1] - santa_position[1])
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        """
+        Returns the hit and miss counters with the current size.
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._entries),
+        }
+
+    def save(self, path):
+        """
+        Writes the cache entries to a JSON file, oldest first.
+        """
+        entries = [[key[0], list(key[1]), list(key[2]), list(offset)] for key, offset in self._entries.items()]
+        with open(path, "w") as file:
+            json.dump(entries, file)
+
+    def load(self, path):
+        """
+        Adds the entries of a file written by save; a missing file is ignored.
+        """
+        if not os.path.exists(path):
+            return
+        with open(path) as file:
+            entries = json.load(file)
+        for backend, cells, last_offset, offset in entries:
+            self._entries[(backend, tuple(cells), tuple(last_offset))] = tuple(offset)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+_cache = None
+
+
+def get_move_cache():
+    """
+    Returns the shared move cache, loading MOVE_CACHE_FILE on first use when it is set.
+    """
+    global _cache
+    if _cache is None:
+        _cache = MoveCache()
+        if MOVE_CACHE_FILE:
+            _cache.load(MOVE_CACHE_FILE)
+            atexit.register(_cache.save, MOVE_CACHE_FILE)
+    return _cache
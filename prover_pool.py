@@ -0,0 +1,250 @@
+"""
+Pool of long-lived Prover9 workers fed from a job queue.
+
+Each worker thread runs one prover process per job, so several candidate-move goals
+for one position should be batched into a single job. Jobs are submitted with
+ProverPool.submit, which returns a concurrent.futures.Future that the game loop can
+poll while it keeps rendering.
+
+The input is streamed to the prover over stdin, so nothing is written to disk and
+parallel games cannot clobber each other's files. The transcript on stdout is parsed
+line by line as it arrives, and the process is stopped once the proofs of every batched
+goal have been read; otherwise it is read to the end. Prover9 writes its status lines
+("THEOREM PROVED", fatal errors) unbuffered to stderr, ahead of the block-buffered proofs
+on stdout, so stderr is kept on its own pipe and only checked for errors. Workers that
+need files get their own directory from scratch_dir.
+"""
+import atexit
+import logging
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import zlib
+from collections import namedtuple
+from concurrent.futures import Future
+
+from constants import PROVER9_PATH
+from tracing import log, span
+
+# proved: any goal was proved, proved_goals: the goals that appear in a proof,
+# output: the transcript read before the prover was stopped (only kept when debug logging is on)
+ProverResult = namedtuple("ProverResult", ["proved", "proved_goals", "output"])
+
+SUCCESS_MARKER = "THEOREM PROVED"
+FAILURE_MARKERS = ("SEARCH FAILED", "Exiting with failure")
+ERROR_MARKERS = ("%%ERROR", "Fatal error")
+PROOF_END = "end of proof"
+
+
+def parse_proved_goals(output, goals):
+    """
+    Returns the goals that appear as "[goal]" clauses in the proofs of a Prover9 transcript.
+    """
+    transcript = ProofTranscript(goals)
+    for line in output.splitlines():
+        transcript.feed(line)
+    return transcript.proved_goals()
+
+
+class ProofTranscript:
+    """
+    Incremental parser for a Prover9 transcript, fed one line at a time.
+    """
+
+    def __init__(self, goals=(), keep_output=False):
+        self.goals = {goal: goal.replace(" ", "").rstrip(".") for goal in goals}  # Goal -> compact form
+        self.proved = set()
+        self.proofs = 0
+        self.succeeded = False
+        self.failed = False
+        self.error = None
+        self._lines = [] if keep_output else None
+
+    def feed(self, line):
+        """
+        Parses one stdout line and returns True once the proofs of every goal have been read,
+        after which the rest of the transcript cannot change the result.
+        """
+        if self._lines is not None:
+            self._lines.append(line)
+        if "[goal]" in line:
+            compact_line = line.replace(" ", "")
+            for goal, compact_goal in self.goals.items():
+                if compact_goal in compact_line:
+                    self.proved.add(goal)
+        elif PROOF_END in line:
+            self.proofs += 1
+            if not self.goals or len(self.proved) == len(self.goals):
+                return True  # Every goal of interest is proved
+        elif SUCCESS_MARKER in line:
+            self.succeeded = True
+        elif any(marker in line for marker in FAILURE_MARKERS):
+            self.failed = True
+        elif any(marker in line for marker in ERROR_MARKERS):
+            self.error = line.strip()
+        return False
+
+    def feed_stderr(self, line):
+        """
+        Parses one stderr line. Only errors are taken from stderr: its "THEOREM PROVED" can
+        arrive before any proof has been written to stdout.
+        """
+        if self._lines is not None:
+            self._lines.append(line)
+        if self.error is None and any(marker in line for marker in ERROR_MARKERS):
+            self.error = line.strip()
+
+    def proved_goals(self):
+        return [goal for goal in self.goals if goal in self.proved]
+
+    def result(self):
+        output = "".join(self._lines) if self._lines is not None else ""
+        return ProverResult(self.succeeded or self.proofs > 0, self.proved_goals(), output)
+
+
+class ProverPool:
+    """
+    Runs queued Prover9 jobs on a fixed set of worker threads.
+    """
+
+    def __init__(self, workers=None, prover9_path=PROVER9_PATH):
+        self.prover9_path = prover9_path
+        self._jobs = queue.Queue()
+        self._scratch_root = None
+        self._scratch_lock = threading.Lock()
+        self._workers = [
+            threading.Thread(target=self._worker_loop, daemon=True)
+            for _ in range(workers or os.cpu_count() or 1)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, prover_input, goals=(), theory=None):
+        """
+        Queues the Prover9 input text and returns a Future resolving to a ProverResult.
+        `goals` lists the goal formulas batched in the input, used to report which were proved.
+        With `theory`, the worker keeps that text in a file in its scratch directory and runs
+        "prover9 -f <theory file> /dev/stdin", so prover_input only holds what changes per job.
+        """
+        future = Future()
+        self._jobs.put((future, prover_input, tuple(goals), theory))
+        return future
+
+    def scratch_dir(self):
+        """
+        A private directory for the calling worker thread, created on first use and removed at shutdown.
+        """
+        with self._scratch_lock:
+            if self._scratch_root is None:
+                self._scratch_root = tempfile.mkdtemp(prefix="santa_prover_")
+        path = os.path.join(self._scratch_root, f"worker_{threading.get_ident()}")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def shutdown(self, wait=True):
+        """
+        Stops every worker once the jobs already queued have finished.
+        """
+        for _ in self._workers:
+            self._jobs.put(None)
+        if wait:
+            for worker in self._workers:
+                worker.join()
+        if self._scratch_root is not None:
+            shutil.rmtree(self._scratch_root, ignore_errors=True)
+
+    def _worker_loop(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            future, prover_input, goals, theory = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._run(prover_input, goals, theory))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _theory_file(self, theory):
+        """
+        Path of the calling worker's copy of a theory, written on first use.
+        """
+        path = os.path.join(self.scratch_dir(), f"theory_{zlib.crc32(theory.encode()):08x}.in")
+        if not os.path.exists(path):
+            with open(path, "w") as file:
+                file.write(theory)
+        return path
+
+    def _run(self, prover_input, goals, theory=None):
+        transcript = ProofTranscript(goals, keep_output=log.isEnabledFor(logging.DEBUG))
+        command = [self.prover9_path]
+        if theory is not None:
+            command += ["-f", self._theory_file(theory), "/dev/stdin"]
+        try:
+            log.debug("Running Prover9: %s < %d bytes of input", " ".join(command), len(prover_input))
+            process = subprocess.Popen(
+                command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True
+            )
+        except FileNotFoundError:
+            log.error("Prover9 executable not found at %s. Check the path and ensure Prover9 is installed.",
+                      self.prover9_path)
+            return ProverResult(False, [], "")
+
+        # stderr is drained on its own thread so a chatty prover cannot block on a full pipe
+        errors = []
+        error_reader = threading.Thread(target=_read_lines, args=(process.stderr, errors), daemon=True)
+        error_reader.start()
+        try:
+            with span("prover9.run"):
+                try:
+                    process.stdin.write(prover_input)
+                    process.stdin.close()
+                except BrokenPipeError:
+                    pass  # The prover exited early, e.g. on a syntax error; its output says why
+                for line in process.stdout:
+                    if transcript.feed(line):
+                        break
+        finally:
+            if process.poll() is None:
+                process.kill()  # Every goal is proved: the rest of the search cannot change the answer
+            process.stdout.close()
+            process.wait()
+            error_reader.join()
+            process.stderr.close()
+        for line in errors:
+            transcript.feed_stderr(line)
+
+        if transcript.error:
+            log.error("Prover9 encountered an error: %s", transcript.error)
+        result = transcript.result()
+        log.debug("Prover9 Output:\n%s", result.output)
+        return result
+
+
+def _read_lines(stream, lines):
+    for line in stream:
+        lines.append(line)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Returns the shared worker pool, starting it on first use.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProverPool()
+            atexit.register(_pool.shutdown, False)
+        return _pool
@@ -0,0 +1,273 @@
+"""
+Compact binary replay logs and a headless replayer.
+
+A log starts with a header (seed, board size, autonomous strategy, solver deadline, solver backend)
+followed by append-only records: every player action, every tick (whether the Grinch moved, the resulting
+Santa and Grinch positions, and the solver's decision, or that Santa was waiting
+for a background decision), and a final end record.
+Because games are seeded, replaying the actions and solver decisions through the
+engine must reproduce every Grinch move and the final state. Games whose solver
+decided in the background are re-run with the same decisions in flight: a decision
+is computed from the board as it was when submitted, and arrives on the tick the log
+says it did.
+
+Usage:
+    python replay.py replays/game_123.rpl [--rerun-solver]
+"""
+import argparse
+import os
+import struct
+import sys
+import time
+from concurrent.futures import Future
+
+from async_solver import AsyncSolver
+from engine import GameState, DIRECTIONS, AUTO, PLAYING, WON, LOST
+
+MAGIC = b"SRPL"
+VERSION = 5  # Bumped whenever a seed starts producing a different board or the format changes
+
+# magic, version, seed, rows, cols, strategy code, solver deadline in ms (0: synchronous), backend name length
+HEADER = struct.Struct("<4sBQHHBIB")
+HEADER_V4 = struct.Struct("<4sBQHHBB")  # Version 4 had no solver deadline
+HEADER_V3 = struct.Struct("<4sBQHHB")  # Version 3 had no strategy code either
+ACTION_RECORD = struct.Struct("<BB")  # record type, action code
+TICK_RECORD = struct.Struct("<BBHHHHbb")  # record type, flags, santa x, y, grinch x, y, solver dx, dy
+END_RECORD = struct.Struct("<BBIH")  # record type, status code, steps, presents collected
+
+RECORD_ACTION = 1
+RECORD_TICK = 2
+RECORD_END = 3
+
+TICK_GRINCH_MOVED = 1
+TICK_SOLVER_DECIDED = 2
+TICK_SOLVER_WAITING = 4  # Santa stayed put while the background solver was still deciding
+TICK_SOLVER_MISSED_DEADLINE = 8  # The background decision was late and Santa took the fallback move
+
+ACTION_CODES = {action: code for code, action in enumerate(DIRECTIONS + (AUTO,), start=1)}
+ACTIONS_BY_CODE = {code: action for action, code in ACTION_CODES.items()}
+STATUS_CODES = {PLAYING: 0, WON: 1, LOST: 2}
+STRATEGY_CODES = {"solver": 1, "planner": 2}  # 0: not recorded (version 3 logs)
+STRATEGIES_BY_CODE = {code: strategy for strategy, code in STRATEGY_CODES.items()}
+STATUS_BY_CODE = {code: status for status, code in STATUS_CODES.items()}
+
+
+class ReplayWriter:
+    """
+    Writes one game to a replay file: the header, then its records as they happen.
+    An existing file at the path is replaced.
+    """
+
+    def __init__(self, path, seed, grid_size, backend=None, strategy=None, solver_deadline_ms=None):
+        """
+        strategy is the game's autonomous strategy (GameState.strategy), which --rerun-solver needs,
+        and solver_deadline_ms its GameState.solver_deadline_ms (None: decisions made within tick).
+        """
+        rows, cols = grid_size
+        if not 0 <= seed <= 0xFFFFFFFFFFFFFFFF:
+            raise ValueError(f"Replay logs need a seed in 0..2**64-1, got {seed}")
+        if max(rows, cols) > 0xFFFF:
+            raise ValueError("Replay logs support boards up to 65535 cells per side")
+        if not 0 <= (solver_deadline_ms or 0) <= 0xFFFFFFFF:
+            raise ValueError(f"Solver deadline out of range: {solver_deadline_ms} ms")
+        backend_name = (backend or "").encode()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._file = open(path, "wb")
+        strategy_code = STRATEGY_CODES[strategy] if strategy else 0
+        self._file.write(HEADER.pack(MAGIC, VERSION, seed, rows, cols, strategy_code, solver_deadline_ms or 0,
+                                     len(backend_name))
+                         + backend_name)
+
+    def record_action(self, action):
+        self._file.write(ACTION_RECORD.pack(RECORD_ACTION, ACTION_CODES[action]))
+
+    def record_tick(self, grinch_moved, santa_position, grinch_position, solver_offset, solver_waiting=False,
+                    missed_deadline=False):
+        flags = TICK_GRINCH_MOVED if grinch_moved else 0
+        if solver_waiting:
+            flags |= TICK_SOLVER_WAITING
+        if missed_deadline:
+            flags |= TICK_SOLVER_MISSED_DEADLINE
+        dx = dy = 0
+        if solver_offset is not None:
+            flags |= TICK_SOLVER_DECIDED
+            dx, dy = solver_offset
+        self._file.write(TICK_RECORD.pack(RECORD_TICK, flags, santa_position[0], santa_position[1],
+                                          grinch_position[0], grinch_position[1], dx, dy))
+
+    def record_end(self, status, steps, collected_presents):
+        self._file.write(END_RECORD.pack(RECORD_END, STATUS_CODES[status], steps, collected_presents))
+
+    def close(self):
+        self._file.close()
+
+
+class _DeferredDecision(Future):
+    """
+    A background decision being re-run: computed from its submission snapshot when it is
+    first checked on a tick where the log says it arrived.
+    """
+
+    def __init__(self, decisions, fn, args):
+        super().__init__()
+        self._decisions = decisions
+        self._call = (fn, args)
+
+    def done(self):
+        if self._decisions.arrived and not super().done() and self.set_running_or_notify_cancel():
+            fn, args = self._call
+            try:
+                self.set_result(fn(*args))
+            except Exception as e:
+                self.set_exception(e)
+        return super().done()
+
+
+class _BackgroundDecisions:
+    """
+    Executor and clock for an AsyncSolver re-running a game whose solver decided in the background.
+    Each tick's flags say whether the pending decision arrived, is still running, or missed its deadline.
+    """
+
+    def __init__(self):
+        self.arrived = False
+        self._now = 0.0
+
+    def clock(self):
+        return self._now
+
+    def submit(self, fn, *args):
+        return _DeferredDecision(self, fn, args)
+
+    def start_tick(self, flags):
+        late = bool(flags & TICK_SOLVER_MISSED_DEADLINE)
+        self.arrived = bool(flags & TICK_SOLVER_DECIDED) and not late
+        self._now = float("inf") if late else 0.0
+
+
+def read_replay(path):
+    """
+    Returns (header dict, list of records) where each record is a (type, fields) tuple.
+    Version 3 and 4 logs are read too. Version 3 did not record the strategy, so theirs is None;
+    neither recorded the solver deadline, so theirs is None as for synchronous games.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+
+    if len(data) < HEADER_V3.size or data[:4] != MAGIC or data[4] not in (3, 4, VERSION):
+        raise ValueError(f"{path} is not a version {VERSION} replay log")
+    version = data[4]
+    deadline_ms = 0
+    if version == 3:
+        _, _, seed, rows, cols, name_length = HEADER_V3.unpack_from(data, 0)
+        strategy_code, offset = 0, HEADER_V3.size
+    elif version == 4:
+        _, _, seed, rows, cols, strategy_code, name_length = HEADER_V4.unpack_from(data, 0)
+        offset = HEADER_V4.size
+    else:
+        _, _, seed, rows, cols, strategy_code, deadline_ms, name_length = HEADER.unpack_from(data, 0)
+        offset = HEADER.size
+    if strategy_code and strategy_code not in STRATEGIES_BY_CODE:
+        raise ValueError(f"Unknown strategy code {strategy_code} in {path}")
+    backend = data[offset:offset + name_length].decode() or None
+    offset += name_length
+    header = {"seed": seed, "grid_size": (rows, cols), "backend": backend, "version": version,
+              "strategy": STRATEGIES_BY_CODE.get(strategy_code), "solver_deadline_ms": deadline_ms or None}
+
+    layouts = {RECORD_ACTION: ACTION_RECORD, RECORD_TICK: TICK_RECORD, RECORD_END: END_RECORD}
+    records = []
+    while offset < len(data):
+        layout = layouts.get(data[offset])
+        if layout is None or offset + layout.size > len(data):
+            raise ValueError(f"Corrupt replay record at byte {offset}")
+        fields = layout.unpack_from(data, offset)
+        records.append((fields[0], fields[1:]))
+        offset += layout.size
+    return header, records
+
+
+def replay(path, rerun_solver=False):
+    """
+    Re-executes a replay log headlessly.
+
+    Actions and, unless rerun_solver is set, the recorded solver decisions are fed back
+    into a GameState built from the same seed. Every tick's positions and the end record
+    are compared with the re-executed game. Returns a dict describing the outcome; "ok"
+    is False and "mismatch" names the first divergence when they differ.
+    The game is rebuilt with the recorded strategy. Version 3 logs do not record it, so
+    they can only be replayed with their recorded solver decisions. When the solver decided
+    in the background, rerun_solver recomputes each decision from the board at submission
+    and applies it on the tick it arrived; a decision that missed its deadline takes the
+    fallback move again.
+    """
+    header, records = read_replay(path)
+    if rerun_solver and header["strategy"] is None:
+        raise ValueError(f"{path} does not record the autonomous strategy; replay it without --rerun-solver")
+    state = GameState(header["grid_size"], seed=header["seed"], backend=header["backend"],
+                      strategy=header["strategy"])
+    background = None
+    if rerun_solver and header["solver_deadline_ms"] and state.strategy == "solver":
+        background = _BackgroundDecisions()
+        state.async_solver = AsyncSolver(state.grid_size, header["backend"], header["solver_deadline_ms"],
+                                         clock=background.clock, executor=background)
+    start = time.perf_counter()
+    result = {"ticks": 0, "ok": True, "mismatch": None}
+
+    for record_type, fields in records:
+        if record_type == RECORD_ACTION:
+            state.handle_action(ACTIONS_BY_CODE[fields[0]])
+        elif record_type == RECORD_TICK:
+            flags, santa_x, santa_y, grinch_x, grinch_y, dx, dy = fields
+            solver_move = None
+            if background is not None:
+                background.start_tick(flags)
+            elif flags & TICK_SOLVER_WAITING:
+                solver_move = list(state.santa_position)  # No decision had arrived; Santa stayed put
+            elif flags & TICK_SOLVER_DECIDED and not rerun_solver:
+                solver_move = [state.santa_position[0] + dx, state.santa_position[1] + dy]
+            state.tick(move_grinch=bool(flags & TICK_GRINCH_MOVED), solver_move=solver_move)
+            result["ticks"] += 1
+            if state.santa_position != [santa_x, santa_y] or list(state.grinch_position) != [grinch_x, grinch_y]:
+                result["mismatch"] = (f"tick {result['ticks']}: expected Santa {(santa_x, santa_y)} and Grinch "
+                                      f"{(grinch_x, grinch_y)}, got {tuple(state.santa_position)} and "
+                                      f"{tuple(state.grinch_position)}")
+                break
+        elif record_type == RECORD_END:
+            status, steps, collected = fields
+            expected = (STATUS_BY_CODE[status], steps, collected)
+            actual = (state.status, state.steps, state.collected_presents)
+            if expected != actual:
+                result["mismatch"] = f"final state: expected {expected}, got {actual}"
+
+    result["ok"] = result["mismatch"] is None
+    result["status"] = state.status
+    result["steps"] = state.steps
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-execute a replay log and check the final state.")
+    parser.add_argument("path", help="replay file")
+    parser.add_argument("--rerun-solver", action="store_true",
+                        help="recompute solver decisions instead of replaying the recorded ones")
+    args = parser.parse_args(argv)
+
+    try:
+        result = replay(args.path, args.rerun_solver)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Replayed {result['ticks']} ticks in {result['elapsed']:.3f}s: status {result['status']}, "
+          f"steps {result['steps']}")
+    if not result["ok"]:
+        print(f"Replay diverged at {result['mismatch']}")
+        return 1
+    print("Final state matches the log.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
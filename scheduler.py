@@ -0,0 +1,101 @@
+"""
+Frame scheduler for the pygame loops.
+
+Rendering is capped at TARGET_FPS and drops to IDLE_FPS after IDLE_AFTER_MS without
+activity. The simulation runs on a fixed SIM_TICK_MS timestep, independent of the
+render rate. Recurring game events, such as the Grinch's move, are scheduled on
+simulation time and reported with the tick they fall on. The scheduler only needs
+a clock and a sleep function, so it has no pygame dependency.
+"""
+import time
+
+from constants import TARGET_FPS, IDLE_FPS, IDLE_AFTER_MS, SIM_TICK_MS
+
+MAX_CATCH_UP_TICKS = 10  # Ticks simulated at most per frame after a stall
+
+
+class FrameScheduler:
+    """
+    Paces one loop: simulation ticks, scheduled events and frame-rate capping.
+    """
+
+    def __init__(self, target_fps=TARGET_FPS, idle_fps=IDLE_FPS, idle_after_ms=IDLE_AFTER_MS,
+                 sim_tick_ms=SIM_TICK_MS, clock=time.perf_counter, sleep=time.sleep):
+        self.target_fps = target_fps
+        self.idle_fps = idle_fps
+        self.idle_after_ms = idle_after_ms
+        self.sim_tick_ms = sim_tick_ms
+        self._clock = clock
+        self._sleep = sleep
+
+        now = clock()
+        self._frame_start = now
+        self._last_tick_time = now
+        self._last_activity = now
+        self._accumulator_ms = 0.0
+        self._events = {}  # name -> [interval_ms, next_due_ms]
+
+        self.sim_time_ms = 0
+        self.frame_count = 0
+        self.frame_time_ms = 0.0  # Smoothed time spent working per frame, excluding the wait
+        self.fps = 0.0  # Smoothed measured frame rate
+        self.idle = False
+
+    def every(self, name, interval_ms):
+        """
+        Schedules a recurring event on simulation time, first due one interval from now.
+        """
+        self._events[name] = [interval_ms, self.sim_time_ms + interval_ms]
+
+    def simulation_ticks(self):
+        """
+        Yields once per fixed simulation tick owed since the last call, with the set of
+        scheduled event names that fall due on that tick.
+        """
+        now = self._clock()
+        self._accumulator_ms += (now - self._last_tick_time) * 1000
+        self._last_tick_time = now
+        self._accumulator_ms = min(self._accumulator_ms, self.sim_tick_ms * MAX_CATCH_UP_TICKS)
+
+        while self._accumulator_ms >= self.sim_tick_ms:
+            self._accumulator_ms -= self.sim_tick_ms
+            self.sim_time_ms += self.sim_tick_ms
+            due = set()
+            for name, event in self._events.items():
+                if self.sim_time_ms >= event[1]:
+                    due.add(name)
+                    event[1] += event[0]
+            yield due
+
+    def end_frame(self, active):
+        """
+        Records the frame's work time and sleeps until the next frame is due.
+        `active` is True when there was input or something on screen is animating.
+        """
+        now = self._clock()
+        if active:
+            self._last_activity = now
+        self.idle = (now - self._last_activity) * 1000 >= self.idle_after_ms
+
+        work_ms = (now - self._frame_start) * 1000
+        self.frame_time_ms = work_ms if self.frame_count == 0 else 0.9 * self.frame_time_ms + 0.1 * work_ms
+
+        frame_budget = 1.0 / (self.idle_fps if self.idle else self.target_fps)
+        remaining = frame_budget - (now - self._frame_start)
+        if remaining > 0:
+            self._sleep(remaining)
+
+        end = self._clock()
+        frame_seconds = end - self._frame_start
+        if frame_seconds > 0:
+            measured = 1.0 / frame_seconds
+            self.fps = measured if self.frame_count == 0 else 0.9 * self.fps + 0.1 * measured
+        self._frame_start = end
+        self.frame_count += 1
+
+    def report(self):
+        """
+        One-line summary of the measured frame rate and frame time.
+        """
+        mode = "idle" if self.idle else "active"
+        return f"{self.fps:.0f} FPS, {self.frame_time_ms:.1f} ms/frame ({mode})"
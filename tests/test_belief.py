@@ -0,0 +1,118 @@
+import random
+from collections import Counter
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from belief import GrinchBelief, SparseGrinchBelief
+from board_index import BoardIndex
+from game_logic import grinch_move
+
+GRID_SIZE = (6, 6)
+# (0, 0) is boxed in, so a Grinch there never moves
+OBSTACLES = {(0, 1), (1, 0), (2, 3), (3, 3), (4, 1)}
+PARTICLES = 100000
+
+# Santa's cell and whether he hears the Grinch, after each Grinch move
+OBSERVATIONS = [((2, 2), True), ((2, 2), False), ((5, 4), False), ((4, 4), False), ((3, 5), False)]
+
+
+def simulate(board_index, rng):
+    """
+    Grinch walks started from a uniform passable cell, run through grinch_move and kept
+    only when they agree with every observation (rejection sampling).
+    """
+    passable = [(x, y) for x in range(GRID_SIZE[0]) for y in range(GRID_SIZE[1]) if (x, y) not in OBSTACLES]
+    particles = [rng.choice(passable) for _ in range(PARTICLES)]
+    for santa, heard in OBSERVATIONS:
+        particles = [tuple(grinch_move(grinch, GRID_SIZE, OBSTACLES, rng, board_index)) for grinch in particles]
+        near = set(board_index.neighbors(santa))
+        particles = [grinch for grinch in particles if grinch != santa and (grinch in near) == heard]
+    return particles
+
+
+def distribution(particles):
+    counts = Counter(particles)
+    result = np.zeros(GRID_SIZE)
+    for (x, y), count in counts.items():
+        result[x, y] = count / len(particles)
+    return result
+
+
+def test_belief_matches_simulated_grinch_walks():
+    board_index = BoardIndex(GRID_SIZE, OBSTACLES)
+    rng = random.Random(0)
+    particles = simulate(board_index, rng)
+    assert len(particles) > 1000
+
+    belief = GrinchBelief(board_index)
+    for santa, heard in OBSERVATIONS:
+        belief.predict()
+        belief.observe(santa, heard)
+    assert belief.belief.sum() == pytest.approx(1.0)
+    assert np.abs(belief.belief - distribution(particles)).max() < 0.02
+
+    # One more move of the surviving walks is the belief's next-step prediction
+    moved = [tuple(grinch_move(grinch, GRID_SIZE, OBSTACLES, rng, board_index)) for grinch in particles]
+    predicted = belief._transition(belief.belief, np.empty(GRID_SIZE))
+    assert np.abs(predicted - distribution(moved)).max() < 0.02
+
+
+def test_boxed_in_cell_keeps_its_probability():
+    belief = GrinchBelief(BoardIndex(GRID_SIZE, OBSTACLES))
+    start = belief.belief[0, 0]
+    for _ in range(10):
+        belief.predict()
+    assert belief.belief[0, 0] == pytest.approx(start)
+    assert belief.belief.sum() == pytest.approx(1.0)
+
+
+def test_risk_matches_risk_map():
+    belief = GrinchBelief(BoardIndex(GRID_SIZE, OBSTACLES))
+    for santa, heard in OBSERVATIONS:
+        belief.predict()
+        belief.observe(santa, heard)
+        risk_map = belief.risk_map()
+        for x in range(GRID_SIZE[0]):
+            for y in range(GRID_SIZE[1]):
+                assert belief.risk((x, y)) == pytest.approx(risk_map[x, y])
+
+
+def stationary(board_index):
+    weights = np.zeros(GRID_SIZE)
+    for x in range(GRID_SIZE[0]):
+        for y in range(GRID_SIZE[1]):
+            if (x, y) not in OBSTACLES:
+                weights[x, y] = max(len(board_index.passable_neighbors((x, y))), 1)
+    return weights / weights.sum()
+
+
+def test_sparse_belief_matches_dense_belief():
+    board_index = BoardIndex(GRID_SIZE, OBSTACLES)
+    dense = GrinchBelief(board_index)
+    dense.belief = stationary(board_index)  # The sparse belief's prior
+    sparse = SparseGrinchBelief(board_index, prune=0.0, max_cells=PARTICLES)
+    cells = [(x, y) for x in range(GRID_SIZE[0]) for y in range(GRID_SIZE[1])]
+    for santa, heard in [((4, 4), False)] + OBSERVATIONS:
+        dense.predict()
+        sparse.predict()
+        dense.observe(santa, heard)
+        sparse.observe(santa, heard)
+        for cell in cells:
+            assert sparse.probability(cell) == pytest.approx(dense.belief[cell], abs=1e-12)
+            assert sparse.risk(cell) == pytest.approx(dense.risk(cell), abs=1e-12)
+
+
+def test_sparse_belief_stays_bounded():
+    grid_size = (60, 60)
+    board_index = BoardIndex(grid_size)
+    belief = SparseGrinchBelief(board_index, max_cells=200)
+    belief.observe((30, 30), True)
+    for _ in range(100):
+        belief.predict()
+        belief.observe((0, 0), False)
+        assert len(belief.deviation) <= 200
+    assert belief.weight > 0  # The spread-out sighting was folded into the stationary part
+    total = sum(belief.probability((x, y)) for x in range(grid_size[0]) for y in range(grid_size[1]))
+    assert total == pytest.approx(1.0)
@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+import board_index
+import chunk_store
+import clue_field
+from engine import build_grid, build_grid_model, empty_grid
+from levels import generate_level
+from validator import generate_neighbors
+
+SIZES = [(1, 1), (1, 5), (7, 3), (10, 10), (37, 53)]
+
+
+@pytest.mark.skipif(board_index.np is None, reason="needs numpy")
+@pytest.mark.parametrize("grid_size", SIZES)
+def test_numpy_adjacency_matches_python(grid_size, monkeypatch):
+    rows, cols = grid_size
+    rng = random.Random(rows * cols)
+    blocked = frozenset((x, y) for x in range(rows) for y in range(cols) if rng.random() < 0.3)
+    vectorised = board_index._build_adjacency(rows, cols, blocked)
+    monkeypatch.setattr(board_index, "np", None)
+    assert vectorised == board_index._build_adjacency(rows, cols, blocked)
+
+
+def test_neighbour_order():
+    index = board_index.BoardIndex((3, 3), [(0, 1)])
+    assert index.neighbors((1, 1)) == [(0, 1), (2, 1), (1, 0), (1, 2)]
+    assert index.passable_neighbors((1, 1)) == [(2, 1), (1, 0), (1, 2)]
+    assert index.passable_neighbors((0, 1)) == []
+
+
+@pytest.mark.parametrize("large", [False, True])
+def test_cells_off_the_board_have_no_neighbours(large, monkeypatch):
+    if large:
+        monkeypatch.setattr(chunk_store, "SPARSE_BOARD_CELLS", 1)
+    index = board_index.BoardIndex((5, 5), [(1, 1)])
+    for cell in [(0, 5), (5, 0), (-1, 2), (2, -1)]:
+        assert index.neighbors(cell) == []
+        assert index.passable_neighbors(cell) == []
+
+
+def test_generate_neighbors_off_the_board():
+    assert generate_neighbors((0, 5), (5, 5)) == [(0, 4)]
+    assert generate_neighbors((5, 0), (5, 5)) == [(4, 0)]
+    assert generate_neighbors((2, 2), (5, 5)) == [(1, 2), (3, 2), (2, 1), (2, 3)]
+
+
+def test_large_boards_compute_the_same_neighbours(monkeypatch):
+    grid_size = (37, 53)
+    rng = random.Random(11)
+    obstacles = {(x, y) for x in range(grid_size[0]) for y in range(grid_size[1]) if rng.random() < 0.3}
+    tables = board_index.BoardIndex(grid_size, obstacles)
+    monkeypatch.setattr(chunk_store, "SPARSE_BOARD_CELLS", 100)
+    computed = board_index.BoardIndex(grid_size, obstacles)
+    assert computed.neighbor_offsets is None
+    for x in range(grid_size[0]):
+        for y in range(grid_size[1]):
+            assert computed.neighbors((x, y)) == tables.neighbors((x, y))
+            assert computed.passable_neighbors((x, y)) == tables.passable_neighbors((x, y))
+    assert computed.distance_field((20, 30)) == tables.distance_field((20, 30))
+
+
+@pytest.mark.parametrize("backend", [
+    "lists",
+    "bitboard",
+    "chunked",
+    pytest.param("numpy", marks=pytest.mark.skipif(not clue_field.HAVE_NUMPY, reason="needs numpy")),
+])
+def test_grid_model_matches_full_build(backend):
+    grid_size = (23, 31)
+    grinch, exit_point, obstacles, presents = generate_level(grid_size, random.Random(5), 0.3, 12)
+    model = build_grid_model(grid_size, [0, 0], grinch, exit_point, presents, obstacles, backend)
+
+    present = sorted(presents)[0]
+    model.remove_object(2, present)
+    presents = set(presents) - {present}
+    model.move_object(16, grinch, (0, 0))
+    expected = build_grid(grid_size, [0, 0], (0, 0), exit_point, presents, obstacles, backend)
+    assert all(int(model.grid[x][y]) == int(expected[x][y])
+               for x in range(grid_size[0]) for y in range(grid_size[1]))
+
+
+def test_numpy_grid_needs_numpy(monkeypatch):
+    monkeypatch.setattr(clue_field, "HAVE_NUMPY", False)
+    monkeypatch.setattr(clue_field, "np", None)
+    with pytest.raises(ImportError, match="pip install numpy"):
+        empty_grid((3, 3), "numpy")
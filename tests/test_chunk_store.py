@@ -0,0 +1,47 @@
+import pytest
+
+import chunk_store
+from chunk_store import ChunkedArray, ChunkedGrid
+from engine import GameState, AUTO, PLAYING
+
+
+def test_chunks_are_allocated_on_first_write():
+    table = ChunkedArray(10000, "I", chunk_cells=100)
+    assert table[5000] == 0
+    table[5000] = 0
+    assert table.allocated_chunks() == 0
+    table[5001] = 7
+    table[9999] = 1
+    assert (table[5001], table[5000], table[9999]) == (7, 0, 1)
+    assert table.allocated_chunks() == 2
+    with pytest.raises(IndexError):
+        table[10000] = 1
+
+
+def test_grid_rows_are_allocated_on_use():
+    grid = ChunkedGrid(1000, 500)
+    grid[3][4] |= 64
+    grid[3][4] |= 2
+    assert grid[3][4] == 66
+    assert grid.allocated_rows() == 1
+    with pytest.raises(IndexError):
+        grid[1000]
+
+
+@pytest.mark.parametrize("seed", [1, 8, 23])
+def test_sparse_storage_plays_like_dense_storage(seed, monkeypatch):
+    dense = GameState(seed=seed, grinch_period=2, backend="inference", strategy="solver")
+    monkeypatch.setattr(chunk_store, "SPARSE_BOARD_CELLS", 1)
+    sparse = GameState(seed=seed, grinch_period=2, backend="inference", strategy="solver")
+    assert isinstance(sparse.grid, ChunkedGrid)
+
+    cells = [(x, y) for x in range(10) for y in range(10)]
+    for action in [AUTO] + [None] * 80:
+        dense.step(action)
+        sparse.step(action)
+        assert sparse.santa_position == dense.santa_position
+        assert all(sparse.grid[x][y] == dense.grid[x][y] for x, y in cells)
+        assert all(sparse.known_clues.clues_at(cell) == dense.known_clues.clues_at(cell) for cell in cells)
+        if dense.status != PLAYING:
+            break
+    assert sparse.status == dense.status
@@ -0,0 +1,87 @@
+import pytest
+
+import game_logic
+import move_cache
+from engine import GameState, AUTO, PLAYING, WON
+from game_logic import play_game
+
+
+@pytest.fixture(autouse=True)
+def fresh_move_cache(monkeypatch):
+    # Every game starts from an empty move cache, as in a new process
+    monkeypatch.setattr(move_cache, "_cache", None)
+
+
+def play(state, max_steps=500):
+    state.step(AUTO)
+    while state.status == PLAYING and state.steps < max_steps:
+        state.step()
+    return state
+
+
+def test_last_position_is_the_previous_cell():
+    state = GameState(seed=344, grinch_period=4, backend="inference", strategy="solver")
+    assert state.last_position == state.santa_position
+    state.step(AUTO)
+    previous = [0, 0]
+    for _ in range(10):
+        position = list(state.santa_position)
+        state.step()
+        if state.santa_position != position:
+            previous = position
+        assert state.last_position == previous
+
+
+def test_solver_does_not_swing_back_and_forth():
+    state = GameState(seed=0, grinch_period=4, backend="inference", strategy="solver")
+    state.step(AUTO)
+    visited = {tuple(state.santa_position)}
+    for _ in range(6):
+        state.step()
+        visited.add(tuple(state.santa_position))
+    assert len(visited) > 2
+
+
+def test_solver_strategy_wins_a_seed():
+    # Passing Santa's own cell as the last position leaves this game swinging until the step limit
+    state = play(GameState(grid_size=(5, 5), seed=277, grinch_period=4, backend="inference", strategy="solver"))
+    assert state.status == WON
+    assert state.collected_presents == state.total_presents
+
+
+@pytest.mark.parametrize("solver_deadline_ms", [None, 1000])
+def test_auto_moves_keep_collision_messages(solver_deadline_ms):
+    state = GameState(grid_size=(5, 5), seed=277, backend="inference", strategy="solver",
+                      solver_deadline_ms=solver_deadline_ms)
+    state.step(AUTO)
+    while state.status == PLAYING and state.steps < 2000:
+        collected = state.collected_presents
+        state.step()
+        if state.collected_presents > collected:
+            assert state.feedback_message == "Present collected!"
+        if state.status == PLAYING and state.async_solver is not None:
+            state.async_solver.pending[0].result()  # Let the solver thread finish the decision
+    assert state.collected_presents > 0
+
+
+@pytest.mark.parametrize("backend, solver", [("inference", "The inference engine"), ("prover9", "Prover9")])
+def test_solver_message_names_the_backend(backend, solver, monkeypatch):
+    monkeypatch.setattr(game_logic, "validate_move_and_update", lambda santa_position, *args: santa_position)
+    state = GameState(grid_size=(5, 5), seed=277)
+    _, message = play_game(state.santa_position, None, True, state._game_clues(), state.known_clues, state.grid,
+                           state.grid_size, backend=backend)
+    assert message == f"{solver} determined the next move."
+
+
+def test_only_the_autonomous_solver_keeps_a_grinch_belief():
+    pytest.importorskip("numpy")
+    state = GameState(seed=1, grinch_period=2, strategy="solver")
+    for _ in range(4):
+        state.step()
+    assert state.grinch_belief is None
+    state.step(AUTO)
+    assert state.grinch_belief is not None
+
+    planner = GameState(seed=1, grinch_period=2, strategy="planner")
+    planner.step(AUTO)
+    assert planner.grinch_belief is None
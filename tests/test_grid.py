@@ -0,0 +1,73 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import pytest
+
+from constants import GRID_ROWS, GRID_COLS, CELL_SIZE
+from engine import GameState, AUTO, PLAYING
+from grid import GridRenderer, draw_grid
+
+SPRITES = {"santa": (255, 0, 0), "grinch": (0, 255, 0), "present": (0, 0, 255),
+           "obstacle": (90, 90, 90), "exit": (255, 255, 0)}
+
+
+@pytest.fixture(autouse=True)
+def display():
+    pygame.display.init()
+    yield
+    pygame.display.quit()
+
+
+def sprites():
+    # Round, half-transparent sprites, so the clue dots and grid lines under them must match too
+    assets = {}
+    for name, color in SPRITES.items():
+        assets[name] = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
+        pygame.draw.circle(assets[name], color + (160,), (CELL_SIZE // 2, CELL_SIZE // 2), CELL_SIZE // 3)
+    return assets
+
+
+def board_surface():
+    return pygame.Surface((GRID_COLS * CELL_SIZE, GRID_ROWS * CELL_SIZE))
+
+
+def pixels(surface):
+    return pygame.image.tostring(surface, "RGB")
+
+
+@pytest.mark.parametrize("seed", [1, 7, 23])
+def test_renderer_matches_full_redraw(seed):
+    state = GameState(seed=seed, grinch_period=2, backend="inference", strategy="planner")
+    assets = sprites()
+    screen = board_surface()
+    expected = board_surface()
+    renderer = GridRenderer(screen, assets, state.obstacles, state.exit_point)
+
+    state.step(AUTO)
+    for frame in range(60):
+        renderer.draw(state.santa_position, state.grinch_position, state.presents)
+        draw_grid(expected, assets, state.santa_position, state.grinch_position, state.presents, state.obstacles,
+                  state.exit_point)
+        assert pixels(screen) == pixels(expected), f"frame {frame}"
+        if state.status != PLAYING:
+            break
+        state.step()
+
+
+def test_invalidate_repaints_everything():
+    state = GameState(seed=3)
+    assets = sprites()
+    screen = board_surface()
+    expected = board_surface()
+    renderer = GridRenderer(screen, assets, state.obstacles, state.exit_point)
+    renderer.draw(state.santa_position, state.grinch_position, state.presents)
+
+    screen.fill((1, 2, 3))
+    renderer.invalidate()
+    dirty = renderer.draw(state.santa_position, state.grinch_position, state.presents)
+    draw_grid(expected, assets, state.santa_position, state.grinch_position, state.presents, state.obstacles,
+              state.exit_point)
+    assert dirty == [screen.get_rect()]
+    assert pixels(screen) == pixels(expected)
@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+import move_cache
+import validator
+from inference import infer_move
+from move_cache import MoveCache, neighbourhood_key
+
+GRID_SIZE = (5, 6)
+
+
+@pytest.fixture
+def fresh_cache(monkeypatch):
+    cache = MoveCache()
+    monkeypatch.setattr(move_cache, "_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def decisions(monkeypatch):
+    """
+    Stands in for the Prover9 backend with the inference rules, recording every decision made.
+    """
+    calls = []
+
+    def decide(santa_position, last_position, clues, grid, grid_size, backend, belief=None):
+        calls.append(tuple(santa_position))
+        return infer_move(santa_position, last_position, grid, grid_size) or santa_position
+    monkeypatch.setattr(validator, "decide_move", decide)
+    return calls
+
+
+def random_grid(rng):
+    return [[rng.choice([0, 0, 0, 4, 16, 32]) for _ in range(GRID_SIZE[1])] for _ in range(GRID_SIZE[0])]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_cached_moves_match_fresh_decisions(seed, fresh_cache, decisions):
+    rng = random.Random(seed)
+    for _ in range(20):
+        grid = random_grid(rng)
+        for x in range(GRID_SIZE[0]):
+            for y in range(GRID_SIZE[1]):
+                last = rng.choice([(x, y), (x - 1, y), (x, y + 1)])
+                move = validator.validate_move_and_update((x, y), last, {}, grid, GRID_SIZE, "prover9")
+                assert move == (infer_move((x, y), last, grid, GRID_SIZE) or (x, y))
+    assert fresh_cache.hits > 0
+    assert len(decisions) == fresh_cache.misses
+
+
+def test_mirrored_neighbourhoods_have_their_own_keys():
+    grid = [[0] * 3 for _ in range(3)]
+    grid[0][1] = 4
+    mirrored = [[0] * 3 for _ in range(3)]
+    mirrored[2][1] = 4
+    key = neighbourhood_key((1, 1), (1, 1), {}, grid, (3, 3), "prover9")
+    assert key != neighbourhood_key((1, 1), (1, 1), {}, mirrored, (3, 3), "prover9")
+
+
+def test_inference_backend_skips_the_cache(fresh_cache):
+    grid = [[0] * 3 for _ in range(3)]
+    validator.validate_move_and_update((1, 1), (1, 1), {}, grid, (3, 3), "inference")
+    assert fresh_cache.stats()["hits"] + fresh_cache.stats()["misses"] == 0
+
+
+def test_save_and_load(tmp_path):
+    grid = [[0] * 3 for _ in range(3)]
+    key = neighbourhood_key((1, 1), (1, 0), {}, grid, (3, 3), "prover9")
+    cache = MoveCache()
+    cache.put(key, (1, 1), (2, 1))
+    path = tmp_path / "move_cache.json"
+    cache.save(path)
+
+    loaded = MoveCache()
+    loaded.load(path)
+    assert loaded.get(key, (4, 4)) == (5, 4)
@@ -0,0 +1,94 @@
+import sys
+import textwrap
+import time
+
+import pytest
+
+from prover_pool import ProverPool, ProofTranscript, parse_proved_goals
+from validator import PROVER9_THEORY, build_prover9_delta, move_goals, ranked_moves
+
+# Stands in for Prover9. Like the real prover, it reports "THEOREM PROVED" unbuffered on
+# stderr before the block-buffered proofs reach stdout, and proves the goals out of order.
+FAKE_PROVER9 = '''
+import os, re, sys, time
+text = sys.stdin.read()
+goals = re.findall(r"^(\\w+\\([^)]*\\))\\.$", text.split("formulas(goals).")[-1], re.M)
+mode = os.environ.get("FAKE_PROVER9_MODE", "all")
+sys.stderr.write("THEOREM PROVED\\n")
+sys.stderr.flush()
+if mode == "error":
+    sys.stderr.write("Fatal error:  bad input\\n")
+    sys.exit(1)
+proved = goals if mode == "all" else [goal for goal in goals if goal.startswith("move_to")]
+for number, goal in enumerate(reversed(proved), 1):
+    print("============================== PROOF =================================")
+    print(f"% Proof {number} at 0.01 (+ 0.00) seconds.")
+    print(f"1 {goal.replace(' ', '')} # label(non_clause) # label(goal).  [goal].")
+    print(f"2 -{goal.replace(' ', '')}.  [deny(1)].")
+    print("============================== end of proof ==========================")
+sys.stdout.flush()
+if mode == "all":
+    time.sleep(60)  # Keeps searching; the pool has to stop it
+print("SEARCH FAILED")
+'''
+
+SANTA = (1, 1)
+CANDIDATES = [(1, 0), (1, 2), (0, 1), (2, 1)]
+GRID = [[0, 0, 0], [0, 1, 0], [0, 0, 0]]
+
+
+@pytest.fixture
+def pool(tmp_path):
+    script = tmp_path / "prover9"
+    script.write_text(f"#!{sys.executable}\n" + textwrap.dedent(FAKE_PROVER9))
+    script.chmod(0o755)
+    pool = ProverPool(workers=1, prover9_path=str(script))
+    yield pool
+    pool.shutdown()
+
+
+def submit(pool):
+    goals = move_goals(SANTA, CANDIDATES)
+    delta = build_prover9_delta(SANTA, SANTA, GRID, (3, 3), goals)
+    return goals, pool.submit(PROVER9_THEORY + delta, goals).result(timeout=30)
+
+
+def test_every_goal_is_read_before_stopping(pool, monkeypatch):
+    monkeypatch.setenv("FAKE_PROVER9_MODE", "all")
+    start = time.perf_counter()
+    goals, result = submit(pool)
+    assert time.perf_counter() - start < 10  # Stopped after the last proof instead of searching on
+    assert result.proved
+    assert result.proved_goals == goals
+    assert ranked_moves(SANTA, CANDIDATES, result.proved_goals) == CANDIDATES
+
+
+def test_unproved_goals_are_read_to_the_end(pool, monkeypatch):
+    monkeypatch.setenv("FAKE_PROVER9_MODE", "move_to")
+    goals, result = submit(pool)
+    assert result.proved_goals == [goal for goal in goals if goal.startswith("move_to")]
+    assert ranked_moves(SANTA, CANDIDATES, result.proved_goals) == CANDIDATES
+
+
+def test_errors_on_stderr(pool, monkeypatch):
+    monkeypatch.setenv("FAKE_PROVER9_MODE", "error")
+    _, result = submit(pool)
+    assert not result.proved
+    assert result.proved_goals == []
+
+
+def test_transcript_ignores_success_before_proofs():
+    goals = ["move_to(1, 1, 0, 1)", "move_to(1, 1, 2, 1)"]
+    transcript = ProofTranscript(goals)
+    transcript.feed_stderr("THEOREM PROVED\n")
+    assert not transcript.feed("1 move_to(1,1,2,1) # label(goal).  [goal].\n")
+    assert not transcript.feed("============================== end of proof ==========================\n")
+    assert not transcript.feed("THEOREM PROVED\n")
+    assert not transcript.feed("1 move_to(1,1,0,1) # label(goal).  [goal].\n")
+    assert transcript.feed("============================== end of proof ==========================\n")
+    assert transcript.proved_goals() == goals
+
+
+def test_parse_proved_goals_matches_whole_terms():
+    output = "1 move_to(11,1,0,1) # label(goal).  [goal].\n============ end of proof ============\n"
+    assert parse_proved_goals(output, ["move_to(1, 1, 0, 1)"]) == []
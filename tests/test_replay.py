@@ -0,0 +1,133 @@
+import struct
+from concurrent.futures import Future
+
+import pytest
+
+from async_solver import AsyncSolver
+from engine import GameState, AUTO, PLAYING
+from replay import (
+    HEADER,
+    HEADER_V3,
+    MAGIC,
+    RECORD_TICK,
+    TICK_SOLVER_MISSED_DEADLINE,
+    TICK_SOLVER_WAITING,
+    ReplayWriter,
+    read_replay,
+    replay,
+)
+
+
+def record_game(path, seed, strategy, max_steps=300):
+    state = GameState(seed=seed, grinch_period=3, backend="inference", strategy=strategy)
+    state.recorder = ReplayWriter(str(path), state.seed, state.grid_size, "inference", state.strategy)
+    state.step(AUTO)
+    while state.status == PLAYING and state.steps < max_steps:
+        state.step()
+    state.close_replay()
+    return state
+
+
+@pytest.mark.parametrize("strategy", ["solver", "planner"])
+@pytest.mark.parametrize("seed", [1, 7, 12])
+def test_round_trip(tmp_path, strategy, seed):
+    path = tmp_path / "game.rpl"
+    state = record_game(path, seed, strategy)
+
+    header, _ = read_replay(str(path))
+    assert header["strategy"] == strategy
+    assert header["seed"] == seed
+    for rerun_solver in (False, True):
+        result = replay(str(path), rerun_solver=rerun_solver)
+        assert result["ok"], result["mismatch"]
+        assert (result["status"], result["steps"]) == (state.status, state.steps)
+
+
+class HeldExecutor:
+    """
+    Runs background decisions only when the test releases them.
+    """
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.jobs.append((future, fn, args))
+        return future
+
+    def release(self):
+        for future, fn, args in self.jobs:
+            if future.set_running_or_notify_cancel():
+                future.set_result(fn(*args))
+        self.jobs = []
+
+
+@pytest.mark.parametrize("seed", [1, 7, 12])
+def test_round_trip_with_background_solver(tmp_path, seed):
+    path = tmp_path / "game.rpl"
+    executor = HeldExecutor()
+    now = [0.0]
+    state = GameState(seed=seed, grinch_period=3, backend="inference", strategy="solver", solver_deadline_ms=100)
+    state.async_solver = AsyncSolver(state.grid_size, "inference", 100, clock=lambda: now[0], executor=executor)
+    state.recorder = ReplayWriter(str(path), state.seed, state.grid_size, "inference", state.strategy,
+                                  state.solver_deadline_ms)
+    state.step(AUTO)
+    while state.status == PLAYING and state.steps < 300:
+        # Decisions arrive on two ticks out of five, wait on two and miss their deadline on one
+        phase = state.steps % 5
+        if phase in (1, 3):
+            executor.release()
+        elif phase == 4:
+            now[0] += 1.0
+        state.step()
+    state.close_replay()
+
+    header, records = read_replay(str(path))
+    assert header["solver_deadline_ms"] == 100
+    flags = [fields[0] for record_type, fields in records if record_type == RECORD_TICK]
+    assert any(flag & TICK_SOLVER_WAITING for flag in flags)
+    assert any(flag & TICK_SOLVER_MISSED_DEADLINE for flag in flags)
+    for rerun_solver in (False, True):
+        result = replay(str(path), rerun_solver=rerun_solver)
+        assert result["ok"], result["mismatch"]
+        assert (result["status"], result["steps"]) == (state.status, state.steps)
+
+
+def test_version_3_logs(tmp_path):
+    path = tmp_path / "game.rpl"
+    record_game(path, 7, "planner")
+    data = path.read_bytes()
+    _, _, seed, rows, cols, _, _, name_length = HEADER.unpack_from(data, 0)
+    path.write_bytes(HEADER_V3.pack(MAGIC, 3, seed, rows, cols, name_length) + data[HEADER.size:])
+
+    header, _ = read_replay(str(path))
+    assert header["version"] == 3 and header["strategy"] is None
+    assert replay(str(path))["ok"]  # The recorded decisions replay under any strategy
+    with pytest.raises(ValueError):
+        replay(str(path), rerun_solver=True)
+
+
+def test_recording_a_seed_again_replaces_the_log(tmp_path):
+    path = tmp_path / "game.rpl"
+    record_game(path, 7, "planner")
+    state = record_game(path, 7, "planner")
+
+    result = replay(str(path), rerun_solver=True)
+    assert result["ok"], result["mismatch"]
+    assert (result["status"], result["steps"]) == (state.status, state.steps)
+
+
+@pytest.mark.parametrize("seed", [-1, 2 ** 64])
+def test_rejects_seeds_outside_64_bits(tmp_path, seed):
+    with pytest.raises(ValueError):
+        GameState(seed=seed)
+    with pytest.raises(ValueError):
+        ReplayWriter(str(tmp_path / "game.rpl"), seed, (10, 10))
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "game.rpl"
+    path.write_bytes(struct.pack("<4sB", MAGIC, 2) + bytes(20))
+    with pytest.raises(ValueError):
+        read_replay(str(path))
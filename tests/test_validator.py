@@ -0,0 +1,102 @@
+import random
+import re
+
+import pytest
+
+from validator import PROVER9_THEORY, build_prover9_delta, build_prover9_input, move_goals, neighbor_template
+
+GRID_SIZE = (6, 7)
+
+# The rules as the full per-step input stated them before the theory was compiled once
+LEGACY_RULES = """
+all x all y (
+    cookie_smell(x, y) <-> exists u exists v (adjacent(x, y, u, v) & present(u, v))
+).
+all x all y (
+    cold_breeze(x, y) <-> exists u exists v (adjacent(x, y, u, v) & exit(u, v))
+).
+all x all y (
+    grinch_sound(x, y) <-> exists u exists v (adjacent(x, y, u, v) & grinch(u, v))
+).
+all x all y (
+    safe(x, y) <-> -grinch(x, y) & -obstacle(x, y)
+).
+all x all y all u all v (
+    move_to(x, y, u, v) <-> (
+        adjacent(x, y, u, v) & safe(u, v) & -last_position(u, v)
+    )
+).
+all x all y all u all v (
+    backup_move(x, y, u, v) <-> (
+        adjacent(x, y, u, v) & -grinch_sound(u, v) & -last_position(u, v)
+    )
+).
+"""
+
+
+def legacy_input(santa_position, last_position, grid, goals):
+    """
+    The statements of the full per-step input, fact by fact as it was generated before.
+    """
+    santa_x, santa_y = santa_position
+    rows, cols = GRID_SIZE
+    lines = [LEGACY_RULES, f"santa_position({santa_x}, {santa_y}).",
+             f"last_position({last_position[0]}, {last_position[1]})."]
+    for dx, dy in [(0, -1), (0, 1), (-1, 0), (1, 0)]:
+        nx, ny = santa_x + dx, santa_y + dy
+        if not (0 <= nx < rows and 0 <= ny < cols):
+            continue
+        cell = grid[nx][ny]
+        lines.append(f"adjacent({santa_x}, {santa_y}, {nx}, {ny}).")
+        for flag, predicate in ((32, "cookie_smell"), (64, "flour_smell"), (128, "cold_breeze"), (2, "present"),
+                                (8, "exit")):
+            if cell & flag:
+                lines.append(f"{predicate}({nx}, {ny}).")
+        for flag, predicate in ((256, "grinch_sound"), (4, "obstacle"), (16, "grinch")):
+            lines.append(f"{'' if cell & flag else '-'}{predicate}({nx}, {ny}).")
+        if (nx, ny) != tuple(last_position):
+            lines.append(f"-last_position({nx}, {ny}).")
+    lines.append(f"assign(max_proofs, {len(goals)}).")
+    lines.extend(f"{goal}." for goal in goals)
+    return "\n".join(lines)
+
+
+def statements(text):
+    """
+    The set of statements in a Prover9 input, ignoring comments, list markers, order and layout.
+    """
+    text = "\n".join(line for line in text.splitlines() if not line.lstrip().startswith("%"))
+    found = {" ".join(statement.split()) for statement in re.split(r"\.\s*\n|\.\s*$", text)}
+    return found - {"", "formulas(assumptions)", "formulas(goals)", "end_of_list"}
+
+
+def random_grid(rng):
+    rows, cols = GRID_SIZE
+    return [[rng.choice((0, 2, 4, 8, 16, 32, 64, 128, 256)) | rng.choice((0, 32, 64, 128, 256))
+             for _ in range(cols)] for _ in range(rows)]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_theory_and_delta_state_the_legacy_input(seed):
+    rng = random.Random(seed)
+    grid = random_grid(rng)
+    santa = (rng.randrange(GRID_SIZE[0]), rng.randrange(GRID_SIZE[1]))
+    neighbors = [(santa[0] + dx, santa[1] + dy) for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]
+                 if 0 <= santa[0] + dx < GRID_SIZE[0] and 0 <= santa[1] + dy < GRID_SIZE[1]]
+    last = rng.choice(neighbors + [santa])
+    goals = move_goals(santa, neighbors)
+
+    expected = statements(legacy_input(santa, last, grid, goals))
+    assert statements(PROVER9_THEORY + build_prover9_delta(santa, last, grid, GRID_SIZE, goals)) == expected
+    assert statements(build_prover9_input(santa, last, {}, grid, GRID_SIZE, goals)) == expected
+
+
+def test_templates_do_not_depend_on_the_position():
+    grid = [[64] * 7 for _ in range(6)]
+    neighbor_template.cache_clear()
+    first = build_prover9_delta((1, 1), (1, 1), grid, GRID_SIZE)
+    built = neighbor_template.cache_info().misses
+    second = build_prover9_delta((4, 5), (4, 5), grid, GRID_SIZE)
+    assert neighbor_template.cache_info().misses == built
+    assert "flour_smell(1, 0)." in first and "flour_smell(4, 6)." in second
+    assert "formulas(goals).\n(exists u exists v move_to(4, 5, u, v)) |" in second
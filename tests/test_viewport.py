@@ -0,0 +1,93 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import pytest
+
+from constants import CLUE_COLORS
+from viewport import Camera, ChunkedRenderer
+
+CELL = 8
+SPRITES = {"santa": (255, 0, 0), "grinch": (0, 255, 0), "present": (0, 0, 255),
+           "obstacle": (90, 90, 90), "exit": (255, 255, 0)}
+
+
+@pytest.fixture
+def screen():
+    pygame.display.init()
+    yield pygame.Surface((80, 64))
+    pygame.display.quit()
+
+
+def sprites():
+    assets = {}
+    for name, color in SPRITES.items():
+        assets[name] = pygame.Surface((CELL, CELL))
+        assets[name].fill(color)
+    return assets
+
+
+def renderer(screen, obstacles, exit_point=(39, 39)):
+    return ChunkedRenderer(screen, sprites(), (40, 40), obstacles, exit_point, (0, 0, 80, 64),
+                           cell_size=CELL, chunk_cells=4, cache_size=16)
+
+
+def test_camera_centres_and_clamps():
+    camera = Camera((100, 50), (80, 40), cell_size=10)
+    camera.follow((20, 25))
+    assert (camera.x, camera.y) == (215, 185)
+    assert camera.visible_cells() == (18, 23, 21, 30)
+    assert camera.to_view((20, 25)) == (35, 15)
+
+    assert not camera.follow((20, 25))
+    camera.follow((0, 0))
+    assert (camera.x, camera.y) == (0, 0)
+    camera.follow((99, 49))
+    assert (camera.x, camera.y) == (420, 960)
+    assert camera.visible_cells() == (96, 100, 42, 50)
+
+
+def test_chunks_are_cached(screen):
+    view = renderer(screen, {(1, 1)})
+    view.draw((0, 0), (30, 30), set())
+    first = view.stats()
+    assert first["misses"] == first["chunks"] > 0
+    view.draw((0, 0), (30, 30), set())
+    assert view.stats()["misses"] == first["misses"]
+    assert view.stats()["hits"] == first["chunks"]
+
+
+def test_invalidate_redraws_changed_cells(screen):
+    obstacles = {(1, 1)}
+    view = renderer(screen, obstacles)
+    view.draw((0, 0), (30, 30), set())
+    assert screen.get_at((3 * CELL + 1, 2 * CELL + 1))[:3] != SPRITES["obstacle"]
+
+    obstacles.add((2, 3))
+    view.draw((0, 0), (30, 30), set())
+    assert screen.get_at((3 * CELL + 1, 2 * CELL + 1))[:3] != SPRITES["obstacle"]  # Still the cached chunk
+
+    untouched = view.chunk_surface(3, 3)
+    view.invalidate([(2, 3)])
+    assert (0, 0) not in view._chunks
+    assert view.chunk_surface(3, 3) is untouched
+    view.draw((0, 0), (30, 30), set())
+    assert screen.get_at((3 * CELL + 1, 2 * CELL + 1))[:3] == SPRITES["obstacle"]
+
+
+def test_invalidate_reaches_neighbouring_chunks(screen):
+    view = renderer(screen, {(3, 3)})
+    for chunk in ((0, 0), (0, 1), (1, 0), (1, 1)):
+        view.chunk_surface(*chunk)
+    view.invalidate([(3, 3)])  # Its flour dots fall on (3, 4) and (4, 3), in the next chunks
+    assert set(view._chunks) == {(1, 1)}
+    view.invalidate()
+    assert not view._chunks
+
+
+def test_presents_just_outside_the_view_smell_on_its_edge(screen):
+    view = renderer(screen, set())
+    view.draw((0, 0), (30, 30), {(8, 3), (2, 10)})  # The view shows rows 0-7 and columns 0-9
+    assert screen.get_at((3 * CELL + 3, 7 * CELL + 3))[:3] == CLUE_COLORS["cookie_smell"]
+    assert screen.get_at((9 * CELL + 3, 2 * CELL + 3))[:3] == CLUE_COLORS["cookie_smell"]
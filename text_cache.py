@@ -0,0 +1,74 @@
+"""
+Font and rendered-text caches.
+
+Fonts are loaded once per (name, size) by get_font. render_text returns a cached surface
+for each (font, text, colour, antialias) combination, so HUD, menu, legend and popup text
+is rasterised once and blitted from the cache on later frames. The cache is a bounded LRU
+with hit, miss and eviction counters.
+"""
+from collections import OrderedDict
+
+import pygame
+
+from constants import TEXT_CACHE_SIZE
+
+_fonts = {}
+
+
+def get_font(name, size):
+    """
+    Returns the pygame font for (name, size), loading it on first use.
+    """
+    key = (name, size)
+    if key not in _fonts:
+        _fonts[key] = pygame.font.Font(name, size)
+    return _fonts[key]
+
+
+class TextCache:
+    """
+    Bounded LRU of rendered text surfaces.
+    """
+
+    def __init__(self, max_size=TEXT_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._surfaces = OrderedDict()
+
+    def render(self, font, text, color, antialias=True):
+        """
+        Same as font.render(text, antialias, color), served from the cache when possible.
+        The font object stands for its face and size, so fonts should come from get_font.
+        """
+        key = (font, text, tuple(color), antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_size:
+            self._surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self._surfaces)}
+
+
+text_cache = TextCache()
+
+
+def render_text(font, text, color, antialias=True):
+    """
+    Renders text through the shared cache.
+    """
+    return text_cache.render(font, text, color, antialias)
@@ -0,0 +1,192 @@
+"""
+Logging and timing instrumentation.
+
+log is the project logger. It is level-gated by LOG_LEVEL and formats messages lazily,
+so log.debug("...%s", value) costs one level check when debug output is off.
+
+span(name) times a block of code. While tracing is off it returns a shared no-op
+context manager. While it is on, every span's duration goes into a per-name histogram
+and, for Chrome traces, into an event list. The per-run report (counts, totals and
+percentiles per span) is written as JSON and the events as a Chrome trace file that
+chrome://tracing or Perfetto can open. Tracing is switched on by setting TRACE_REPORT
+or TRACE_CHROME in constants.py, or by calling tracer.enable().
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from constants import LOG_LEVEL, TRACE_REPORT, TRACE_CHROME
+
+log = logging.getLogger("santa")
+if not log.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+    log.addHandler(_handler)
+    log.propagate = False
+log.setLevel(LOG_LEVEL)
+
+MAX_TRACE_EVENTS = 1_000_000  # Chrome trace events kept per run; later spans only feed the histograms
+
+
+class Histogram:
+    """
+    Durations bucketed by powers of two of a microsecond, with exact count, total, min and max.
+    """
+
+    def __init__(self):
+        self.buckets = {}  # Bucket b holds durations in [2**(b-1), 2**b) microseconds
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def add(self, seconds):
+        micros = int(seconds * 1_000_000)
+        bucket = micros.bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction):
+        """
+        Upper bound, in seconds, of the bucket holding the given fraction of samples.
+        """
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min((1 << bucket) / 1_000_000, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total / self.count * 1000, 4) if self.count else 0.0,
+            "min_ms": round(self.min * 1000, 4) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.5) * 1000, 4),
+            "p90_ms": round(self.percentile(0.9) * 1000, 4),
+            "p99_ms": round(self.percentile(0.99) * 1000, 4),
+            "max_ms": round(self.max * 1000, 4),
+        }
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NO_SPAN = _NoSpan()
+
+
+class Tracer:
+    """
+    Collects span timings for one run.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.chrome = False
+        self.histograms = {}
+        self.events = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def enable(self, chrome=False):
+        self.enabled = True
+        self.chrome = self.chrome or chrome
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+            self.events = []
+            self._origin = time.perf_counter()
+
+    def span(self, name):
+        if not self.enabled:
+            return NO_SPAN
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, start)
+
+    def record(self, name, seconds, start=None):
+        """
+        Adds one measured duration; `start` (a perf_counter value) places it on the Chrome timeline.
+        """
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(seconds)
+            if self.chrome and start is not None and len(self.events) < MAX_TRACE_EVENTS:
+                self.events.append({
+                    "name": name,
+                    "ph": "X",
+                    "ts": round((start - self._origin) * 1_000_000, 1),
+                    "dur": round(seconds * 1_000_000, 1),
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                })
+
+    def report(self):
+        """
+        Per-span histogram summaries, slowest total first.
+        """
+        with self._lock:
+            spans = sorted(self.histograms.items(), key=lambda item: item[1].total, reverse=True)
+            return {"spans": {name: histogram.summary() for name, histogram in spans}}
+
+    def write_report(self, path):
+        with open(path, "w") as file:
+            json.dump(self.report(), file, indent=2)
+        log.info("Wrote timing report to %s", path)
+
+    def write_chrome_trace(self, path):
+        with self._lock:
+            events = list(self.events)
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+        log.info("Wrote Chrome trace with %d events to %s", len(events), path)
+
+
+tracer = Tracer()
+
+
+def span(name):
+    """
+    Times the enclosed block under `name` when tracing is enabled.
+    """
+    return tracer.span(name)
+
+
+def _write_outputs():
+    if TRACE_REPORT:
+        tracer.write_report(TRACE_REPORT)
+    if TRACE_CHROME:
+        tracer.write_chrome_trace(TRACE_CHROME)
+
+
+if TRACE_REPORT or TRACE_CHROME:
+    tracer.enable(chrome=bool(TRACE_CHROME))
+    atexit.register(_write_outputs)
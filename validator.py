@@ -1,233 +1,357 @@
-import subprocess
-import time
-
-def generate_prover9_input(santa_position, last_position, clues, grid, grid_size):
-    """
-    Generates a Prover9 input file dynamically to evaluate the safest move for Santa.
-    Includes only the 4 adjacent cells around Santa and their respective clues.
-    """
-    try:
-        santa_x, santa_y = santa_position
-        last_x, last_y = last_position
-        input_file = "santa_logic.p9"
-
-        # Ensure grid_size is correctly unpacked
-        if isinstance(grid_size, (list, tuple)) and len(grid_size) == 2:
-            rows, cols = grid_size
-        else:
-            raise TypeError("grid_size must be a list or tuple of two integers representing grid dimensions.")
-
-        # Define the neighboring offsets
-        offsets = [
-            (0, -1),  # Left
-            (0, 1),   # Right
-            (-1, 0),  # Up
-            (1, 0),   # Down
-        ]
-
-        # Generate adjacent relations dynamically based on Santa's position
-        adjacent_relations = []
-        adjacent_clues = []  # To hold clues for adjacent cells
-
-        for dx, dy in offsets:
-            nx, ny = santa_x + dx, santa_y + dy
-            if 0 <= nx < rows and 0 <= ny < cols:  # Ensure cell is within bounds
-                adjacent_relations.append(f"adjacent({santa_x}, {santa_y}, {nx}, {ny}).")
-
-                # Check for clues in the adjacent cell
-                if grid[nx][ny] & 32:  # Cookie smell (present clue)
-                    adjacent_clues.append(f"cookie_smell({nx}, {ny}).")
-                if grid[nx][ny] & 64:  # Flour smell (obstacle clue)
-                    adjacent_clues.append(f"flour_smell({nx}, {ny}).")
-                if grid[nx][ny] & 128:  # Cold breeze (exit clue)
-                    adjacent_clues.append(f"cold_breeze({nx}, {ny}).")
-                if grid[nx][ny] & 256:  # Grinch sound (Grinch clue)
-                    adjacent_clues.append(f"grinch_sound({nx}, {ny}).")
-
-        # Debugging information
-        print(f"[DEBUG] Adjacent relations: {adjacent_relations}")
-        print(f"[DEBUG] Adjacent clues: {adjacent_clues}")
-
-        prover9_input = [
-            "% --- Santa Escape Room Logic ---",
-            "% Propositions:",
-            "% cookie_smell(x, y), cold_breeze(x, y), grinch_sound(x, y), safe(x, y), move_to(x, y, u, v)",
-            "% present(x, y), grinch(x, y), exit(x, y), obstacle(x, y), adjacent(x, y, u, v)",
-            "",
-            "% --- Adjacent Relations ---",
-        ]
-
-        # Add adjacent relations for the 4 neighboring cells
-        prover9_input.extend(adjacent_relations)
-
-        prover9_input.extend([
-            "",
-            "% --- Rules ---",
-            "all x all y (",
-            "    cookie_smell(x, y) <-> exists u exists v (adjacent(x, y, u, v) & present(u, v))",
-            ").",
-            "",
-            "all x all y (",
-            "    cold_breeze(x, y) <-> exists u exists v (adjacent(x, y, u, v) & exit(u, v))",
-            ").",
-            "",
-            "all x all y (",
-            "    grinch_sound(x, y) <-> exists u exists v (adjacent(x, y, u, v) & grinch(u, v))",
-            ").",
-            "",
-            "all x all y (",
-            "    safe(x, y) <-> ~grinch(x, y) & ~obstacle(x, y)",
-            ").",
-            "",
-            "all x all y all u all v (",
-            "    move_to(x, y, u, v) <-> (",
-            "        adjacent(x, y, u, v) & safe(u, v) & (u != last_x | v != last_y)",
-            "    )",
-            ").",
-            "",
-            "% --- Backup Rule: Move to a position without a Grinch clue ---",
-            "all x all y all u all v (",
-            "    backup_move(x, y, u, v) <-> (",
-            "        adjacent(x, y, u, v) & ~grinch_sound(u, v) & ~(u = last_x & v = last_y)",
-            "    )",
-            ").",
-            "",
-            "% --- Observations ---",
-            f"santa_position({santa_x}, {santa_y}).",
-            f"last_position({last_x}, {last_y}).",
-        ])
-
-        # Add clues for the adjacent cells
-        prover9_input.extend(adjacent_clues)
-
-        # Add game elements only for the adjacent cells
-        for dx, dy in offsets:
-            nx, ny = santa_x + dx, santa_y + dy
-            if 0 <= nx < rows and 0 <= ny < cols:
-                if grid[nx][ny] & 2:  # Present
-                    prover9_input.append(f"present({nx}, {ny}).")
-                if grid[nx][ny] & 4:  # Obstacle
-                    prover9_input.append(f"obstacle({nx}, {ny}).")
-                if grid[nx][ny] & 8:  # Exit
-                    prover9_input.append(f"exit({nx}, {ny}).")
-                if grid[nx][ny] & 16:  # Grinch
-                    prover9_input.append(f"grinch({nx}, {ny}).")
-
-        prover9_input.extend([
-            "",
-            "% --- Goal: Find a safe move or backup move ---",
-            f"goal: (exists u exists v (move_to({santa_x}, {santa_y}, u, v))) |",
-            f"      (exists u exists v (backup_move({santa_x}, {santa_y}, u, v))).",
-        ])
-
-        # Write to file
-        with open(input_file, "w") as file:
-            file.write("\n".join(prover9_input))
-        print(f"Prover9 input file '{input_file}' successfully generated.")
-    except Exception as e:
-        print(f"[ERROR] Failed to generate Prover9 input: {e}")
-
-
-def run_prover9(input_file):
-    """
-    Runs Prover9 with the specified input file and checks for a valid move.
-    """
-    prover9_path = "/mnt/c/Users/aly27/OneDrive/Desktop/UT/AI/LADR-2009-11A/LADR-2009-11A/bin/prover9"
-
-    try:
-        print(f"[DEBUG] Running Prover9: {prover9_path} -f {input_file}")
-        result = subprocess.run(
-            [prover9_path, f"-f{input_file}"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            check=True,
-            text=True
-        )
-        output = result.stdout
-        print("[DEBUG] Prover9 Output:")
-        print(output)
-
-        # Check if Prover9 proved the goal
-        if "THEOREM PROVED" in output:
-            print("[DEBUG] Prover9 found a valid move.")
-            return True  # Replace with actual move parsing logic
-        else:
-            print("[DEBUG] Prover9 did not find a valid move.")
-            return False
-
-    except FileNotFoundError:
-        print(f"[ERROR] Prover9 executable not found at {prover9_path}. Check the path and ensure Prover9 is installed.")
-        return False
-
-    except subprocess.CalledProcessError as e:
-        print(f"[ERROR] Prover9 encountered an error: {e.stderr}")
-        return False
-
-
-def select_best_move(santa_position, neighbors, known_clues, grid):
-    """
-    Selects the best move when no safe move is found by Prover9.
-    Avoids known dangers (Grinch, obstacles) and prioritizes lesser risks.
-    """
-    for neighbor in neighbors:
-        x, y = neighbor
-        if (x, y) not in known_clues.get("grinch_sound", []) and grid[x][y] not in [3, 4]:  # Avoid obstacles and Grinch
-            print(f"[DEBUG] Selecting {neighbor} as the best available move.")
-            return neighbor
-    print("[DEBUG] No safe move found. Staying in the current position.")
-    return santa_position  # Stay in place as the last resort
-
-
-def validate_move_and_update(santa_position, last_position, clues, grid, grid_size):
-    """
-    Validates Santa's move using Prover9 and updates the game state for the next step.
-    """
-    neighbors = generate_neighbors(santa_position, grid_size)
-    print(f"[DEBUG] Neighbors of Santa: {neighbors}")
-
-    # Generate Prover9 input and validate the move
-    generate_prover9_input(santa_position, last_position, clues, grid, grid_size)
-    if run_prover9("santa_logic.p9"):
-        # Move Santa to the safe location if Prover9 finds a valid move
-        # (Replace with the actual parsed move from Prover9 output)
-        print("[DEBUG] Moving Santa to a safe location.")
-        safe_move = neighbors[0]  # Replace this placeholder with actual parsing
-        return safe_move
-    else:
-        # No safe move found by Prover9, select the best move manually
-        return select_best_move(santa_position, neighbors, clues, grid)
-
-
-def generate_neighbors(position, grid_size):
-    """
-    Generates valid neighbors for a given position within the grid.
-    """
-    try:
-        x, y = position
-        rows, cols = grid_size
-        neighbors = [
-            (x - 1, y),  # Up
-            (x + 1, y),  # Down
-            (x, y - 1),  # Left
-            (x, y + 1)   # Right
-        ]
-        valid_neighbors = [(nx, ny) for nx, ny in neighbors if 0 <= nx < rows and 0 <= ny < cols]
-        print(f"[DEBUG] Generated neighbors for {position}: {valid_neighbors}")
-        return valid_neighbors
-    except Exception as e:
-        print(f"[ERROR] Failed to generate neighbors: {e}")
-        return []
-
-
-def update_clues(santa_position, game_clues, known_clues, grid_size):
-    """
-    Updates known clues based on observations from neighboring cells.
-    """
-    neighbors = generate_neighbors(santa_position, grid_size)
-    for neighbor in neighbors:
-        x, y = neighbor
-        for clue_type, positions in game_clues.items():
-            if (x, y) in positions:
-                known_clues.setdefault(clue_type, set()).add((x, y))
-    print(f"[DEBUG] Updated clues for {santa_position}: {known_clues}")
-    return known_clues
+import io
+import threading
+import time
+from functools import lru_cache
+from belief import risk_level
+from board_index import grid_index
+from constants import SOLVER_BACKEND, PROVER9_PRELOAD_THEORY
+from inference import infer_move
+from move_cache import get_move_cache, neighbourhood_key
+from prover_pool import get_pool
+from tracing import log, span
+
+def generate_prover9_input(santa_position, last_position, clues, grid, grid_size, input_file=None):
+    """
+    Generates the Prover9 input dynamically to evaluate the safest move for Santa.
+    Includes only the 4 adjacent cells around Santa and their respective clues.
+    The input is returned as text for run_prover9; it is only written to disk when
+    input_file is given (e.g. santa_logic.p9, to run the prover by hand).
+    """
+    try:
+        with span("prover9.input"):
+            prover9_input = build_prover9_input(santa_position, last_position, clues, grid, grid_size)
+
+        if input_file:
+            with open(input_file, "w") as file:
+                file.write(prover9_input)
+            log.debug("Prover9 input file '%s' successfully generated.", input_file)
+        return prover9_input
+    except Exception as e:
+        log.error("Failed to generate Prover9 input: %s", e)
+        return None
+
+
+# The rules never change, so they are compiled once into the static part of every input.
+# Per step only the delta (Santa's neighbourhood facts and the goals) is generated.
+PROVER9_THEORY = "\n".join([
+    "% --- Santa Escape Room Logic ---",
+    "% Propositions:",
+    "% cookie_smell(x, y), cold_breeze(x, y), grinch_sound(x, y), safe(x, y), move_to(x, y, u, v)",
+    "% present(x, y), grinch(x, y), exit(x, y), obstacle(x, y), adjacent(x, y, u, v)",
+    "",
+    "formulas(assumptions).",
+    "% --- Rules ---",
+    "all x all y (",
+    "    cookie_smell(x, y) <-> exists u exists v (adjacent(x, y, u, v) & present(u, v))",
+    ").",
+    "",
+    "all x all y (",
+    "    cold_breeze(x, y) <-> exists u exists v (adjacent(x, y, u, v) & exit(u, v))",
+    ").",
+    "",
+    "all x all y (",
+    "    grinch_sound(x, y) <-> exists u exists v (adjacent(x, y, u, v) & grinch(u, v))",
+    ").",
+    "",
+    "all x all y (",
+    "    safe(x, y) <-> -grinch(x, y) & -obstacle(x, y)",
+    ").",
+    "",
+    "all x all y all u all v (",
+    "    move_to(x, y, u, v) <-> (",
+    "        adjacent(x, y, u, v) & safe(u, v) & -last_position(u, v)",
+    "    )",
+    ").",
+    "",
+    "% --- Backup Rule: Move to a position without a Grinch clue ---",
+    "all x all y all u all v (",
+    "    backup_move(x, y, u, v) <-> (",
+    "        adjacent(x, y, u, v) & -grinch_sound(u, v) & -last_position(u, v)",
+    "    )",
+    ").",
+    "end_of_list.",
+    "",
+])
+
+# Neighbour offsets in the order their facts are emitted: Left, Right, Up, Down
+PROVER9_OFFSETS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+# Grid flag -> predicate, for the clue and object facts stated about each neighbour
+FACT_PREDICATES = (
+    (32, "cookie_smell"),
+    (64, "flour_smell"),
+    (128, "cold_breeze"),
+    (256, "grinch_sound"),
+    (2, "present"),
+    (4, "obstacle"),
+    (8, "exit"),
+    (16, "grinch"),
+)
+CLOSED_WORLD = frozenset(("grinch_sound", "obstacle", "grinch"))  # Absence is stated as a negative fact
+
+_buffers = threading.local()  # One reusable delta buffer per thread
+
+FACT_MASK = sum(flag for flag, _ in FACT_PREDICATES)  # Grid bits that change what is stated about a cell
+
+
+@lru_cache(maxsize=None)
+def neighbor_template(cell, is_last):
+    """
+    The facts stated about a neighbour whose grid value is `cell`, with "@" standing for the
+    neighbour's coordinates. Templates depend on the cell's flags only, not on where the cell
+    is, so the few hundred that exist are built once per process and a step only fills in
+    coordinates.
+    """
+    facts = []
+    for flag, predicate in FACT_PREDICATES:
+        if cell & flag:
+            facts.append(f"{predicate}(@).\n")
+        elif predicate in CLOSED_WORLD:
+            facts.append(f"-{predicate}(@).\n")
+    if not is_last:
+        facts.append("-last_position(@).\n")
+    return "".join(facts)
+
+
+def build_prover9_input(santa_position, last_position, clues, grid, grid_size, goals=None):
+    """
+    Builds the complete Prover9 input text for Santa's position: PROVER9_THEORY followed by the delta.
+    """
+    return PROVER9_THEORY + build_prover9_delta(santa_position, last_position, grid, grid_size, goals)
+
+
+def build_prover9_delta(santa_position, last_position, grid, grid_size, goals=None):
+    """
+    Builds the per-step part of the Prover9 input: the facts about Santa's neighbourhood and the goals.
+    With `goals`, the single disjunctive goal is replaced by one goal per formula
+    and max_proofs is raised so every provable goal is reported in one run.
+    Santa's observation of his neighbours is complete, so every object, Grinch sound
+    and last position that is not there is stated as a negative fact (closed world);
+    without them safe, move_to and backup_move could never be proved.
+    """
+    santa_x, santa_y = santa_position
+    last_x, last_y = last_position
+
+    # Ensure grid_size is correctly unpacked
+    if isinstance(grid_size, (list, tuple)) and len(grid_size) == 2:
+        rows, cols = grid_size
+    else:
+        raise TypeError("grid_size must be a list or tuple of two integers representing grid dimensions.")
+
+    buffer = getattr(_buffers, "buffer", None)
+    if buffer is None:
+        buffer = _buffers.buffer = io.StringIO()
+    buffer.seek(0)
+    buffer.truncate()
+    write = buffer.write
+
+    # Neighbour facts come from templates keyed on the cell's flags, so a step only fills in coordinates
+    write(f"formulas(assumptions).\nsanta_position({santa_x}, {santa_y}).\nlast_position({last_x}, {last_y}).\n")
+    for dx, dy in PROVER9_OFFSETS:
+        nx, ny = santa_x + dx, santa_y + dy
+        if not (0 <= nx < rows and 0 <= ny < cols):  # Ensure cell is within bounds
+            continue
+        coordinates = f"{nx}, {ny}"
+        write(f"adjacent({santa_x}, {santa_y}, {coordinates}).\n")
+        write(neighbor_template(int(grid[nx][ny]) & FACT_MASK, nx == last_x and ny == last_y)
+              .replace("@", coordinates))
+    write("end_of_list.\n")
+
+    if goals is None:
+        write(f"formulas(goals).\n"
+              f"(exists u exists v move_to({santa_x}, {santa_y}, u, v)) |\n"
+              f"(exists u exists v backup_move({santa_x}, {santa_y}, u, v)).\n"
+              f"end_of_list.\n")
+    else:
+        write(f"assign(max_proofs, {len(goals)}).\nformulas(goals).\n")
+        for goal in goals:
+            write(f"{goal}.\n")
+        write("end_of_list.\n")
+
+    delta = buffer.getvalue()
+    log.debug("Prover9 delta for %s:\n%s", santa_position, delta)
+    return delta
+
+
+def run_prover9(prover9_input):
+    """
+    Runs Prover9 on the given input text and checks for a valid move.
+    Blocks until the shared worker pool has finished the proof.
+    """
+    result = run_prover9_async(prover9_input).result()
+    if result.proved:
+        log.debug("Prover9 found a valid move.")
+    else:
+        log.debug("Prover9 did not find a valid move.")
+    return result.proved
+
+
+def run_prover9_async(prover9_input):
+    """
+    Queues the Prover9 input text on the shared worker pool, which streams it to the prover over stdin.
+    Returns a Future resolving to a prover_pool.ProverResult.
+    """
+    return get_pool().submit(prover9_input)
+
+
+MOVE_PREDICATES = ("move_to", "backup_move")  # In order of preference
+
+
+def move_goal(predicate, santa_position, cell):
+    """
+    The goal formula for one move predicate, e.g. "move_to(3, 4, 2, 4)".
+    """
+    return f"{predicate}({santa_position[0]}, {santa_position[1]}, {cell[0]}, {cell[1]})"
+
+
+def move_goals(santa_position, candidates):
+    """
+    One goal per move predicate and candidate neighbour.
+    """
+    return [move_goal(predicate, santa_position, cell) for predicate in MOVE_PREDICATES for cell in candidates]
+
+
+def submit_move_batch(santa_position, last_position, clues, grid, grid_size, candidates=None):
+    """
+    Batches a move_to and a backup_move goal per candidate neighbour into a single Prover9 job.
+    Returns a Future resolving to a prover_pool.ProverResult whose proved_goals name the provable
+    moves; ranked_moves turns them into a decision.
+    """
+    if candidates is None:
+        candidates = generate_neighbors(santa_position, grid_size)
+    goals = move_goals(santa_position, candidates)
+    with span("prover9.input"):
+        delta = build_prover9_delta(santa_position, last_position, grid, grid_size, goals)
+    if PROVER9_PRELOAD_THEORY:
+        return get_pool().submit(delta, goals, theory=PROVER9_THEORY)
+    return get_pool().submit(PROVER9_THEORY + delta, goals)
+
+
+def ranked_moves(santa_position, candidates, proved_goals):
+    """
+    The candidates Prover9 proved legal, best first: cells with a move_to proof, then cells
+    with only a backup_move proof, each group in candidate order.
+    """
+    proved = set(proved_goals)
+    ranked = []
+    for predicate in MOVE_PREDICATES:
+        for cell in candidates:
+            if move_goal(predicate, santa_position, cell) in proved and tuple(cell) not in ranked:
+                ranked.append(tuple(cell))
+    return ranked
+
+
+def select_best_move(santa_position, neighbors, known_clues, grid, belief=None):
+    """
+    Selects the best move when no safe move is found by Prover9.
+    Avoids known dangers (Grinch, obstacles) and prioritizes lesser risks.
+    With a Grinch belief (see belief.py), neighbours are tried from the lowest risk level up.
+    """
+    if belief is not None:
+        neighbors = sorted(neighbors, key=lambda cell: risk_level(belief.risk(cell)))
+    for neighbor in neighbors:
+        x, y = neighbor
+        if (x, y) not in known_clues.get("grinch_sound", []) and grid[x][y] not in [3, 4]:  # Avoid obstacles and Grinch
+            log.debug("Selecting %s as the best available move.", neighbor)
+            return neighbor
+    log.debug("No safe move found. Staying in the current position.")
+    return santa_position  # Stay in place as the last resort
+
+
+def validate_move_and_update(santa_position, last_position, clues, grid, grid_size, backend=None, belief=None):
+    """
+    Validates Santa's move and updates the game state for the next step.
+    The backend ("inference", "prover9" or "crosscheck") defaults to SOLVER_BACKEND.
+    Prover9 decisions are memoized on Santa's neighbourhood; the inference backend decides
+    faster than a cache lookup, and cross-checking must run both backends, so neither is cached.
+    belief is the GrinchBelief whose risk estimates steer the fallback move.
+    """
+    backend = backend or SOLVER_BACKEND
+    if backend != "prover9":
+        with span("solver.decide"):
+            return decide_move(santa_position, last_position, clues, grid, grid_size, backend, belief)
+
+    move_cache = get_move_cache()
+    key = neighbourhood_key(santa_position, last_position, clues, grid, grid_size, backend, belief)
+    cached_move = move_cache.get(key, santa_position)
+    if cached_move is not None:
+        return cached_move
+
+    with span("solver.decide"):
+        next_move = decide_move(santa_position, last_position, clues, grid, grid_size, backend, belief)
+    move_cache.put(key, santa_position, next_move)
+    return next_move
+
+
+def decide_move(santa_position, last_position, clues, grid, grid_size, backend, belief=None):
+    """
+    Runs the selected solver backend and falls back to select_best_move when it finds no move.
+    """
+    neighbors = generate_neighbors(santa_position, grid_size)
+    log.debug("Neighbors of Santa: %s", neighbors)
+
+    if backend == "inference":
+        safe_move = infer_move(santa_position, last_position, grid, grid_size)
+    elif backend in ("prover9", "crosscheck"):
+        safe_move = validate_with_prover9(santa_position, last_position, clues, grid, grid_size, neighbors)
+        if backend == "crosscheck":
+            inferred_move = infer_move(santa_position, last_position, grid, grid_size)
+            if inferred_move != safe_move:
+                log.warning("Solver backends disagree at %s: prover9=%s, inference=%s",
+                            santa_position, safe_move, inferred_move)
+    else:
+        raise ValueError(f"Unknown solver backend: {backend}")
+
+    if safe_move is not None:
+        log.debug("Moving Santa to a safe location: %s", safe_move)
+        return safe_move
+    # No safe move found, select the best move manually
+    return select_best_move(santa_position, neighbors, clues, grid, belief)
+
+
+def validate_with_prover9(santa_position, last_position, clues, grid, grid_size, neighbors):
+    """
+    Runs the external Prover9 binary once for every candidate neighbour and returns the
+    best proven move, or None when no move is provable.
+    """
+    if not neighbors:
+        return None
+    result = submit_move_batch(santa_position, last_position, clues, grid, grid_size, neighbors).result()
+    moves = ranked_moves(santa_position, neighbors, result.proved_goals)
+    log.debug("Prover9 proved moves (best first): %s", moves)
+    return moves[0] if moves else None
+
+
+def generate_neighbors(position, grid_size):
+    """
+    Generates valid neighbors for a given position within the grid.
+    """
+    try:
+        x, y = position
+        rows, cols = grid_size
+        if 0 <= x < rows and 0 <= y < cols:
+            # Up, Down, Left, Right, looked up in the board size's precomputed adjacency
+            valid_neighbors = grid_index(tuple(grid_size)).neighbors(position)
+        else:
+            # A cell off the board has no index entry; keep the in-bounds cells next to it
+            candidates = [(x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)]
+            valid_neighbors = [(nx, ny) for nx, ny in candidates if 0 <= nx < rows and 0 <= ny < cols]
+        log.debug("Generated neighbors for %s: %s", position, valid_neighbors)
+        return valid_neighbors
+    except Exception as e:
+        log.error("Failed to generate neighbors: %s", e)
+        return []
+
+
+def update_clues(santa_position, game_clues, known_clues, grid_size):
+    """
+    Updates known clues based on observations from neighboring cells.
+    known_clues is a knowledge.KnowledgeBase; each neighbour's observation replaces what was known there.
+    """
+    with span("clues.update"):
+        neighbors = generate_neighbors(santa_position, grid_size)
+        for neighbor in neighbors:
+            observed = [clue_type for clue_type, positions in game_clues.items() if neighbor in positions]
+            known_clues.record_cell(neighbor, observed)
+    log.debug("Updated clues for %s: %s", santa_position, known_clues)
+    return known_clues
@@ -0,0 +1,218 @@
+"""
+Scrolling, chunked rendering for boards much larger than the window.
+
+The board is split into square chunks of CHUNK_CELLS x CHUNK_CELLS cells. A chunk's
+static content (background, grid lines, obstacles, the exit, and the flour and cold
+breeze clue dots) is rendered into its own surface the first time the chunk comes into
+view. Chunk surfaces are kept in a bounded LRU, so drawing memory depends on
+CHUNK_CACHE_SIZE rather than on the board size. A Camera keeps Santa centred. Each
+frame blits only the chunks that overlap the view, then draws the presents, the Grinch
+and Santa that fall inside it. Neither a frame nor a chunk ever scans the whole board,
+so a 1000x1000 board draws as fast as a 10x10 one.
+
+The game state of a board this large is stored in chunks and sparse maps as well (see
+chunk_store.py and belief.SparseGrinchBelief): about 30 MB for a 1000x1000 board, most
+of it the level's obstacle set. main.py builds it on a worker thread behind a loading
+message.
+"""
+from collections import OrderedDict
+
+import pygame
+
+from board_index import grid_index
+from constants import COLORS, CLUE_COLORS, LARGE_CELL_SIZE, CHUNK_CELLS, CHUNK_CACHE_SIZE
+
+# Corner of the cell each clue dot is drawn in, as (right, bottom) flags, matching grid.draw_clue_dot
+DOT_CORNERS = {
+    "top_left": (False, False),
+    "bottom_right": (True, True),
+    "top_right": (True, False),
+    "bottom_left": (False, True),
+}
+
+
+class Camera:
+    """
+    Pixel offset of the view into the board, centred on a cell and clamped to the board's edges.
+    """
+
+    def __init__(self, grid_size, view_size, cell_size=LARGE_CELL_SIZE):
+        self.rows, self.cols = grid_size
+        self.width, self.height = view_size
+        self.cell_size = cell_size
+        self.x = 0
+        self.y = 0
+
+    def follow(self, cell):
+        """
+        Centres the view on a cell. Returns True when the view moved.
+        """
+        size = self.cell_size
+        x = min(max(cell[1] * size + size // 2 - self.width // 2, 0), max(self.cols * size - self.width, 0))
+        y = min(max(cell[0] * size + size // 2 - self.height // 2, 0), max(self.rows * size - self.height, 0))
+        moved = (x, y) != (self.x, self.y)
+        self.x, self.y = x, y
+        return moved
+
+    def visible_cells(self):
+        """
+        (first row, end row, first column, end column) of the cells overlapping the view, ends exclusive.
+        """
+        size = self.cell_size
+        return (self.y // size, min((self.y + self.height - 1) // size + 1, self.rows),
+                self.x // size, min((self.x + self.width - 1) // size + 1, self.cols))
+
+    def to_view(self, cell):
+        """
+        Top-left pixel of a cell relative to the view.
+        """
+        return cell[1] * self.cell_size - self.x, cell[0] * self.cell_size - self.y
+
+
+class ChunkedRenderer:
+    """
+    Draws a scrolling view of a large board from cached chunk surfaces.
+    Drop-in for grid.GridRenderer: draw returns the dirty rectangles for pygame.display.update.
+    """
+
+    def __init__(self, screen, assets, grid_size, obstacles, exit_point, view_rect,
+                 cell_size=LARGE_CELL_SIZE, chunk_cells=CHUNK_CELLS, cache_size=CHUNK_CACHE_SIZE):
+        """
+        assets must be sprites scaled to cell_size (grid.load_assets(cell_size)).
+        view_rect is the part of the screen the board is drawn in.
+        """
+        self.screen = screen
+        self.assets = assets
+        self.grid_size = tuple(grid_size)
+        self.obstacles = obstacles  # Shared with the game state; obstacles never move
+        self.exit_point = tuple(exit_point)
+        self.view = pygame.Rect(view_rect)
+        self.cell_size = cell_size
+        self.chunk_cells = chunk_cells
+        self.cache_size = cache_size
+        self.camera = Camera(self.grid_size, self.view.size, cell_size)
+        self.index = grid_index(self.grid_size)
+        self._chunks = OrderedDict()  # (chunk row, chunk column) -> static surface
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self, cells=None):
+        """
+        Drops cached chunks so they are rendered again on their next use: every chunk, or only
+        those whose static content depends on `cells` (an obstacle or the exit there, or their
+        clue dots on the neighbouring cells). Call it after changing the obstacles or the exit.
+        Every draw repaints the whole view, so nothing else needs invalidating.
+        """
+        if cells is None:
+            self._chunks.clear()
+            return
+        for cell in cells:
+            for x, y in [tuple(cell)] + self.index.neighbors(cell):
+                self._chunks.pop((x // self.chunk_cells, y // self.chunk_cells), None)
+
+    def draw(self, santa_position, grinch_position, presents):
+        """
+        Centres the view on Santa, repaints it and returns [view rect].
+        """
+        camera = self.camera
+        camera.follow(santa_position)
+        first_row, end_row, first_col, end_col = camera.visible_cells()
+        previous_clip = self.screen.get_clip()
+        self.screen.set_clip(self.view)
+
+        # Static layer: every chunk overlapping the view
+        chunk_pixels = self.chunk_cells * self.cell_size
+        for chunk_row in range(first_row // self.chunk_cells, (end_row - 1) // self.chunk_cells + 1):
+            for chunk_col in range(first_col // self.chunk_cells, (end_col - 1) // self.chunk_cells + 1):
+                x = self.view.x + chunk_col * chunk_pixels - camera.x
+                y = self.view.y + chunk_row * chunk_pixels - camera.y
+                self.screen.blit(self.chunk_surface(chunk_row, chunk_col), (x, y))
+
+        # Dynamic layer: only what lies inside the view
+        visible_presents = self._visible(presents, first_row, end_row, first_col, end_col)
+        # A present just outside the view still smells on the view's edge cells
+        smelled_presents = self._visible(presents, max(first_row - 1, 0), end_row + 1, max(first_col - 1, 0),
+                                         end_col + 1)
+        grinch = tuple(grinch_position)
+        for objects, color, corner in ((smelled_presents, CLUE_COLORS["cookie_smell"], "top_left"),
+                                       ((grinch,), CLUE_COLORS["grinch_sound"], "bottom_left")):
+            for obj in objects:
+                for cell in self.index.neighbors(obj):
+                    if cell not in self.obstacles and cell != self.exit_point:  # Their sprites cover the dots
+                        self._draw_dot(self.screen, self._view_pixel(cell), color, corner)
+
+        santa = tuple(santa_position)
+        for present in visible_presents:
+            if present != santa:
+                self.screen.blit(self.assets["present"], self._view_pixel(present))
+        if grinch != santa:
+            self.screen.blit(self.assets["grinch"], self._view_pixel(grinch))
+        self.screen.blit(self.assets["santa"], self._view_pixel(santa))
+
+        self.screen.set_clip(previous_clip)
+        return [self.view.copy()]
+
+    def chunk_surface(self, chunk_row, chunk_col):
+        """
+        The static surface of one chunk, rendered on first use and kept in the LRU.
+        """
+        key = (chunk_row, chunk_col)
+        surface = self._chunks.get(key)
+        if surface is not None:
+            self._chunks.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = self._render_chunk(chunk_row, chunk_col)
+        self._chunks[key] = surface
+        while len(self._chunks) > self.cache_size:
+            self._chunks.popitem(last=False)
+        return surface
+
+    def stats(self):
+        return {"chunks": len(self._chunks), "hits": self.hits, "misses": self.misses}
+
+    def _render_chunk(self, chunk_row, chunk_col):
+        size = self.cell_size
+        rows, cols = self.grid_size
+        first_row, first_col = chunk_row * self.chunk_cells, chunk_col * self.chunk_cells
+        end_row, end_col = min(first_row + self.chunk_cells, rows), min(first_col + self.chunk_cells, cols)
+        surface = pygame.Surface((self.chunk_cells * size, self.chunk_cells * size))
+        surface.fill(COLORS["background"])
+
+        for x in range(first_row, end_row):
+            for y in range(first_col, end_col):
+                cell = (x, y)
+                pixel = ((y - first_col) * size, (x - first_row) * size)
+                pygame.draw.rect(surface, COLORS["grid"], (pixel[0], pixel[1], size, size), 1)
+                neighbors = self.index.neighbors(cell)
+                if any(neighbor in self.obstacles for neighbor in neighbors):
+                    self._draw_dot(surface, pixel, CLUE_COLORS["flour_smell"], "bottom_right")
+                if self.exit_point in neighbors:
+                    self._draw_dot(surface, pixel, CLUE_COLORS["cold_breeze"], "top_right")
+                if cell in self.obstacles:
+                    surface.blit(self.assets["obstacle"], pixel)
+                elif cell == self.exit_point:
+                    surface.blit(self.assets["exit"], pixel)
+        return surface
+
+    @staticmethod
+    def _visible(cells, first_row, end_row, first_col, end_col):
+        """
+        The cells inside the given bounds, scanning whichever is smaller: the cells or the bounds.
+        """
+        if len(cells) <= (end_row - first_row) * (end_col - first_col):
+            return [(x, y) for x, y in cells if first_row <= x < end_row and first_col <= y < end_col]
+        return [(x, y) for x in range(first_row, end_row) for y in range(first_col, end_col) if (x, y) in cells]
+
+    def _view_pixel(self, cell):
+        x, y = self.camera.to_view(cell)
+        return self.view.x + x, self.view.y + y
+
+    def _draw_dot(self, surface, pixel, color, corner):
+        # Same placement as grid.draw_clue_dot, scaled from its 80 px cells
+        size = self.cell_size
+        inset = max(size // 8, 3)
+        right, bottom = DOT_CORNERS[corner]
+        center = (pixel[0] + (size - inset if right else inset), pixel[1] + (size - inset if bottom else inset))
+        pygame.draw.circle(surface, color, center, max(size // 16, 2))